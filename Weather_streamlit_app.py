@@ -1,24 +1,26 @@
 import streamlit as st
-import asyncio
 import os
-import io
 import traceback
-import nest_asyncio
-import json
 import datetime
 import base64
+import time
+import uuid
 from dotenv import load_dotenv
-from langchain_groq import ChatGroq
-from mcp_use import MCPAgent, MCPClient
 from streamlit_mic_recorder import mic_recorder
-import speech_recognition as sr
 
-# Windows specific event loop policy
-if os.name == 'nt':
-    asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+from weather_agent import event_loop, speech
+from weather_agent.deadlines import QUERY_DEADLINE
+from weather_agent.agent_pool import AgentPool
+from weather_agent.answer_cache import AnswerCache
+from weather_agent.area_grid import AreaGrid, extract_payloads, strip_grids
+from weather_agent.event_log import LEVELS
+from weather_agent.jsonl_log import LogTail, get_logger
+from weather_agent.router import Answer, Router, agent_answer, direct_handlers, tool_handlers
+from weather_agent.streaming import StreamRecorder, StreamView, stream_to
+from weather_agent.transcript import ChatTranscript
 
-# Apply nest_asyncio
-nest_asyncio.apply()
+# All async work (MCP sessions, HTTP) runs on one shared background loop;
+# the script thread submits coroutines to it and waits on futures.
 
 # Load environment variables
 load_dotenv()
@@ -136,58 +138,102 @@ st.markdown("""
 # --- Session State Initialization ---
 if "messages" not in st.session_state:
     st.session_state.messages = []
-if "logs" not in st.session_state:
-    st.session_state.logs = []
-
-
-def add_log(message, type="info"):
-    # Streamlit Cloud uses UTC by default. Adding 5:30 for IST.
-    from datetime import datetime as dt, timedelta
-    ist_cutoff = timedelta(hours=5, minutes=30)
-    timestamp = (dt.utcnow() + ist_cutoff).strftime("%H:%M:%S")
-    st.session_state.logs.append({"time": timestamp, "msg": message, "type": type})
+if "session_id" not in st.session_state:
+    # Tags this browser session's events in the shared JSONL log
+    st.session_state.session_id = uuid.uuid4().hex[:12]
+if "logs_since" not in st.session_state:
+    # Events up to this sequence number are hidden in the System Logs tab
+    st.session_state.logs_since = 0
+if "transcript" not in st.session_state:
+    st.session_state.transcript = ChatTranscript()
+
+# Only the most recent messages are drawn; "Load earlier" widens the window
+CHAT_WINDOW = int(os.getenv("CHAT_WINDOW", "20"))
+if "chat_window" not in st.session_state:
+    st.session_state.chat_window = CHAT_WINDOW
+
+
+def add_log(message, type="info", **fields):
+    # Queued for the process-wide JSONL log; written off the request path
+    get_logger().log(message, type, session=st.session_state.session_id, **fields)
+
+@st.cache_resource(show_spinner=False)
+def get_log_tail():
+    # One tail of the shared log file for all sessions; each poll reads only new lines
+    return LogTail(get_logger().path, capacity=int(os.getenv("LOG_CAPACITY", "1000")))
+
+def hide_logs_so_far():
+    tail = get_log_tail()
+    tail.poll()
+    st.session_state.logs_since = tail.last_seq
 
 # --- Helper Functions ---
-def transcribe_audio(audio_bytes):
-    r = sr.Recognizer()
-    try:
-        audio_file = io.BytesIO(audio_bytes)
-        with sr.AudioFile(audio_file) as source:
-            audio_data = r.record(source)
-            text = r.recognize_google(audio_data)
-            return text
-    except sr.UnknownValueError:
-        return "Error: Could not understand audio (Speech was unintelligible)"
-    except sr.RequestError as e:
-        return f"Error: API connection failed; {e}"
-    except Exception as e:
-        # Fallback for other errors (e.g., file format issues)
-        err_msg = str(e) if str(e) else repr(e)
-        return f"Error transcribing: {err_msg}"
-
-def get_agent(model_name="llama-3.3-70b-versatile"):
-    config_file = "server/weather.json"
-    client = MCPClient.from_config_file(config_file)
-    llm = ChatGroq(model=model_name)
-    agent = MCPAgent(
-        llm=llm,
-        client=client,
+@st.fragment(run_every=0.5)
+def voice_transcription_status():
+    # Polls the background transcription without blocking the rest of the page;
+    # the finished result is handed to the next full rerun
+    future = st.session_state.get("transcription")
+    if future is None:
+        return
+    if not future.done():
+        st.caption("🎙️ Transcribing...")
+        return
+    st.session_state.transcription = None
+    st.session_state.voice_result = future.result()
+    st.rerun()
+
+def render_area_grid(payload):
+    # Heatmap of a get_area_forecast grid; north at the top
+    grid = AreaGrid.from_payload(payload)
+    scheme = "blues" if grid.variable.startswith("precipitation") else "yelloworangered"
+    st.caption(f"🗺️ {grid.variable} {grid.date or ''} ({grid.values.shape[0]}×{grid.values.shape[1]} points)")
+    st.vega_lite_chart(spec={
+        "data": {"values": grid.records()},
+        "mark": {"type": "rect", "tooltip": True},
+        "encoding": {
+            "x": {"field": "lon", "type": "ordinal", "title": "Longitude"},
+            "y": {"field": "lat", "type": "ordinal", "sort": "descending", "title": "Latitude"},
+            "color": {"field": "value", "type": "quantitative", "title": grid.units or grid.variable,
+                      "scale": {"scheme": scheme}},
+        },
+    }, use_container_width=True)
+
+@st.cache_resource(show_spinner=False)
+def get_agent_pool():
+    # One pool for the whole process: every browser session checks agents out
+    # of it instead of spawning its own weather server. Each pooled connection
+    # keeps a ready agent per model, so switching models is instant.
+    return AgentPool(
+        config_file="server/weather.json",
+        size=int(os.getenv("AGENT_POOL_SIZE", "4")),
+        idle_timeout=float(os.getenv("AGENT_POOL_IDLE_SECONDS", "600")),
         max_steps=10,
-        memory_enabled=False,
     )
-    return agent
+
+@st.cache_resource(show_spinner=False)
+def get_router(_pool):
+    # Weather and comparisons come straight from Open-Meteo, alerts straight
+    # from the MCP tool; anything else falls back to the agent. Shared so the
+    # route metrics cover every session.
+    # Repeated questions (same places, metrics and day) are answered from the
+    # answer cache until the underlying forecast refreshes.
+    return Router(
+        {**tool_handlers(_pool.call_tool), **direct_handlers()},
+        cache=AnswerCache(max_entries=int(os.getenv("ANSWER_CACHE_SIZE", "512"))),
+    )
 
 # Initialize Agent
-if "agent" not in st.session_state:
+if "agent_pool" not in st.session_state:
     try:
-        st.session_state.agent = get_agent()
+        st.session_state.agent_pool = get_agent_pool()
         add_log("Agent Initialized Successfully", "SUCCESS")
     except Exception as e:
         st.error(f"Failed to initialize agent: {e}")
         add_log(f"Agent Initialization Failed: {e}", "ERROR")
         st.stop()
 
-agent = st.session_state.agent
+agent_pool = st.session_state.agent_pool
+router = get_router(agent_pool)
 
 # --- Sidebar ---
 with st.sidebar:
@@ -397,14 +443,10 @@ with tab1:
         st.session_state.current_model = "llama-3.3-70b-versatile"
         
     if st.session_state.current_model != selected_model:
-        with st.spinner(f"Switching to {selected_model}..."):
-            try:
-                st.session_state.agent = get_agent(selected_model)
-                st.session_state.current_model = selected_model
-                add_log(f"Switched model to {selected_model}", "INFO")
-                # st.success(f"Switched to {selected_model}!") # Optional toast
-            except Exception as e:
-                st.error(f"Failed to switch model: {e}")
+        # Agents are checked out per model from the shared pool, so switching
+        # only changes which one we ask for next time.
+        st.session_state.current_model = selected_model
+        add_log(f"Switched model to {selected_model}", "INFO")
     chat_container = st.container(height=400)
     with chat_container:
         if not st.session_state.messages:
@@ -416,7 +458,14 @@ with tab1:
              </div>
              """, unsafe_allow_html=True)
 
-        for i, message in enumerate(st.session_state.messages):
+        # Draw only the last chat_window messages so reruns stay cheap in long chats
+        first_shown = max(0, len(st.session_state.messages) - st.session_state.chat_window)
+        if first_shown:
+            if st.button(f"⬆️ Load earlier messages ({first_shown} hidden)", key="load_earlier", use_container_width=True):
+                st.session_state.chat_window += CHAT_WINDOW
+                st.rerun()
+
+        for i, message in enumerate(st.session_state.messages[first_shown:], start=first_shown):
             role_class = "user-message" if message["role"] == "user" else "bot-message"
             role_icon = "👤" if message["role"] == "user" else "🤖"
             display_name = "RatneshAI Weather Agent" if message["role"] == "assistant" else "You"
@@ -432,6 +481,8 @@ with tab1:
             
             # Display content separately to avoid HTML issues
             st.markdown(message['content'])
+            for payload in message.get("area_grids", ()):
+                render_area_grid(payload)
             
             # Add Feedback & Copy Options for Assistant Messages
             if message["role"] == "assistant":
@@ -487,18 +538,11 @@ with tab1:
         with col_export:
             st.write("💾 **Save:**")
             
-            # Prepare JSON format
-            chat_history_json = json.dumps(st.session_state.messages, indent=2)
-            
-            # Prepare TXT format
-            chat_history_txt = "=" * 60 + "\n"
-            chat_history_txt += "WEATHER CHAT HISTORY\n"
-            chat_history_txt += "=" * 60 + "\n\n"
-            for i, msg in enumerate(st.session_state.messages, 1):
-                role = "YOU" if msg["role"] == "user" else "RATNESH AI WEATHER AGENT"
-                chat_history_txt += f"[{i}] {role}:\n"
-                chat_history_txt += f"{msg['content']}\n"
-                chat_history_txt += "-" * 60 + "\n\n"
+            # Exports are kept up to date per message; only new ones get rendered
+            transcript = st.session_state.transcript
+            transcript.sync(st.session_state.messages)
+            chat_history_json = transcript.json()
+            chat_history_txt = transcript.txt()
             
             # Two download buttons in sub-columns
             exp_col1, exp_col2 = st.columns(2)
@@ -522,29 +566,47 @@ with tab1:
         with col_clear:
             st.write("🧹 **Clear:**")
             if st.button("Clear Chat", use_container_width=True):
-                if hasattr(agent, "clear_conversation_history"):
-                    agent.clear_conversation_history()
+                # Pooled agents run without memory, so only the UI history needs clearing
                 st.session_state.messages = []
+                st.session_state.transcript.reset()
+                st.session_state.chat_window = CHAT_WINDOW
                 add_log("Chat history cleared", "INFO")
                 st.rerun()
 
         with col_reset:
             st.write("🔄 **Reset:**")
             if st.button("Reset System", use_container_width=True):
-                del st.session_state.agent
-                st.session_state.logs = []
+                # The pool is process-wide (st.cache_resource); dropping it from
+                # session state would keep every connection open
+                event_loop.run(agent_pool.reset())
+                st.session_state.pop("current_model", None)
+                hide_logs_so_far()
                 add_log("System reset initiated", "WARNING")
                 st.rerun()
 
         if audio:
             if "last_audio_id" not in st.session_state or st.session_state.last_audio_id != audio['id']:
                 st.session_state.last_audio_id = audio['id']
-                transcribed_text = transcribe_audio(audio['bytes'])
-                if transcribed_text and not transcribed_text.startswith("Error"):
-                    voice_prompt = transcribed_text
-                    add_log(f"Voice captured: {voice_prompt}", "INFO")
-                elif transcribed_text:
-                    st.warning(transcribed_text)
+                # Transcribed on a worker thread (local engine if installed, see weather_agent/speech.py)
+                st.session_state.transcription = speech.submit(audio['bytes'])
+        if st.session_state.get("transcription") is not None:
+            with col_mic:
+                voice_transcription_status()
+
+        voice_result = st.session_state.pop("voice_result", None)
+        if voice_result is not None:
+            stt_fields = {
+                "stt_backend": voice_result.backend,
+                "stt_timings_s": {stage: round(seconds, 3) for stage, seconds in voice_result.timings.items()},
+                "audio_s": round(voice_result.input_seconds, 2),
+                "speech_s": round(voice_result.speech_seconds, 2),
+            }
+            if voice_result.error is None:
+                voice_prompt = voice_result.text
+                add_log(f"Voice captured: {voice_prompt} ({voice_result.backend}: {voice_result.timing_summary()})", "INFO", **stt_fields)
+            else:
+                st.warning(voice_result.error)
+                add_log(f"Voice transcription failed: {voice_result.error}", "WARNING", **stt_fields)
     
     # Handle Voice Input Override
     if voice_prompt and not prompt:
@@ -561,192 +623,84 @@ with tab1:
         with chat_container: # Show spinner in the chat window area
              with st.status("✨ RatneshAI is doing its magic...", expanded=False) as status:
                 try:
-                    # DIRECT IMPLEMENTATION - Bypass broken agent
-                    import re
-                    import requests
-                    from datetime import datetime
-                    
-                    current_model = "Direct API (No LLM)"  # Not using agent anymore
                     prompt_content = st.session_state.messages[-1]["content"]
-                    st.toast("🔌 Fetching weather data...", icon="🌩️")
+                    model = st.session_state.current_model
                     
-                    # Extract city name from query - smarter anchor-based approach
-                    city_name = None
-                    query_lower = prompt_content.lower()
+                    recorder = StreamRecorder()
                     
-                    # 1. Try to find city after "in", "at", "for", "like"
-                    import re as regex_module
-                    match = regex_module.search(r'\b(?:in|at|for|like)\s+(.+?)(?:\?|$| today| tomorrow| right| now| current| weather| forecast)', prompt_content, regex_module.IGNORECASE)
+                    async def ask_agent(query):
+                        # Only open-ended or unrecognised questions pay for an LLM loop
+                        try:
+                            with stream_to(recorder):
+                                async with agent_pool.checkout(model) as agent:
+                                    return agent_answer(await agent.run(query))
+                        except Exception as e:
+                            return Answer(f"❌ The assistant couldn't answer that right now ({e}). Try asking like: 'What's the weather in Paris?'", ok=False)
                     
-                    raw_city_candidate = None
-                    if match:
-                        raw_city_candidate = match.group(1).strip()
+                    route, _ = router.classify(prompt_content)
+                    if route != "agent":
+                        st.toast("🔌 Fetching weather data...", icon="🌩️")
                     else:
-                        # Fallback: use the whole string
-                        raw_city_candidate = prompt_content
-
-                    # 2. Clean the candidate string
-                    # Remove common weather-related words and fillers
-                    noise_words = [
-                        # Question words & helpers
-                        'what', 'is', 'the', 'tell', 'me', 'about', 'show', 'how', 'give', 'a', 'an', 
-                        'can', 'you', 'please', 'provide', 'do', 'does', 'did', 'are', 'were',
-                        # Weather terms
-                        'weather', 'wether', 'report', 'forecast', 'current', 'today', 'tomorrow', 
-                        'going', 'to', 'rain', 'it', 'will', 'be', 'there', 'any', 'updates',
-                        # Specific metrics
-                        'temperature', 'temp', 'wind', 'speed', 'humidity', 'precipitation', 
-                        'snow', 'sunny', 'cloudy', 'hot', 'cold', 'warm', 'cool', 'uv', 'index',
-                        # Time
-                        'now', 'right', 'this', 'morning', 'afternoon', 'evening', 'night', 'day', 'days',
-                        # Other
-                        'check', 'look', 'search', 'find'
-                    ]
-                    
-                    # Remove punctuation
-                    import string
-                    cleaned = raw_city_candidate.translate(str.maketrans('', '', string.punctuation))
-                    
-                    # Split and filter words
-                    words = cleaned.split()
-                    filtered_words = []
-                    
-                    for w in words:
-                        # Filter out noise words and any word containing digits (like '3-day', '24h')
-                        if w.lower() not in noise_words and len(w) > 1 and not any(char.isdigit() for char in w):
-                            filtered_words.append(w)
+                        status.update(label="💬 RatneshAI is answering...", expanded=True)
+                    # Runs on the shared background loop that owns the HTTP client and MCP sessions;
+                    # other sessions' queries progress there in parallel with this one
+                    future = event_loop.submit(router.handle(prompt_content, fallback=ask_agent))
                     
-                    # Reconstruct city name
-                    if filtered_words:
-                        city_name = ' '.join(filtered_words)
-                        
-                        # Common corrections
-                        corrections = {
-                            'massuri': 'Mussoorie',
-                            'uttrakhand': 'Uttarakhand',
-                            'dilli': 'Delhi',
-                            'mumbai': 'Mumbai',
-                            'kolkata': 'Kolkata',
-                            'bengaluru': 'Bangalore'
-                        }
-                        
-                        city_lower = city_name.lower()
-                        for wrong, correct in corrections.items():
-                            if wrong in city_lower:
-                                city_name = correct
-                                break
-                    
-                    if city_name and len(city_name.strip()) > 0:
-                        
-                        # Function to fetch coordinates with fallback
-                        def get_coordinates(search_name):
-                            import urllib.parse
-                            # Use params for proper encoding
-                            base_url = "https://geocoding-api.open-meteo.com/v1/search"
-                            params = {
-                                "name": search_name,
-                                "count": 1,
-                                "language": "en",
-                                "format": "json"
-                            }
-                            try:
-                                r = requests.get(base_url, params=params, timeout=5)
-                                return r.json()
-                            except:
-                                return {}
-
-                        # Attempt 1: Search absolute name (e.g., "Hyderabad India")
-                        geo_data = get_coordinates(city_name)
-                        
-                        # Attempt 2: Fallback to first word if no results (e.g., "Hyderabad")
-                        if "results" not in geo_data and " " in city_name:
-                            first_part = city_name.split()[0]
-                            geo_data = get_coordinates(first_part)
-                        
-                        if "results" in geo_data:
-                            latitude = geo_data["results"][0]["latitude"]
-                            longitude = geo_data["results"][0]["longitude"]
-                            city_display = geo_data["results"][0]["name"]
-                            country_display = geo_data["results"][0].get("country", "")
-                            if country_display:
-                                city_display += f", {country_display}"
-                            
-                            # Get weather forecast
-                            weather_url = f"https://api.open-meteo.com/v1/forecast?latitude={latitude}&longitude={longitude}&daily=temperature_2m_max,temperature_2m_min,precipitation_sum,windspeed_10m_max,uv_index_max,sunrise,sunset&timezone=auto"
-                            weather_response = requests.get(weather_url, timeout=10)
-                            weather_data = weather_response.json()
-                            
-                            # Format response with conversational summary
-                            daily = weather_data["daily"]
-                            today = daily["time"][0]
-                            
-                            # Create 5-sentence conversational summary
-                            temp_max = daily['temperature_2m_max'][0]
-                            temp_min = daily['temperature_2m_min'][0]
-                            wind = daily['windspeed_10m_max'][0]
-                            precip = daily['precipitation_sum'][0]
-                            uv = daily['uv_index_max'][0]
-                            
-                            summary = f"Hello! Here's the weather update for {city_display}. "
-                            summary += f"Today's temperature will range from a low of {temp_min}°C to a high of {temp_max}°C. "
-                            
-                            if precip > 0:
-                                summary += f"You can expect some precipitation today, with about {precip}mm of rainfall, so don't forget your umbrella! "
-                            else:
-                                summary += f"Good news - no rain is expected today, so you can leave your umbrella at home! "
-                            
-                            summary += f"The wind will be blowing at {wind} km/h, and the UV index is {uv}, "
-                            
-                            if uv > 6:
-                                summary += "so make sure to wear sunscreen if you're heading outdoors. "
-                            elif uv > 3:
-                                summary += "so some sun protection would be wise. "
-                            else:
-                                summary += "so UV exposure is minimal today. "
-                            
-                            summary += f"Have a great day in {city_display}!\n\n"
-                            
-                            response = summary
-                            response += f"---\n\n"
-                            response += f"🌤️ **Detailed Weather Report for {city_display}**\n\n"
-                            response += f"📅 **Date**: {today}\n\n"
-                            response += f"**Today's Forecast:**\n\n"
-                            response += f"* 🌡️ **Temperature**: Max {daily['temperature_2m_max'][0]}°C / Min {daily['temperature_2m_min'][0]}°C\n\n"
-                            response += f"* 💨 **Wind Speed**: {daily['windspeed_10m_max'][0]} km/h\n\n"
-                            response += f"* ☔ **Precipitation**: {daily['precipitation_sum'][0]} mm\n\n"
-                            response += f"* ☀️ **UV Index**: {daily['uv_index_max'][0]}\n\n"
-                            response += f"* 🌅 **Sunrise**: {daily['sunrise'][0].split('T')[1]}\n\n"
-                            response += f"* 🌇 **Sunset**: {daily['sunset'][0].split('T')[1]}\n\n"
-                            
-                            # Add 3-day forecast
-                            response += "\n**3-Day Forecast:**\n\n"
-                            for i in range(1, min(4, len(daily["time"]))):
-                                response += f"**{daily['time'][i]}**: {daily['temperature_2m_max'][i]}°C / {daily['temperature_2m_min'][i]}°C, Wind: {daily['windspeed_10m_max'][i]} km/h\n\n"
-                        else:
-                            response = f"❌ Sorry, I couldn't find weather data for '{city_name}'. Please check the city name and try again."
-                    else:
-                        response = "❌ I couldn't identify a city name in your question. Please ask like: 'What's the weather in Paris?'"
+                    # Relay tool calls and tokens while the agent works
+                    live_answer = st.empty()
+                    view = StreamView()
+                    deadline = time.monotonic() + QUERY_DEADLINE
+                    while not future.done() and time.monotonic() < deadline:
+                        if view.apply(recorder.drain()):
+                            live_answer.markdown(view.render())
+                        time.sleep(0.05)
+                    if not future.done():
+                        future.cancel()  # also cancels the task on the background loop
+                        raise TimeoutError(f"The assistant took too long to answer ({QUERY_DEADLINE:.0f}s).")
+                    result = future.result()
+                    response = result.answer
+                    ttft = recorder.time_to_first_token
+                    if ttft is not None:
+                        add_log(f"Time to first token: {ttft:.2f}s ({recorder.tool_calls} tool calls)", "INFO", ttft_s=round(ttft, 3))
+                    current_model = model if result.route == "agent" else f"Direct API (No LLM, {result.route})"
+                    if result.cached:
+                        current_model = f"Answer Cache ({result.route})"
                     
                     # Clean up any stray HTML tags
                     import re as regex_module
                     response = regex_module.sub(r'<[^>]+>', '', response)
                     
+                    # Area forecasts are drawn as maps, not echoed as base64
+                    area_grids = [p for output in recorder.tool_outputs for p in extract_payloads(output)] or extract_payloads(response)
+                    response = strip_grids(response)
+                    
                     status.update(label="Complete!", state="complete", expanded=False)
                     
                     # Create informative log entry with proper severity
                     user_query = prompt_content[:50] + "..." if len(prompt_content) > 50 else prompt_content
                     response_preview = response[:80] + "..." if len(response) > 80 else response
-                    log_msg = f"Query: '{user_query}' | Model: {current_model} | Response: {response_preview}"
+                    log_msg = f"Query: '{user_query}' | Model: {current_model} | Latency: {result.seconds:.2f}s | Response: {response_preview}"
+                    
+                    log_fields = {
+                        "latency_s": round(result.seconds, 3),
+                        "route": result.route,
+                        "cached": result.cached,
+                        "model": current_model,
+                        "tools": view.tools or None,
+                    }
                     
                     # Determine log severity based on response content
-                    if "Agent stopped due to an error" in response or "❌" in response or "Failed to call" in response:
-                        add_log(log_msg, "ERROR")
+                    if not result.ok or "Failed to call" in response:
+                        add_log(log_msg, "ERROR", **log_fields)
                     elif "⏱️" in response or "took too long" in response:
-                        add_log(log_msg, "WARNING")
+                        add_log(log_msg, "WARNING", **log_fields)
                     else:
-                        add_log(log_msg, "SUCCESS")
+                        add_log(log_msg, "SUCCESS", **log_fields)
                     
-                    st.session_state.messages.append({"role": "assistant", "content": response})
+                    assistant_message = {"role": "assistant", "content": response}
+                    if area_grids:
+                        assistant_message["area_grids"] = area_grids
+                    st.session_state.messages.append(assistant_message)
                     st.rerun()
                 except Exception as e:
                     status.update(label="Error", state="error")
@@ -1040,39 +994,12 @@ with tab5:
     </div>
     """, unsafe_allow_html=True)
     
-    log_data = st.session_state.logs
-    
-    
-    # Metrics Row
-    m1, m2, m3 = st.columns(3)
-    
-    total_events = len(log_data)
-    success_count = len([l for l in log_data if l['type'] == 'SUCCESS'])
-    error_count = len([l for l in log_data if l['type'] == 'ERROR'])
-    # Calculate Success Rate
-    success_rate = (success_count / total_events * 100) if total_events > 0 else 0
-    
-    with m1:
-        st.markdown(f"""
-        <div style='background: rgba(40, 116, 240, 0.1); padding: 15px; border-radius: 10px; border-left: 5px solid #2874f0; text-align: center;'>
-            <h4 style='color: #bdc3c7; margin: 0; font-size: 0.9rem;'>TOTAL EVENTS</h4>
-            <p style='color: #2874f0; font-size: 1.8rem; font-weight: bold; margin: 5px 0;'>{total_events}</p>
-        </div>
-        """, unsafe_allow_html=True)
-    with m2:
-         st.markdown(f"""
-        <div style='background: rgba(46, 204, 113, 0.1); padding: 15px; border-radius: 10px; border-left: 5px solid #2ecc71; text-align: center;'>
-            <h4 style='color: #bdc3c7; margin: 0; font-size: 0.9rem;'>SUCCESS RATE</h4>
-            <p style='color: #2ecc71; font-size: 1.8rem; font-weight: bold; margin: 5px 0;'>{success_rate:.1f}%</p>
-        </div>
-        """, unsafe_allow_html=True)
-    with m3:
-         st.markdown(f"""
-        <div style='background: rgba(231, 76, 60, 0.1); padding: 15px; border-radius: 10px; border-left: 5px solid #e74c3c; text-align: center;'>
-            <h4 style='color: #bdc3c7; margin: 0; font-size: 0.9rem;'>SYSTEM ERRORS</h4>
-            <p style='color: #e74c3c; font-size: 1.8rem; font-weight: bold; margin: 5px 0;'>{error_count}</p>
-        </div>
-        """, unsafe_allow_html=True)
+    # Events come from the shared JSONL log; the metrics are filled in once
+    # the filters below have been read
+    metrics_row = st.container()
+
+    # Fast-path router metrics (process-wide, all sessions)
+    router_expander = st.container()
 
     st.markdown("---")
 
@@ -1098,54 +1025,117 @@ with tab5:
     st.markdown("### 🎛️ Monitor Controls")
     
     # Row 1: Filters
-    c_search, c_levels = st.columns([1, 2])
+    c_scope, c_search, c_levels = st.columns([1, 1, 2])
+    with c_scope:
+        log_scope = st.selectbox("Scope", ["This session", "All sessions"], label_visibility="collapsed")
     with c_search:
         search_query = st.text_input("Search Logs", placeholder="🔍 Filter...", label_visibility="collapsed")
     with c_levels:
-        filter_types = st.multiselect("Log Levels", ["INFO", "SUCCESS", "WARNING", "ERROR"], 
-                                    default=["INFO", "SUCCESS", "WARNING", "ERROR"], 
+        filter_types = st.multiselect("Log Levels", list(LEVELS), 
+                                    default=list(LEVELS), 
                                     label_visibility="collapsed")
 
+    # Reads only what was appended to the log file since the last rerun
+    log_view = get_log_tail().view(
+        filter_types,
+        search_query,
+        session=st.session_state.session_id if log_scope == "This session" else None,
+        since=st.session_state.logs_since,
+    )
+
     # Row 2: Actions (Next Line)
-    b1, b2, b3, b4 = st.columns(4)
+    b1, b2, b3, b4, b5 = st.columns(5)
     with b1:
         st.button("🔄 Refresh", use_container_width=True, on_click=lambda: st.rerun())
     with b2:
         if st.button("🗑️ Clear", use_container_width=True):
-                st.session_state.logs = []
+                # The file is shared with other sessions, so clearing only hides what is there now
+                hide_logs_so_far()
+                st.session_state.pop("log_export", None)
                 st.rerun()
     with b3:
-        log_text = "\n".join([f"[{l['time']}] {l['type']}: {l['msg']}" for l in log_data])
-        st.download_button("📄 Save TXT", data=log_text, file_name=f"log_{datetime.datetime.now().strftime('%H%M%S')}.txt", mime="text/plain", use_container_width=True)
+        # Exports are built on request, not on every rerun of the page
+        if st.button("📦 Export", use_container_width=True):
+            st.session_state.log_export = (
+                datetime.datetime.now().strftime('%H%M%S'), log_view.text(), log_view.json()
+            )
+    stamp, log_text, log_json = st.session_state.get("log_export", ("", "", ""))
     with b4:
-        log_json = json.dumps(log_data, indent=2)
-        st.download_button("💾 Save JSON", data=log_json, file_name=f"log_{datetime.datetime.now().strftime('%H%M%S')}.json", mime="application/json", use_container_width=True)
+        st.download_button("📄 Save TXT", data=log_text, file_name=f"log_{stamp}.txt", mime="text/plain", use_container_width=True, disabled=not stamp)
+    with b5:
+        st.download_button("💾 Save JSON", data=log_json, file_name=f"log_{stamp}.json", mime="application/json", use_container_width=True, disabled=not stamp)
+
+    filtered_logs = log_view.entries
+
+    # Metrics Row
+    total_events = log_view.total
+    error_count = log_view.counts["ERROR"]
+    success_rate = log_view.success_rate
+    
+    m1, m2, m3 = metrics_row.columns(3)
+    
+    with m1:
+        st.markdown(f"""
+        <div style='background: rgba(40, 116, 240, 0.1); padding: 15px; border-radius: 10px; border-left: 5px solid #2874f0; text-align: center;'>
+            <h4 style='color: #bdc3c7; margin: 0; font-size: 0.9rem;'>TOTAL EVENTS</h4>
+            <p style='color: #2874f0; font-size: 1.8rem; font-weight: bold; margin: 5px 0;'>{total_events}</p>
+        </div>
+        """, unsafe_allow_html=True)
+    with m2:
+         st.markdown(f"""
+        <div style='background: rgba(46, 204, 113, 0.1); padding: 15px; border-radius: 10px; border-left: 5px solid #2ecc71; text-align: center;'>
+            <h4 style='color: #bdc3c7; margin: 0; font-size: 0.9rem;'>SUCCESS RATE</h4>
+            <p style='color: #2ecc71; font-size: 1.8rem; font-weight: bold; margin: 5px 0;'>{success_rate:.1f}%</p>
+        </div>
+        """, unsafe_allow_html=True)
+    with m3:
+         st.markdown(f"""
+        <div style='background: rgba(231, 76, 60, 0.1); padding: 15px; border-radius: 10px; border-left: 5px solid #e74c3c; text-align: center;'>
+            <h4 style='color: #bdc3c7; margin: 0; font-size: 0.9rem;'>SYSTEM ERRORS</h4>
+            <p style='color: #e74c3c; font-size: 1.8rem; font-weight: bold; margin: 5px 0;'>{error_count}</p>
+        </div>
+        """, unsafe_allow_html=True)
 
-    # Filter Logic
-    filtered_logs = [
-        l for l in log_data 
-        if (search_query.lower() in l['msg'].lower() or search_query.lower() in l['type'].lower())
-        and l['type'] in filter_types
-    ]
+    with router_expander.expander("⚡ Fast-Path Router", expanded=False):
+        route_metrics = router.metrics()
+        r1, r2, r3, r4 = st.columns(4)
+        r1.metric("Queries Routed", route_metrics["total"])
+        r2.metric("Answered Without LLM", f"{route_metrics['hit_rate'] * 100:.1f}%")
+        saved = route_metrics["llm_seconds_saved"]
+        r3.metric("LLM Time Saved", f"{saved:.0f}s" if saved is not None else "n/a")
+        answer_cache = route_metrics["answer_cache"]
+        r4.metric("Answer Cache Hits", f"{answer_cache['hit_rate'] * 100:.1f}%", f"{answer_cache['entries']} cached", delta_color="off")
+        if route_metrics["routes"]:
+            st.table([
+                {
+                    "Route": name,
+                    "Count": stats["count"],
+                    "Errors": stats["errors"],
+                    "Mean (s)": round(stats["mean"], 3),
+                    "p50 (s)": round(stats["p50"], 3),
+                    "p95 (s)": round(stats["p95"], 3),
+                }
+                for name, stats in route_metrics["routes"].items()
+            ])
 
     st.markdown("### 📜 Event Feed")
     log_container = st.container(height=400)
     with log_container:
         if not filtered_logs:
-            if not log_data:
+            if not total_events:
                 st.info("No system logs generated yet. Interactions will appear here.")
             else:
                 st.info("No logs match the current filters.")
         else:
             for log in reversed(filtered_logs):
-                color = "#3498db" if log['type'].lower() == "info" else "#2ecc71" if log['type'] == "SUCCESS" else "#f39c12" if log['type'] == "WARNING" else "#e74c3c"
-                icon = "ℹ️" if log['type'].lower() == "info" else "✅" if log['type'] == "SUCCESS" else "⚠️" if log['type'] == "WARNING" else "🚨"
+                color = "#3498db" if log.type.lower() == "info" else "#2ecc71" if log.type == "SUCCESS" else "#f39c12" if log.type == "WARNING" else "#e74c3c"
+                icon = "ℹ️" if log.type.lower() == "info" else "✅" if log.type == "SUCCESS" else "⚠️" if log.type == "WARNING" else "🚨"
                 
                 st.markdown(f"""
                 <div style='background: rgba(30, 41, 59, 0.4); padding: 12px; border-radius: 8px; border-left: 4px solid {color}; margin-bottom: 8px; font-family: monospace;'>
-                    <span style='color: #bdc3c7;'>[{log['time']}]</span> 
-                    <b style='color: {color}; margin: 0 10px;'>{log['type'].upper()}</b> 
-                    <span style='color: #ecf0f1;'>{icon} {log['msg']}</span>
+                    <span style='color: #bdc3c7;'>[{log.time}]</span> 
+                    <b style='color: {color}; margin: 0 10px;'>{log.type.upper()}</b> 
+                    <span style='color: #ecf0f1;'>{icon} {log.msg}</span>
                 </div>
                 """, unsafe_allow_html=True)
 
@@ -0,0 +1,226 @@
+"""Admission control and load shedding for the weather MCP server.
+
+Every tool call has to be admitted before it may touch an upstream API:
+
+* at most ``max_concurrent`` calls run at once across all sessions
+* at most ``per_session`` calls run at once for a single session
+* calls that cannot start wait in a bounded priority queue; lower numbers
+  run first (alerts before forecasts before geocoding)
+* when the queue is full a new call is rejected straight away - unless it
+  outranks the lowest-priority waiter, which is shed in its place
+* a call that waits longer than ``queue_timeout`` is rejected as well
+
+Rejections raise ``Overloaded`` so the client gets a clear error instead of
+a timeout, and are counted so the shed rate can be watched.
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+# Lower value = more important. Unknown tools get DEFAULT_PRIORITY.
+TOOL_PRIORITIES = {
+    "get_alerts": 0,
+    "get_forecast": 1,
+    "get_global_forecast": 1,
+    "get_coordinates": 2,
+}
+DEFAULT_PRIORITY = 3
+
+
+class Overloaded(Exception):
+    """Raised when a tool call is shed instead of being run."""
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    session: Any = field(compare=False)
+    tool: str = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_concurrent: int = 32,
+        per_session: int = 4,
+        max_queue: int = 64,
+        queue_timeout: float = 10.0,
+        window: float = 60.0,
+    ):
+        self.max_concurrent = max_concurrent
+        self.per_session = per_session
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.window = window
+
+        self._running = 0
+        self._running_by_session: Counter = Counter()
+        self._queue: list[_Waiter] = []
+        self._seq = itertools.count()
+
+        self.admitted: Counter = Counter()
+        self.shed: Counter = Counter()
+        self._recent: deque[tuple[float, bool]] = deque()
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        return cls(
+            max_concurrent=int(os.getenv("MAX_CONCURRENT_CALLS", "32")),
+            per_session=int(os.getenv("MAX_CALLS_PER_SESSION", "4")),
+            max_queue=int(os.getenv("MAX_QUEUED_CALLS", "64")),
+            queue_timeout=float(os.getenv("QUEUE_TIMEOUT_SECONDS", "10")),
+        )
+
+    def _can_start(self, session: Any) -> bool:
+        return self._running < self.max_concurrent and self._running_by_session[session] < self.per_session
+
+    def _start(self, session: Any, tool: str) -> None:
+        self._running += 1
+        self._running_by_session[session] += 1
+        self.admitted[tool] += 1
+        self._record(False)
+
+    def _reject(self, tool: str, reason: str) -> Overloaded:
+        self.shed[tool] += 1
+        self._record(True)
+        return Overloaded(f"Server overloaded ({reason}); {tool} was not run. Please retry shortly.")
+
+    def _record(self, shed: bool) -> None:
+        now = time.monotonic()
+        self._recent.append((now, shed))
+        while self._recent and now - self._recent[0][0] > self.window:
+            self._recent.popleft()
+
+    def _release(self, session: Any) -> None:
+        self._running -= 1
+        self._running_by_session[session] -= 1
+        if self._running_by_session[session] <= 0:
+            del self._running_by_session[session]
+        self._wake()
+
+    def _wake(self) -> None:
+        """Start the best queued waiters that are allowed to run now."""
+        skipped = []
+        while self._queue and self._running < self.max_concurrent:
+            waiter = heapq.heappop(self._queue)
+            if waiter.future.done():
+                continue  # timed out or cancelled while queued
+            if self._running_by_session[waiter.session] >= self.per_session:
+                skipped.append(waiter)  # its session is at its own limit
+                continue
+            self._start(waiter.session, waiter.tool)
+            waiter.future.set_result(None)
+        for waiter in skipped:
+            heapq.heappush(self._queue, waiter)
+
+    def _enqueue(self, session: Any, tool: str, priority: int) -> asyncio.Future:
+        live = [w for w in self._queue if not w.future.done()]
+        if len(live) != len(self._queue):
+            self._queue = live
+            heapq.heapify(self._queue)
+        if len(self._queue) >= self.max_queue:
+            worst = max(self._queue)
+            if worst.priority <= priority:
+                raise self._reject(tool, "queue full")
+            # Shed the least important waiter to make room for this call
+            self._queue.remove(worst)
+            heapq.heapify(self._queue)
+            worst.future.set_exception(self._reject(worst.tool, "displaced by higher-priority work"))
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, _Waiter(priority, next(self._seq), session, tool, future))
+        self._wake()
+        return future
+
+    @asynccontextmanager
+    async def admit(self, tool: str, session: Any, max_wait: float | None = None):
+        """Hold a slot for one tool call, waiting in the queue if necessary.
+
+        Args:
+            tool: Tool name, used for priority and metrics
+            session: Identity of the calling session
+            max_wait: Cap on the queue wait (e.g. the call's remaining deadline)
+        """
+        if self._can_start(session) and not self._queue:
+            self._start(session, tool)
+        else:
+            future = self._enqueue(session, tool, TOOL_PRIORITIES.get(tool, DEFAULT_PRIORITY))
+            wait = self.queue_timeout if max_wait is None else max(0.0, min(self.queue_timeout, max_wait))
+            try:
+                await asyncio.wait_for(asyncio.shield(future), wait)
+            except asyncio.TimeoutError:
+                if future.done() and not future.cancelled() and future.exception() is None:
+                    # Admitted just as the timer fired; give the slot back
+                    self._release(session)
+                future.cancel()
+                raise self._reject(tool, f"waited more than {wait:.1f}s")
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled() and future.exception() is None:
+                    self._release(session)
+                future.cancel()
+                raise
+        try:
+            yield
+        finally:
+            self._release(session)
+
+    def metrics(self) -> dict[str, Any]:
+        """Current load and shed statistics (cumulative and over ``window``)."""
+        admitted = sum(self.admitted.values())
+        shed = sum(self.shed.values())
+        recent_shed = sum(1 for _, was_shed in self._recent if was_shed)
+        return {
+            "running": self._running,
+            "queued": sum(1 for w in self._queue if not w.future.done()),
+            "sessions_running": len(self._running_by_session),
+            "admitted_total": admitted,
+            "shed_total": shed,
+            "shed_rate": shed / (admitted + shed) if admitted + shed else 0.0,
+            "shed_rate_recent": recent_shed / len(self._recent) if self._recent else 0.0,
+            "shed_by_tool": dict(self.shed),
+            "admitted_by_tool": dict(self.admitted),
+            "limits": {
+                "max_concurrent": self.max_concurrent,
+                "per_session": self.per_session,
+                "max_queue": self.max_queue,
+                "queue_timeout": self.queue_timeout,
+            },
+        }
+
+
+class SessionLimitMiddleware:
+    """ASGI middleware that refuses new SSE streams beyond ``max_sessions``."""
+
+    def __init__(self, app, max_sessions: int, sse_path: str = "/sse"):
+        self.app = app
+        self.max_sessions = max_sessions
+        self.sse_path = sse_path
+        self.active = 0
+        self.refused = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] != self.sse_path:
+            await self.app(scope, receive, send)
+            return
+        if self.active >= self.max_sessions:
+            self.refused += 1
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [(b"content-type", b"text/plain"), (b"retry-after", b"5")],
+            })
+            await send({"type": "http.response.body", "body": b"Too many concurrent sessions, retry later.\n"})
+            return
+        self.active += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.active -= 1
@@ -1,38 +1,322 @@
+import argparse
 import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+
 import nest_asyncio
 from mcp import ClientSession
 from mcp.client.sse import sse_client
 
+from deadline import call_tool, deadline_scope
+from tool_schema import list_tools_cached
+
 nest_asyncio.apply()  # Needed to run interactive python
 
 """
 Make sure:
 1. The server is running before running this script.
 2. The server is configured to use SSE transport.
-3. The server is listening on port 8050.
+3. The server is listening on port 8000.
 
 To run the server:
 uv run server.py
+
+Smoke test (one session, list tools, one alerts call):
+python client-sse.py
+
+Load test (many sessions, weighted tool mix, per-tool latency report):
+python client-sse.py load --sessions 50 --rate 100 --duration 60
+python client-sse.py load --mode closed --sessions 20 --think-ms 100
+
+For capacity planning, run the server against local upstream stubs instead
+of the real APIs (see upstream_stub.py), so results are not limited by
+api.weather.gov or its rate limits.
 """
 
+DEFAULT_URL = os.getenv("WEATHER_MCP_URL", "http://localhost:8000/sse")
+DEFAULT_MIX = "get_alerts=4,get_forecast=3,get_coordinates=2,get_global_forecast=1"
+
+# Argument pools each tool's calls are drawn from
+STATES = ["CA", "NY", "TX", "FL", "WA", "CO", "IL", "AZ"]
+US_POINTS = [(37.77, -122.42), (40.71, -74.01), (29.76, -95.37), (47.61, -122.33), (39.74, -104.99), (41.88, -87.63)]
+CITIES = ["Paris", "Tokyo", "London", "Mumbai", "Sydney", "Toronto", "Berlin", "Dubai"]
+GLOBAL_POINTS = [(48.86, 2.35), (35.68, 139.69), (51.51, -0.13), (19.08, 72.88), (-33.87, 151.21), (52.52, 13.40)]
+# south,west,north,east; get_area_forecast is only on server/weather.py
+AREAS = ["28.7,77.5,31.5,81.1", "32.5,-124.5,42.0,-114.1", "47.3,5.9,55.1,15.0"]
+AREA_VARIABLES = ["precipitation_sum", "temperature_2m_max", "wind_speed_10m_max"]
+
+# Latency histogram bucket upper bounds, in milliseconds
+BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float("inf")]
+
+
+def tool_arguments(tool: str, rng: random.Random) -> dict:
+    if tool == "get_alerts":
+        return {"state": rng.choice(STATES)}
+    if tool == "get_forecast":
+        lat, lon = rng.choice(US_POINTS)
+        return {"latitude": lat, "longitude": lon}
+    if tool == "get_coordinates":
+        return {"city_name": rng.choice(CITIES)}
+    if tool == "get_global_forecast":
+        lat, lon = rng.choice(GLOBAL_POINTS)
+        return {"latitude": lat, "longitude": lon}
+    if tool == "get_comfort_metrics":
+        points = rng.sample(GLOBAL_POINTS, rng.randint(1, 3))
+        return {
+            "latitude": ",".join(str(lat) for lat, _ in points),
+            "longitude": ",".join(str(lon) for _, lon in points),
+            "days": rng.randint(1, 3),
+        }
+    if tool == "get_area_forecast":
+        return {"bbox": rng.choice(AREAS), "variable": rng.choice(AREA_VARIABLES), "day": rng.randint(0, 2)}
+    return {}
+
+
+def parse_mix(spec: str) -> dict[str, float]:
+    """'get_alerts=4,get_forecast=1' -> {'get_alerts': 4.0, 'get_forecast': 1.0}"""
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name:
+            mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+@dataclass
+class ToolStats:
+    latencies: list[float] = field(default_factory=list)  # seconds, successful and failed calls
+    errors: Counter = field(default_factory=Counter)  # kind -> count
+
+    @property
+    def calls(self) -> int:
+        return len(self.latencies)
+
+    def record(self, seconds: float, error: str | None) -> None:
+        self.latencies.append(seconds)
+        if error:
+            self.errors[error] += 1
+
+    def histogram(self) -> list[int]:
+        counts = [0] * len(BUCKETS_MS)
+        for seconds in self.latencies:
+            ms = seconds * 1000
+            counts[next(i for i, bound in enumerate(BUCKETS_MS) if ms <= bound)] += 1
+        return counts
+
+    def summary(self, wall: float) -> dict:
+        values = sorted(self.latencies)
+        errors = sum(self.errors.values())
+        return {
+            "calls": self.calls,
+            "errors": errors,
+            "error_rate": errors / self.calls if self.calls else 0.0,
+            "error_kinds": dict(self.errors),
+            "throughput_per_s": self.calls / wall if wall else 0.0,
+            "p50_ms": percentile(values, 0.50) * 1000,
+            "p90_ms": percentile(values, 0.90) * 1000,
+            "p99_ms": percentile(values, 0.99) * 1000,
+            "max_ms": values[-1] * 1000 if values else 0.0,
+            "histogram_ms": {("inf" if b == float("inf") else str(b)): n for b, n in zip(BUCKETS_MS, self.histogram())},
+        }
+
+
+class LoadDriver:
+    def __init__(self, sessions: list[ClientSession], mix: dict[str, float], timeout: float, seed: int | None):
+        self.sessions = sessions
+        self.tools = list(mix)
+        self.weights = list(mix.values())
+        self.timeout = timeout
+        self.rng = random.Random(seed)
+        self.stats: dict[str, ToolStats] = {tool: ToolStats() for tool in self.tools}
+        self.in_flight = 0
+        self.skipped = 0  # open loop: arrivals dropped at the in-flight cap
 
-async def main():
+    def _pick(self) -> tuple[str, dict]:
+        tool = self.rng.choices(self.tools, self.weights)[0]
+        return tool, tool_arguments(tool, self.rng)
+
+    async def call(self, session: ClientSession, tool: str, arguments: dict, started: float) -> None:
+        """One tool call; latency counts from ``started`` (the intended start time)."""
+        self.in_flight += 1
+        error = None
+        try:
+            # The server spends at most our timeout on the call (see upstream.request_budget)
+            with deadline_scope(self.timeout):
+                result = await asyncio.wait_for(call_tool(session, tool, arguments), self.timeout)
+            if result.isError:
+                text = result.content[0].text if result.content else ""
+                error = "shed" if "overloaded" in text.lower() else "tool_error"
+        except asyncio.TimeoutError:
+            error = "timeout"
+        except Exception as e:
+            error = type(e).__name__
+        finally:
+            self.in_flight -= 1
+        self.stats[tool].record(time.perf_counter() - started, error)
+
+    async def open_loop(self, rate: float, duration: float, max_in_flight: int) -> None:
+        """Start calls at Poisson arrivals of ``rate``/s, whether or not earlier ones finished.
+
+        Latency is measured from each call's scheduled arrival, so a server
+        that falls behind shows it in the numbers (no coordinated omission).
+        """
+        tasks = set()
+        start = time.perf_counter()
+        next_at = start
+        i = 0
+        while next_at - start < duration:
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if self.in_flight >= max_in_flight:
+                self.skipped += 1
+            else:
+                tool, arguments = self._pick()
+                session = self.sessions[i % len(self.sessions)]
+                task = asyncio.create_task(self.call(session, tool, arguments, next_at))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            i += 1
+            next_at += self.rng.expovariate(rate)
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    async def closed_loop(self, duration: float, per_session: int, think: float) -> None:
+        """Each worker calls, waits for the answer, pauses ``think`` seconds, repeats."""
+        deadline = time.perf_counter() + duration
+
+        async def worker(session: ClientSession) -> None:
+            while time.perf_counter() < deadline:
+                tool, arguments = self._pick()
+                await self.call(session, tool, arguments, time.perf_counter())
+                if think:
+                    await asyncio.sleep(self.rng.uniform(0.5, 1.5) * think)
+
+        await asyncio.gather(*(worker(session) for session in self.sessions for _ in range(per_session)))
+
+
+def print_report(driver: LoadDriver, wall: float, out=sys.stdout) -> dict:
+    report = {tool: stats.summary(wall) for tool, stats in driver.stats.items() if stats.calls}
+    total = ToolStats()
+    for stats in driver.stats.values():
+        total.latencies.extend(stats.latencies)
+        total.errors.update(stats.errors)
+    report["ALL"] = total.summary(wall)
+
+    print(f"\n{'tool':<22}{'calls':>8}{'err%':>8}{'req/s':>9}{'p50ms':>9}{'p90ms':>9}{'p99ms':>9}{'maxms':>9}", file=out)
+    for tool, s in report.items():
+        print(
+            f"{tool:<22}{s['calls']:>8}{s['error_rate'] * 100:>7.1f}%{s['throughput_per_s']:>9.1f}"
+            f"{s['p50_ms']:>9.0f}{s['p90_ms']:>9.0f}{s['p99_ms']:>9.0f}{s['max_ms']:>9.0f}",
+            file=out,
+        )
+    for tool, s in report.items():
+        if tool == "ALL":
+            continue
+        print(f"\n{tool} latency histogram" + (f" (errors: {s['error_kinds']})" if s["errors"] else ""), file=out)
+        peak = max(s["histogram_ms"].values()) or 1
+        for bound, count in s["histogram_ms"].items():
+            label = f"<= {bound} ms" if bound != "inf" else "> 10000 ms"
+            print(f"  {label:>12} {count:>7} {'#' * round(40 * count / peak)}", file=out)
+    if driver.skipped:
+        print(f"\nSkipped {driver.skipped} arrivals at the in-flight cap (client-side saturation)", file=out)
+    return report
+
+
+async def open_sessions(stack: AsyncExitStack, url: str, count: int) -> tuple[list[ClientSession], list[str]]:
+    async def open_one() -> tuple[ClientSession, object]:
+        read_stream, write_stream = await stack.enter_async_context(sse_client(url))
+        session = await stack.enter_async_context(ClientSession(read_stream, write_stream))
+        return session, await session.initialize()
+
+    # Opened one at a time: sessions entering one exit stack must not interleave
+    opened = [await open_one() for _ in range(count)]
+    tools, _ = await list_tools_cached(*opened[0])
+    return [session for session, _ in opened], [tool.name for tool in tools]
+
+
+async def run_load(args) -> None:
+    mix = parse_mix(args.mix)
+    async with AsyncExitStack() as stack:
+        print(f"Opening {args.sessions} SSE sessions to {args.url}...", file=sys.stderr)
+        connect_started = time.perf_counter()
+        sessions, available = await open_sessions(stack, args.url, args.sessions)
+        print(f"Connected in {time.perf_counter() - connect_started:.2f}s", file=sys.stderr)
+
+        missing = [tool for tool in mix if tool not in available]
+        if missing:
+            # e.g. the Docker server only has get_alerts and get_forecast
+            print(f"Server has no {', '.join(missing)}; dropped from the mix", file=sys.stderr)
+            mix = {tool: weight for tool, weight in mix.items() if tool in available}
+        if not mix:
+            raise SystemExit("None of the requested tools exist on this server")
+
+        driver = LoadDriver(sessions, mix, timeout=args.timeout, seed=args.seed)
+        started = time.perf_counter()
+        if args.mode == "open":
+            print(f"Open loop: {args.rate}/s for {args.duration}s, mix {mix}", file=sys.stderr)
+            await driver.open_loop(args.rate, args.duration, args.max_in_flight)
+        else:
+            print(f"Closed loop: {args.sessions}x{args.per_session} workers for {args.duration}s, mix {mix}", file=sys.stderr)
+            await driver.closed_loop(args.duration, args.per_session, args.think_ms / 1000)
+        wall = time.perf_counter() - started
+
+    report = print_report(driver, wall)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "wall_seconds": wall, "skipped": driver.skipped, "tools": report}, f, indent=2)
+
+
+async def main(url: str = DEFAULT_URL):
     # Connect to the server using SSE
-    async with sse_client("http://localhost:8000/sse") as (read_stream, write_stream):
+    async with sse_client(url) as (read_stream, write_stream):
         async with ClientSession(read_stream, write_stream) as session:
             # Initialize the connection
-            await session.initialize()
+            init_result = await session.initialize()
 
-            # List available tools
-            tools_result = await session.list_tools()
-            print("Available tools:")
-            for tool in tools_result.tools:
+            # List available tools (skipped when the server's tool-schema hash is cached)
+            tools, from_cache = await list_tools_cached(session, init_result)
+            print(f"Available tools{' (cached)' if from_cache else ''}:")
+            for tool in tools:
                 print(f"  - {tool.name}: {tool.description}")
 
-            # Call our Weather tool
-            result = await session.call_tool("get_alerts", arguments={"state":"CA"})
+            # Call our Weather tool, telling the server how long we will wait
+            with deadline_scope(20):
+                result = await call_tool(session, "get_alerts", {"state": "CA"})
             print(f"The weather alerts are = {result.content[0].text}")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Weather MCP SSE client and load driver")
+    parser.add_argument("--url", default=DEFAULT_URL, help="SSE endpoint (default $WEATHER_MCP_URL or localhost:8000)")
+    commands = parser.add_subparsers(dest="command")
+    load = commands.add_parser("load", help="Drive concurrent sessions with a weighted tool mix")
+    load.add_argument("--sessions", type=int, default=10, help="Concurrent SSE sessions")
+    load.add_argument("--mode", choices=["open", "closed"], default="open", help="open: fixed arrival rate; closed: workers wait for answers")
+    load.add_argument("--rate", type=float, default=20.0, help="Open loop: calls per second across all sessions")
+    load.add_argument("--max-in-flight", type=int, default=1000, help="Open loop: arrivals beyond this many outstanding calls are skipped")
+    load.add_argument("--per-session", type=int, default=1, help="Closed loop: workers per session")
+    load.add_argument("--think-ms", type=float, default=0.0, help="Closed loop: mean pause between a worker's calls")
+    load.add_argument("--duration", type=float, default=30.0, help="Seconds to generate load")
+    load.add_argument("--mix", default=DEFAULT_MIX, help="Weighted tools, e.g. 'get_alerts=4,get_forecast=1'")
+    load.add_argument("--timeout", type=float, default=30.0, help="Per-call timeout in seconds")
+    load.add_argument("--seed", type=int, default=None, help="Seed for the tool/argument choice")
+    load.add_argument("--json", metavar="FILE", help="Also write the report as JSON")
+    args = parser.parse_args()
+
+    if args.command == "load":
+        asyncio.run(run_load(args))
+    else:
+        asyncio.run(main(args.url))
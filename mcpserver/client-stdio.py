@@ -3,6 +3,9 @@ import nest_asyncio
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
+from deadline import call_tool, deadline_scope
+from tool_schema import list_tools_cached
+
 async def main():
     # Define server parameters
     server_params = StdioServerParameters(
@@ -14,16 +17,17 @@ async def main():
     async with stdio_client(server_params) as (read_stream, write_stream):
         async with ClientSession(read_stream, write_stream) as session:
             # Initialize the connection
-            await session.initialize()
+            init_result = await session.initialize()
 
-            # List available tools
-            tools_result = await session.list_tools()
-            print("Available tools:")
-            for tool in tools_result.tools:
+            # List available tools (skipped when the server's tool-schema hash is cached)
+            tools, from_cache = await list_tools_cached(session, init_result)
+            print(f"Available tools{' (cached)' if from_cache else ''}:")
+            for tool in tools:
                 print(f"  - {tool.name}: {tool.description}")
 
-              # Call our Weather Tool
-            result = await session.call_tool("get_alerts", arguments={"state":"CA"})
+              # Call our Weather Tool, telling the server how long we will wait
+            with deadline_scope(20):
+                result = await call_tool(session, "get_alerts", {"state": "CA"})
             print(f"The weather alerts are = {result.content[0].text}")
 
 
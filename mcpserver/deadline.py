@@ -0,0 +1,68 @@
+"""End-to-end deadlines shared by the weather MCP servers and their clients.
+
+A deadline is a point on the monotonic clock held in a context variable:
+``deadline_scope(seconds)`` sets one for the enclosed block (nested scopes
+only shrink it) and ``remaining()`` reports what is left. Child tasks
+inherit the context, so everything started inside a scope shares its budget.
+
+Clients send what is left with each tool call as ``_meta.deadline_ms``
+(``call_tool``); the servers run each tool under that budget
+(``upstream.with_deadline``).
+
+server/weather.py and weather_agent import this module from here as well
+(the Docker image only ships mcpserver/), so there is one copy.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+from typing import Any
+
+from mcp import ClientSession, types
+
+_deadline: ContextVar[float | None] = ContextVar("weather_deadline", default=None)
+
+
+@contextmanager
+def deadline_scope(seconds: float | None):
+    """Run the enclosed block under a deadline; nested scopes only shrink it."""
+    if seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(deadline if outer is None else min(outer, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> float | None:
+    """Seconds left in the current deadline, or None outside one."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+async def call_tool(session: ClientSession, name: str, arguments: dict[str, Any] | None = None) -> types.CallToolResult:
+    """``session.call_tool`` that sends the remaining budget as ``_meta.deadline_ms``.
+
+    Outside a deadline scope this is a plain ``call_tool``; inside one the
+    client also stops waiting for the reply when the budget runs out.
+    """
+    left = remaining()
+    if left is None:
+        return await session.call_tool(name, arguments)
+    if left <= 0:
+        raise TimeoutError(f"No time left to call {name}")
+    # Built by hand: ClientSession.call_tool only accepts meta on newer MCP versions
+    request = types.ClientRequest(types.CallToolRequest(
+        method="tools/call",
+        params=types.CallToolRequestParams(
+            name=name,
+            arguments=arguments,
+            _meta=types.RequestParams.Meta(deadline_ms=int(left * 1000)),
+        ),
+    ))
+    return await session.send_request(request, types.CallToolResult, request_read_timeout_seconds=timedelta(seconds=left))
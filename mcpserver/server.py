@@ -1,6 +1,13 @@
 from typing import Any
-import httpx
-from mcp.server.fastmcp import FastMCP
+import os
+from mcp.server.fastmcp import Context, FastMCP
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+import upstream
+from admission import AdmissionController, SessionLimitMiddleware
+from tool_schema import publish_tool_schema
+from upstream import DeadlineExceeded, with_deadline
 
 
 # Create an MCP server
@@ -10,8 +17,13 @@ mcp = FastMCP(
     port=8000,  # only used for SSE transport (set this to any port)
 )
 
+# Admission control: global/per-session concurrency and a bounded priority queue
+admission = AdmissionController.from_env()
+MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", "100"))
+
 # Constants
-NWS_API_BASE = "https://api.weather.gov"
+# Overridable to point at a local stub for load tests (upstream_stub.py)
+NWS_API_BASE = os.getenv("NWS_API_BASE", "https://api.weather.gov")
 USER_AGENT = "weather-app/1.0"
 
 
@@ -21,13 +33,12 @@ async def make_nws_request(url: str) -> dict[str, Any] | None:
         "User-Agent": USER_AGENT,
         "Accept": "application/geo+json"
     }
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(url, headers=headers, timeout=30.0)
-            response.raise_for_status()
-            return response.json()
-        except Exception:
-            return None
+    try:
+        return await upstream.fetch_json(url, headers=headers, max_timeout=30.0)
+    except DeadlineExceeded:
+        raise
+    except Exception:
+        return None
 
 def format_alert(feature: dict) -> str:
     """Format an alert feature into a readable string."""
@@ -41,14 +52,16 @@ def format_alert(feature: dict) -> str:
     """
 
 @mcp.tool()
-async def get_alerts(state: str) -> str:
+@with_deadline
+async def get_alerts(state: str, ctx: Context) -> str:
     """Get weather alerts for a US state.
 
     Args:
         state: Two-letter US state code (e.g. CA, NY)
     """
     url = f"{NWS_API_BASE}/alerts/active/area/{state}"
-    data = await make_nws_request(url)
+    async with admission.admit("get_alerts", ctx.session, max_wait=upstream.remaining()):
+        data = await make_nws_request(url)
 
     if not data or "features" not in data:
         return "Unable to fetch alerts or no alerts found."
@@ -60,23 +73,25 @@ async def get_alerts(state: str) -> str:
     return "\n---\n".join(alerts)
 
 @mcp.tool()
-async def get_forecast(latitude: float, longitude: float) -> str:
+@with_deadline
+async def get_forecast(latitude: float, longitude: float, ctx: Context) -> str:
     """Get weather forecast for a location.
 
     Args:
         latitude: Latitude of the location
         longitude: Longitude of the location
     """
-    # First get the forecast grid endpoint
-    points_url = f"{NWS_API_BASE}/points/{latitude},{longitude}"
-    points_data = await make_nws_request(points_url)
+    async with admission.admit("get_forecast", ctx.session, max_wait=upstream.remaining()):
+        # First get the forecast grid endpoint
+        points_url = f"{NWS_API_BASE}/points/{latitude},{longitude}"
+        points_data = await make_nws_request(points_url)
 
-    if not points_data:
-        return "Unable to fetch forecast data for this location."
+        if not points_data:
+            return "Unable to fetch forecast data for this location."
 
-    # Get the forecast URL from the points response
-    forecast_url = points_data["properties"]["forecast"]
-    forecast_data = await make_nws_request(forecast_url)
+        # Get the forecast URL from the points response
+        forecast_url = points_data["properties"]["forecast"]
+        forecast_data = await make_nws_request(forecast_url)
 
     if not forecast_data:
         return "Unable to fetch detailed forecast."
@@ -95,6 +110,15 @@ async def get_forecast(latitude: float, longitude: float) -> str:
 
     return "\n---\n".join(forecasts)
 
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics(request: Request) -> JSONResponse:
+    """Admission-control metrics (running/queued calls, shed rate) and upstream latency."""
+    return JSONResponse({**admission.metrics(), "upstream": upstream.latency_report()})
+
+# Lets clients reuse cached tool lists while the tool set is unchanged; at
+# import, after the last registration, so it holds however the server is started
+publish_tool_schema(mcp)
+
 # Run the server
 if __name__ == "__main__":
     transport = "sse"
@@ -103,6 +127,9 @@ if __name__ == "__main__":
         mcp.run(transport="stdio")
     elif transport == "sse":
         print("Running server with SSE transport")
-        mcp.run(transport="sse")
+        # Same as mcp.run(transport="sse"), plus a cap on concurrent SSE sessions
+        import uvicorn
+        app = SessionLimitMiddleware(mcp.sse_app(), max_sessions=MAX_SESSIONS, sse_path=mcp.settings.sse_path)
+        uvicorn.run(app, host=mcp.settings.host, port=mcp.settings.port)
     else:
         raise ValueError(f"Unknown transport: {transport}")
\ No newline at end of file
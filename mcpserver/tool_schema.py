@@ -0,0 +1,115 @@
+"""Publish a hash of the server's tool schemas in its version string.
+
+The tool set only changes when the server code does, yet every client
+connection used to ``tools/list`` and rebuild its tool wrappers. The server
+hashes its tools (names, descriptions, input/output schemas) once at startup and
+reports it in ``serverInfo.version`` of the ``initialize`` result, e.g.
+``0.1.0+tools.3f9c1a2b7d4e5f60``. Clients that already hold the tool list
+for that hash skip listing (``list_tools_cached``); any schema change
+changes the hash, so a stale list is never used.
+
+server/weather.py and weather_agent/tool_cache.py import this module too: it
+lives here because the Docker image only ships mcpserver/.
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Iterable
+
+from mcp import ClientSession
+from mcp.server.fastmcp import FastMCP
+from mcp.types import Tool
+
+SERVER_VERSION = "0.1.0"
+SCHEMA_TAG_RE = re.compile(r"\+tools\.([0-9a-f]{8,64})\b")
+CACHE_DIR = Path(os.getenv("WEATHER_TOOL_CACHE_DIR", Path.home() / ".cache" / "weather-mcp" / "tools"))
+
+
+def tool_schema_hash(tools: Iterable[Tool]) -> str:
+    """Stable hash of everything a client builds from the tool list."""
+    canonical = sorted(
+        (
+            {
+                "name": tool.name,
+                "description": tool.description or "",
+                "inputSchema": tool.inputSchema,
+                "outputSchema": getattr(tool, "outputSchema", None),  # newer MCP versions only
+            }
+            for tool in tools
+        ),
+        key=lambda tool: tool["name"],
+    )
+    data = json.dumps(canonical, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(data.encode()).hexdigest()[:16]
+
+
+def registered_tools(mcp: FastMCP) -> list[Tool]:
+    """The server's tools as ``tools/list`` reports them, read without an event loop."""
+    return [
+        Tool.model_construct(
+            name=info.name,
+            description=info.description,
+            inputSchema=info.parameters,
+            outputSchema=getattr(info, "output_schema", None),
+        )
+        for info in mcp._tool_manager.list_tools()
+    ]
+
+
+def publish_tool_schema(mcp: FastMCP, version: str = SERVER_VERSION) -> str:
+    """Hash the registered tools and advertise it; call once all tools are registered.
+
+    Synchronous, so it is safe at import time even inside a running event loop.
+    """
+    digest = tool_schema_hash(registered_tools(mcp))
+    mcp._mcp_server.version = f"{version}+tools.{digest}"
+    return digest
+
+
+def schema_hash(init_result) -> str | None:
+    """The tool-schema hash a server advertised in its ``initialize`` result, if any."""
+    server_info = getattr(init_result, "serverInfo", None)
+    match = SCHEMA_TAG_RE.search(getattr(server_info, "version", None) or "")
+    return match.group(1) if match else None
+
+
+def cache_path(server_name: str, digest: str, directory: str | os.PathLike | None = None) -> Path:
+    """Where the tool list of ``server_name`` with schema hash ``digest`` is kept on disk."""
+    return Path(directory or CACHE_DIR) / f"{server_name}-{digest}.json"
+
+
+def read_cached_tools(path: Path) -> list[Tool] | None:
+    """A tool list written by ``write_cached_tools``; None if missing or unreadable."""
+    try:
+        return [Tool.model_validate(tool) for tool in json.loads(path.read_text(encoding="utf-8"))]
+    except (OSError, ValueError):
+        return None  # missing or unreadable entry: list again and rewrite it
+
+
+def write_cached_tools(path: Path, tools: list[Tool]) -> bool:
+    """Persist a tool list; returns False if it could not be written."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = [tool.model_dump(mode="json", by_alias=True, exclude_none=True) for tool in tools]
+        path.write_text(json.dumps(payload), encoding="utf-8")
+    except OSError:
+        return False
+    return True
+
+
+async def list_tools_cached(session: ClientSession, init_result) -> tuple[list[Tool], bool]:
+    """The server's tools, from the local cache when its schema hash is known.
+
+    Returns (tools, from_cache).
+    """
+    digest = schema_hash(init_result)
+    path = cache_path(init_result.serverInfo.name, digest) if digest is not None else None
+    if path is not None and (tools := read_cached_tools(path)) is not None:
+        return tools, True
+    tools = (await session.list_tools()).tools
+    if path is not None:
+        write_cached_tools(path, tools)
+    return tools, False
@@ -0,0 +1,245 @@
+"""Shared upstream HTTP access with end-to-end deadlines.
+
+Each tool call runs under a deadline: the client's budget when the request
+carries ``_meta.deadline_ms`` (milliseconds the client is still willing to
+wait), otherwise ``TOOL_DEADLINE_SECONDS`` (default 20). The app and
+server/client.py send the time left for the user's query
+(weather_agent/deadlines.py); client-sse.py and client-stdio.py send their
+call timeout. Other MCP clients get the server-side default. Every upstream call
+made while serving the tool gets only the remaining budget, capped by its
+own per-host maximum, so a chain of calls can never outlive the client.
+
+Requests go through one pooled ``httpx.AsyncClient`` and are never shielded
+from cancellation: when the MCP client cancels the request or disconnects,
+the server cancels the tool's task and the in-flight HTTP request with it.
+
+To cut tail latency, each host's recent latencies are tracked. Once enough
+samples exist, the per-call timeout adapts to the observed p99 (never above
+the caller's cap), and an idempotent GET that is still running after the
+host's p95 is hedged: a second identical request is sent and the first
+answer wins. Hedges are paid for from a token bucket that earns
+``UPSTREAM_HEDGE_RATIO`` (default 5%) of a token per request, so hedging
+can never add more than that fraction of extra load. Set
+``UPSTREAM_HEDGING=0`` to turn it off.
+
+server/weather.py imports this module from here as well (the Docker image
+only ships mcpserver/), so both servers share one copy. The deadline itself
+lives in deadline.py, shared with the clients.
+"""
+
+import asyncio
+import functools
+import os
+import time
+from collections import deque
+from typing import Any
+
+import httpx
+from mcp.server.lowlevel.server import request_ctx
+
+import deadline
+
+DEFAULT_DEADLINE = float(os.getenv("TOOL_DEADLINE_SECONDS", "20"))
+HEDGING_ENABLED = os.getenv("UPSTREAM_HEDGING", "1") != "0"
+HEDGE_RATIO = float(os.getenv("UPSTREAM_HEDGE_RATIO", "0.05"))
+
+_client: httpx.AsyncClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a tool call has no time budget left for an upstream call."""
+
+
+def request_budget() -> float:
+    """Seconds the current MCP request may take, from the client or the default."""
+    try:
+        meta = request_ctx.get().meta
+    except LookupError:
+        meta = None
+    deadline_ms = getattr(meta, "deadline_ms", None) if meta is not None else None
+    try:
+        return max(0.0, float(deadline_ms) / 1000) if deadline_ms is not None else DEFAULT_DEADLINE
+    except (TypeError, ValueError):
+        return DEFAULT_DEADLINE
+
+
+def remaining() -> float:
+    """Seconds left in the current deadline (the default budget outside one)."""
+    left = deadline.remaining()
+    return DEFAULT_DEADLINE if left is None else left
+
+
+def with_deadline(fn):
+    """Decorator for tools: run the whole call under the request's deadline."""
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        with deadline.deadline_scope(request_budget()):
+            return await fn(*args, **kwargs)
+
+    return wrapper
+
+
+def get_client() -> httpx.AsyncClient:
+    """Pooled client shared by all tools running on the current event loop."""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop or _client.is_closed:
+        _client = httpx.AsyncClient(limits=httpx.Limits(max_connections=100, max_keepalive_connections=20))
+        _client_loop = loop
+    return _client
+
+
+class HostLatency:
+    """Rolling latency window for one upstream host."""
+
+    MIN_SAMPLES = 20
+    MIN_TIMEOUT = 5.0  # never cut a call off faster than this
+    TIMEOUT_FACTOR = 4.0  # adaptive timeout = p99 * factor
+
+    def __init__(self, size: int = 200):
+        self.samples: deque[float] = deque(maxlen=size)
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> float | None:
+        if len(self.samples) < self.MIN_SAMPLES:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def timeout(self, cap: float) -> float:
+        p99 = self.percentile(0.99)
+        if p99 is None:
+            return cap
+        return min(cap, max(self.MIN_TIMEOUT, p99 * self.TIMEOUT_FACTOR))
+
+    def hedge_delay(self) -> float | None:
+        return self.percentile(0.95)
+
+
+class HedgeBudget:
+    """Token bucket limiting hedged requests to a fraction of all requests."""
+
+    def __init__(self, ratio: float, burst: float = 10.0):
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = burst
+
+    def earn(self) -> None:
+        self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+
+_hosts: dict[str, HostLatency] = {}
+hedge_budget = HedgeBudget(HEDGE_RATIO)
+
+
+def host_stats(host: str) -> HostLatency:
+    if host not in _hosts:
+        _hosts[host] = HostLatency()
+    return _hosts[host]
+
+
+def latency_report() -> dict[str, dict[str, Any]]:
+    """Per-host p50/p95/p99 (seconds) and hedge counters, for metrics."""
+    return {
+        host: {
+            "samples": len(stats.samples),
+            "p50": stats.percentile(0.50),
+            "p95": stats.percentile(0.95),
+            "p99": stats.percentile(0.99),
+            "requests": stats.requests,
+            "hedges": stats.hedges,
+            "hedge_wins": stats.hedge_wins,
+        }
+        for host, stats in _hosts.items()
+    }
+
+
+async def _timed_get(url: str, headers: dict[str, str] | None, timeout: float, stats: HostLatency) -> httpx.Response:
+    start = time.monotonic()
+    try:
+        return await get_client().get(url, headers=headers, timeout=timeout)
+    finally:
+        # Failures, timeouts and cancelled hedge losers count too (as time
+        # spent so far), otherwise the percentiles only see the fast calls
+        stats.record(time.monotonic() - start)
+
+
+async def _hedged_get(url: str, headers: dict[str, str] | None, timeout: float, stats: HostLatency) -> httpx.Response:
+    """GET with an optional hedge after the host's p95; the first non-5xx answer wins."""
+    primary = asyncio.create_task(_timed_get(url, headers, timeout, stats))
+    tasks = {primary}
+    try:
+        delay = stats.hedge_delay() if HEDGING_ENABLED else None
+        if delay is not None and delay < timeout:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and hedge_budget.try_spend():
+                stats.hedges += 1
+                tasks.add(asyncio.create_task(_timed_get(url, headers, timeout - delay, stats)))
+
+        error: BaseException | None = None
+        failed: httpx.Response | None = None
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    error = task.exception()
+                elif task.result().status_code >= 500:
+                    failed = task.result()  # used only if the other request fails too
+                else:
+                    if task is not primary:
+                        stats.hedge_wins += 1
+                    return task.result()
+        if failed is not None:
+            return failed
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def fetch_json(url: str, headers: dict[str, str] | None = None, max_timeout: float = 30.0, check_status: bool = True) -> Any:
+    """GET ``url`` and decode JSON within the remaining deadline.
+
+    Args:
+        url: URL to fetch
+        headers: Request headers
+        max_timeout: Upper bound for this call even when more budget is left
+        check_status: Raise for 4xx/5xx responses
+
+    Raises:
+        DeadlineExceeded: No budget is left, or the call ran out of it. A
+            call cut off by ``max_timeout`` (or the host's adaptive timeout)
+            while budget remains raises the timeout like any failed fetch.
+    """
+    host = httpx.URL(url).host
+    stats = host_stats(host)
+    host_limit = stats.timeout(max_timeout)
+    left = remaining()
+    budget = min(host_limit, left)
+    if budget <= 0:
+        raise DeadlineExceeded(f"Deadline exceeded before calling {host}")
+    stats.requests += 1
+    hedge_budget.earn()
+    try:
+        # wait_for bounds the whole exchange; httpx's own timeout is per phase
+        response = await asyncio.wait_for(_hedged_get(url, headers, budget, stats), budget)
+    except (asyncio.TimeoutError, httpx.TimeoutException) as e:
+        if left <= host_limit:
+            raise DeadlineExceeded(f"{host} did not answer within the {budget:.1f}s left") from e
+        raise
+    if check_status:
+        response.raise_for_status()
+    return response.json()
@@ -0,0 +1,211 @@
+"""Local stand-in for the NWS and Open-Meteo APIs, for load tests.
+
+Serves the endpoints the weather servers call, with canned but well-formed
+responses and configurable latency and failure rate, so a load test
+measures the MCP server and its admission control, not api.weather.gov.
+
+    python upstream_stub.py --port 9000 --latency-ms 80 --jitter-ms 40 --error-rate 0.01
+
+then start the server against it:
+
+    NWS_API_BASE=http://localhost:9000 \\
+    OPEN_METEO_GEO_URL=http://localhost:9000/v1/search \\
+    OPEN_METEO_API_URL=http://localhost:9000/v1/forecast \\
+    uv run server.py
+
+``GET /stats`` returns the request counts per endpoint. The forecast
+endpoint takes comma-separated coordinates (one entry per point, as the
+batched comfort and area tools send them) and any daily/hourly variables,
+answering with just those.
+"""
+
+import argparse
+import asyncio
+import datetime
+import random
+from collections import Counter
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+ALERT_EVENTS = ["Heat Advisory", "Flood Watch", "Wind Advisory", "Red Flag Warning", "Winter Storm Warning"]
+
+
+class StubConfig:
+    latency_ms = 50.0
+    jitter_ms = 25.0
+    error_rate = 0.0
+    alerts = 3
+
+
+config = StubConfig()
+requests_served: Counter[str] = Counter()
+
+
+async def _simulate(endpoint: str) -> JSONResponse | None:
+    """Wait like the real API would; sometimes fail like it, too."""
+    requests_served[endpoint] += 1
+    delay = max(0.0, random.gauss(config.latency_ms, config.jitter_ms)) / 1000
+    await asyncio.sleep(delay)
+    if random.random() < config.error_rate:
+        requests_served[f"{endpoint}:error"] += 1
+        return JSONResponse({"detail": "stub upstream failure"}, status_code=503)
+    return None
+
+
+async def alerts(request: Request) -> JSONResponse:
+    if (failure := await _simulate("alerts")) is not None:
+        return failure
+    state = request.path_params["state"].upper()
+    features = [
+        {
+            "properties": {
+                "event": random.choice(ALERT_EVENTS),
+                "areaDesc": f"County {i + 1}, {state}",
+                "severity": random.choice(["Minor", "Moderate", "Severe"]),
+                "description": "Stub alert for load testing. " * 8,
+                "instruction": "No action needed; this is a test.",
+            }
+        }
+        for i in range(random.randint(0, config.alerts))
+    ]
+    return JSONResponse({"type": "FeatureCollection", "features": features}, media_type="application/geo+json")
+
+
+async def points(request: Request) -> JSONResponse:
+    if (failure := await _simulate("points")) is not None:
+        return failure
+    lat, lon = request.path_params["coords"].split(",", 1)
+    x, y = int(abs(float(lat)) * 3) % 200, int(abs(float(lon)) * 3) % 200
+    forecast = str(request.base_url).rstrip("/") + f"/gridpoints/STB/{x},{y}/forecast"
+    return JSONResponse({"properties": {"forecast": forecast, "gridId": "STB", "gridX": x, "gridY": y}})
+
+
+async def gridpoint_forecast(request: Request) -> JSONResponse:
+    if (failure := await _simulate("gridpoints")) is not None:
+        return failure
+    names = ["Tonight", "Monday", "Monday Night", "Tuesday", "Tuesday Night", "Wednesday", "Wednesday Night"]
+    periods = [
+        {
+            "number": i + 1,
+            "name": name,
+            "temperature": random.randint(40, 95),
+            "temperatureUnit": "F",
+            "windSpeed": f"{random.randint(0, 25)} mph",
+            "windDirection": random.choice(["N", "NE", "E", "SE", "S", "SW", "W", "NW"]),
+            "detailedForecast": "Partly cloudy. Stub forecast for load testing.",
+        }
+        for i, name in enumerate(names)
+    ]
+    return JSONResponse({"properties": {"periods": periods}})
+
+
+async def geocode(request: Request) -> JSONResponse:
+    if (failure := await _simulate("geocode")) is not None:
+        return failure
+    name = request.query_params.get("name", "Nowhere")
+    rng = random.Random(name)  # same place for the same name
+    return JSONResponse({
+        "results": [{
+            "name": name.title(),
+            "country": "Stubland",
+            "latitude": round(rng.uniform(-60, 70), 4),
+            "longitude": round(rng.uniform(-180, 180), 4),
+            "timezone": "UTC",
+        }]
+    })
+
+
+DAILY_VALUES = {
+    "temperature_2m_max": lambda rng, day: round(rng.uniform(15, 35), 1),
+    "temperature_2m_min": lambda rng, day: round(rng.uniform(0, 14), 1),
+    "precipitation_sum": lambda rng, day: round(rng.uniform(0, 12), 1),
+    "precipitation_probability_max": lambda rng, day: rng.randint(0, 100),
+    "weather_code": lambda rng, day: rng.choice([0, 1, 2, 3, 61, 80]),
+    "wind_speed_10m_max": lambda rng, day: round(rng.uniform(2, 40), 1),
+    "uv_index_max": lambda rng, day: round(rng.uniform(0, 11), 1),
+    "sunrise": lambda rng, day: f"{day}T06:{rng.randint(0, 59):02d}",
+    "sunset": lambda rng, day: f"{day}T18:{rng.randint(0, 59):02d}",
+}
+HOURLY_VALUES = {
+    "temperature_2m": lambda rng: round(rng.uniform(-5, 38), 1),
+    "apparent_temperature": lambda rng: round(rng.uniform(-10, 42), 1),
+    "relative_humidity_2m": lambda rng: rng.randint(10, 100),
+    "precipitation": lambda rng: round(rng.uniform(0, 2), 1),
+    "precipitation_probability": lambda rng: rng.randint(0, 100),
+    "wind_speed_10m": lambda rng: round(rng.uniform(0, 50), 1),
+}
+
+
+def _variables(request: Request, name: str) -> list[str]:
+    return [v for v in request.query_params.get(name, "").split(",") if v]
+
+
+def _location(lat: float, lon: float, days: list[str], daily: list[str], hourly: list[str]) -> dict:
+    """One location's answer, holding only the requested variables like the real API."""
+    rng = random.Random()
+    location = {"latitude": lat, "longitude": lon, "timezone": "UTC"}
+    if daily:
+        location["daily"] = {"time": days} | {
+            name: [DAILY_VALUES.get(name, lambda rng, day: round(rng.uniform(0, 10), 1))(rng, day) for day in days]
+            for name in daily
+        }
+    if hourly:
+        hours = [f"{day}T{hour:02d}:00" for day in days for hour in range(24)]
+        location["hourly"] = {"time": hours} | {
+            name: [HOURLY_VALUES.get(name, lambda rng: round(rng.uniform(0, 10), 1))(rng) for _ in hours]
+            for name in hourly
+        }
+    return location
+
+
+async def open_meteo_forecast(request: Request) -> JSONResponse:
+    """Open-Meteo /v1/forecast: comma-separated coordinates get a list back, one entry per point."""
+    if (failure := await _simulate("forecast")) is not None:
+        return failure
+    try:
+        lats = [float(v) for v in request.query_params.get("latitude", "0").split(",")]
+        lons = [float(v) for v in request.query_params.get("longitude", "0").split(",")]
+        forecast_days = int(request.query_params.get("forecast_days", 7))
+    except ValueError:
+        return JSONResponse({"error": True, "reason": "Invalid latitude, longitude or forecast_days"}, status_code=400)
+    if len(lats) != len(lons):
+        return JSONResponse({"error": True, "reason": "Latitude and longitude must have the same number of elements"}, status_code=400)
+    requests_served["forecast:locations"] += len(lats)
+    today = datetime.date.today()
+    days = [(today + datetime.timedelta(days=i)).isoformat() for i in range(max(1, min(forecast_days, 16)))]
+    daily, hourly = _variables(request, "daily"), _variables(request, "hourly")
+    locations = [_location(lat, lon, days, daily, hourly) for lat, lon in zip(lats, lons)]
+    return JSONResponse(locations if len(locations) > 1 else locations[0])
+
+
+async def stats(request: Request) -> JSONResponse:
+    return JSONResponse(dict(requests_served))
+
+
+app = Starlette(routes=[
+    Route("/alerts/active/area/{state}", alerts),
+    Route("/points/{coords}", points),
+    Route("/gridpoints/{office}/{xy}/forecast", gridpoint_forecast),
+    Route("/v1/search", geocode),
+    Route("/v1/forecast", open_meteo_forecast),
+    Route("/stats", stats),
+])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local NWS/Open-Meteo stub for load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency-ms", type=float, default=config.latency_ms, help="Mean response delay")
+    parser.add_argument("--jitter-ms", type=float, default=config.jitter_ms, help="Std deviation of the delay")
+    parser.add_argument("--error-rate", type=float, default=config.error_rate, help="Fraction of requests answered with 503")
+    parser.add_argument("--alerts", type=int, default=config.alerts, help="Most alerts returned per state")
+    args = parser.parse_args()
+    config.latency_ms, config.jitter_ms = args.latency_ms, args.jitter_ms
+    config.error_rate, config.alerts = args.error_rate, args.alerts
+
+    import uvicorn
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -1,13 +1,25 @@
+import argparse
 import asyncio
+import json
+import sys
+import time
+from pathlib import Path
 
 from dotenv import load_dotenv
 from langchain_groq import ChatGroq
 
-from mcp_use import MCPAgent, MCPClient
+from mcp_use import MCPAgent
 import os
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from weather_agent.answer_cache import AnswerCache
+from weather_agent.memory import ConversationMemory
+from weather_agent.router import Router, agent_answer, session_tool_caller, tool_handlers
+from weather_agent.tool_cache import use_cached_tools
+from weather_agent.transport import connect_client
+
 async def run_memory_chat():
-    """Run a chat using MCPAgent's built-in conversation memory."""
+    """Run a chat with bounded, summarized conversation memory."""
     # Load environment variables for API keys
     load_dotenv()
     os.environ["GROQ_API_KEY"]=os.getenv("GROQ_API_KEY")
@@ -17,37 +29,58 @@ async def run_memory_chat():
 
     print("Initializing chat...")
 
-    # Create MCP client and agent with memory enabled
-    client = MCPClient.from_config_file(config_file)
+    # Connect to the shared server if WEATHER_MCP_URL is set, else spawn one
+    client = await connect_client(config_file)
     llm = ChatGroq(model="llama-3.3-70b-versatile")
 
-    # Create agent with memory_enabled=True
-    agent = MCPAgent(
+    # History is managed by ConversationMemory and passed in per query, so
+    # the prompt stays within a token budget however long the session runs
+    agent = use_cached_tools(MCPAgent(
         llm=llm,
         client=client,
         max_steps=15,
-        memory_enabled=True,  # Enable built-in conversation memory
+        memory_enabled=False,
+    ))
+    memory = ConversationMemory(
+        llm=llm,
+        token_budget=int(os.getenv("MEMORY_TOKEN_BUDGET", "1500")),
+        keep_turns=int(os.getenv("MEMORY_KEEP_TURNS", "4")),
     )
 
+    async def ask_agent(query):
+        return agent_answer(await agent.run(query, external_history=memory.messages()))
+
+    # Simple weather/alerts/compare questions go straight to the MCP tools;
+    # everything else goes through the agent's LLM loop
+    session = next(iter(client.get_all_active_sessions().values()))
+    router = Router(tool_handlers(session_tool_caller(session)), fallback=ask_agent, cache=AnswerCache())
+
     print("\n===== Interactive MCP Chat =====")
     print("Type 'exit' or 'quit' to end the conversation")
     print("Type 'clear' to clear conversation history")
+    print("Type 'stats' to show routing and memory metrics")
     print("==================================\n")
 
     try:
         # Main chat loop
         while True:
             # Get user input
-            user_input = input("\nYou: ")
+            # Read input off the loop so memory compaction can run meanwhile
+            user_input = await asyncio.to_thread(input, "\nYou: ")
 
             # Check for exit command
             if user_input.lower() in ["exit", "quit"]:
                 print("Ending conversation...")
                 break
 
+            if user_input.lower() == "stats":
+                print(router.metrics())
+                print(memory.stats())
+                continue
+
             # Check for clear history command
             if user_input.lower() == "clear":
-                agent.clear_conversation_history()
+                memory.clear()
                 print("Conversation history cleared.")
                 continue
 
@@ -55,9 +88,15 @@ async def run_memory_chat():
             print("\nAssistant: ", end="", flush=True)
 
             try:
-                # Run the agent with the user input (memory handling is automatic)
-                response = await agent.run(user_input)
-                print(response)
+                await memory.settle()
+                prompt_tokens = memory.record_prompt(user_input)
+                result = await router.handle(user_input)
+                print(result.answer)
+                print(f"\n[{result.route}{' · cached' if result.cached else ''} · {result.seconds:.2f}s · ~{prompt_tokens} prompt tokens]")
+
+                # Remember the exchange; older turns are summarized after we answer
+                memory.add_turn(user_input, result.answer)
+                memory.compact_in_background()
 
             except Exception as e:
                 print(f"\nError: {e}")
@@ -68,5 +107,113 @@ async def run_memory_chat():
             await client.close_all_sessions()
 
 
+def _read_queries(source):
+    """Yield (id, query) from JSONL lines: {"id": ..., "query": ...} or a bare string."""
+    for n, line in enumerate(source, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError:
+            item = line  # plain text line
+        if isinstance(item, dict):
+            yield item.get("id", n), item.get("query", "")
+        else:
+            yield n, str(item)
+
+
+async def run_batch(source, output, concurrency=4, config_file="server/weather.json"):
+    """Answer JSONL queries concurrently and stream JSONL results with timings.
+
+    Up to ``concurrency`` queries run at once. They share one MCP connection
+    and a pool of that many agents (one agent runs one query at a time).
+    Fast-path queries skip the agents entirely.
+    """
+    load_dotenv()
+    client = await connect_client(config_file)
+    llm = ChatGroq(model="llama-3.3-70b-versatile")
+    session = next(iter(client.get_all_active_sessions().values()))
+    router = Router(tool_handlers(session_tool_caller(session)), cache=AnswerCache())
+
+    agents: asyncio.Queue = asyncio.Queue()
+    for _ in range(concurrency):
+        agents.put_nowait(use_cached_tools(MCPAgent(llm=llm, client=client, max_steps=15, memory_enabled=False)))
+
+    async def ask_agent(query):
+        agent = await agents.get()
+        try:
+            return agent_answer(await agent.run(query))
+        finally:
+            agents.put_nowait(agent)
+
+    pending: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    latencies, errors = [], 0
+    started = time.perf_counter()
+
+    async def worker():
+        nonlocal errors
+        while True:
+            item = await pending.get()
+            if item is None:
+                return
+            query_id, query = item
+            start = time.perf_counter()
+            record = {"id": query_id, "query": query}
+            try:
+                result = await router.handle(query, fallback=ask_agent)
+                record.update(route=result.route, cached=result.cached, ok=result.ok, answer=result.answer)
+            except Exception as e:
+                errors += 1
+                record.update(route=None, error=str(e))
+            record["seconds"] = round(time.perf_counter() - start, 3)
+            latencies.append(record["seconds"])
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    try:
+        # Reading blocks on stdin/file I/O, so each line is read in a thread;
+        # queries start as soon as they arrive
+        queries = _read_queries(source)
+        while (item := await asyncio.to_thread(next, queries, None)) is not None:
+            await pending.put(item)
+        for _ in workers:
+            await pending.put(None)
+        await asyncio.gather(*workers)
+    finally:
+        await client.close_all_sessions()
+
+    wall = time.perf_counter() - started
+    latencies.sort()
+    summary = {
+        "queries": len(latencies),
+        "errors": errors,
+        "wall_seconds": round(wall, 3),
+        "queries_per_second": round(len(latencies) / wall, 2) if wall else None,
+        "p50_seconds": latencies[len(latencies) // 2] if latencies else None,
+        "p95_seconds": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else None,
+        "routes": router.metrics()["routes"],
+    }
+    print(json.dumps(summary), file=sys.stderr)
+
+
 if __name__ == "__main__":
-    asyncio.run(run_memory_chat())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Weather MCP chat client")
+    parser.add_argument("--batch", metavar="FILE", help="Answer JSONL queries from FILE ('-' for stdin) instead of chatting")
+    parser.add_argument("--output", metavar="FILE", help="Write JSONL results to FILE (default stdout)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Queries in flight at once in batch mode")
+    args = parser.parse_args()
+
+    if args.batch:
+        source = sys.stdin if args.batch == "-" else open(args.batch, encoding="utf-8")
+        output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+        try:
+            asyncio.run(run_batch(source, output, concurrency=max(1, args.concurrency)))
+        finally:
+            if source is not sys.stdin:
+                source.close()
+            if output is not sys.stdout:
+                output.close()
+    else:
+        asyncio.run(run_memory_chat())
\ No newline at end of file
@@ -0,0 +1,158 @@
+"""Vectorized thermal-comfort metrics for hourly forecasts.
+
+Every function takes NumPy arrays of any (matching, broadcastable) shape -
+typically ``(locations, hours)`` - and computes all values in one pass of
+array operations; there are no per-hour Python loops, so a week of hourly
+data for dozens of locations costs about as much as one location.
+
+Units: temperatures in °C, relative humidity in %, wind speed in km/h at
+10 m (Open-Meteo's defaults). Missing values (NaN) propagate.
+
+Run ``python comfort.py --bench`` to time the batch path.
+"""
+
+import numpy as np
+
+# NWS heat index bands (°F 80/90/103/125) and Environment Canada wind chill
+# risk levels, in °C
+HEAT_CAUTION = 26.7
+HEAT_EXTREME_CAUTION = 32.2
+HEAT_DANGER = 39.4
+COLD_MODERATE = -10.0
+COLD_HIGH = -28.0
+
+
+def dew_point(temp_c: np.ndarray, rh: np.ndarray) -> np.ndarray:
+    """Dew point via the Magnus formula (accurate to ~0.1°C for -40..50°C)."""
+    a, b = 17.625, 243.04
+    gamma = np.log(np.clip(rh, 1e-3, 100) / 100) + a * temp_c / (b + temp_c)
+    return b * gamma / (a - gamma)
+
+
+def heat_index(temp_c: np.ndarray, rh: np.ndarray) -> np.ndarray:
+    """NWS heat index (Rothfusz regression with the NWS adjustments)."""
+    t = temp_c * 9 / 5 + 32
+    simple = 0.5 * (t + 61.0 + (t - 68.0) * 1.2 + rh * 0.094)
+    full = (
+        -42.379 + 2.04901523 * t + 10.14333127 * rh
+        - 0.22475541 * t * rh - 6.83783e-3 * t ** 2 - 5.481717e-2 * rh ** 2
+        + 1.22874e-3 * t ** 2 * rh + 8.5282e-4 * t * rh ** 2 - 1.99e-6 * t ** 2 * rh ** 2
+    )
+    # Dry heat lowers the index, very humid moderate heat raises it
+    dry = (rh < 13) & (t >= 80) & (t <= 112)
+    full = np.where(dry, full - (13 - rh) / 4 * np.sqrt(np.clip(17 - np.abs(t - 95), 0, None) / 17), full)
+    humid = (rh > 85) & (t >= 80) & (t <= 87)
+    full = np.where(humid, full + (rh - 85) / 10 * (87 - t) / 5, full)
+    hi_f = np.where((simple + t) / 2 >= 80, full, simple)
+    return (hi_f - 32) * 5 / 9
+
+
+def wind_chill(temp_c: np.ndarray, wind_kmh: np.ndarray) -> np.ndarray:
+    """North American wind chill index; equals the air temperature where it is undefined."""
+    v = np.power(np.clip(wind_kmh, 0, None), 0.16)
+    chill = 13.12 + 0.6215 * temp_c - 11.37 * v + 0.3965 * temp_c * v
+    return np.where((temp_c <= 10) & (wind_kmh > 4.8), chill, temp_c)
+
+
+def apparent_temperature(temp_c: np.ndarray, rh: np.ndarray, wind_kmh: np.ndarray) -> np.ndarray:
+    """Steadman apparent temperature (the Australian BoM shade formula)."""
+    vapour_hpa = rh / 100 * 6.105 * np.exp(17.27 * temp_c / (237.7 + temp_c))
+    return temp_c + 0.33 * vapour_hpa - 0.70 * (wind_kmh / 3.6) - 4.00
+
+
+def feels_like(temp_c: np.ndarray, rh: np.ndarray, wind_kmh: np.ndarray) -> np.ndarray:
+    """What to tell people: heat index when hot, wind chill when cold and windy, else apparent temperature."""
+    hot = temp_c >= HEAT_CAUTION
+    cold = (temp_c <= 10) & (wind_kmh > 4.8)
+    return np.where(
+        hot, heat_index(temp_c, rh),
+        np.where(cold, wind_chill(temp_c, wind_kmh), apparent_temperature(temp_c, rh, wind_kmh)),
+    )
+
+
+def comfort_metrics(temp_c, rh, wind_kmh) -> dict[str, np.ndarray]:
+    """All metrics for a batch, as float32 arrays shaped like the inputs."""
+    temp_c, rh, wind_kmh = (np.asarray(x, dtype=np.float64) for x in (temp_c, rh, wind_kmh))
+    metrics = {
+        "temperature": temp_c,
+        "dew_point": dew_point(temp_c, rh),
+        "heat_index": heat_index(temp_c, rh),
+        "wind_chill": wind_chill(temp_c, wind_kmh),
+        "apparent_temperature": apparent_temperature(temp_c, rh, wind_kmh),
+        "feels_like": feels_like(temp_c, rh, wind_kmh),
+    }
+    return {name: values.astype(np.float32) for name, values in metrics.items()}
+
+
+def daily_extremes(values: np.ndarray, hours_per_day: int = 24) -> tuple[np.ndarray, np.ndarray]:
+    """(daily min, daily max) of ``(..., hours)`` values, ignoring NaN; shape ``(..., days)``."""
+    days = values.shape[-1] // hours_per_day
+    by_day = values[..., : days * hours_per_day].reshape(*values.shape[:-1], days, hours_per_day)
+    with np.errstate(all="ignore"), _ignore_all_nan():
+        return np.nanmin(by_day, axis=-1), np.nanmax(by_day, axis=-1)
+
+
+def risk_windows(flags: np.ndarray) -> list[tuple[int, int]]:
+    """Contiguous runs of True in a 1-D mask as ``(start, end)`` index pairs, end exclusive."""
+    edges = np.diff(np.concatenate(([0], flags.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+class _ignore_all_nan:
+    """Silence numpy's 'All-NaN slice' warning for days without data."""
+
+    def __enter__(self):
+        import warnings
+
+        self._ctx = warnings.catch_warnings()
+        self._ctx.__enter__()
+        warnings.simplefilter("ignore", RuntimeWarning)
+
+    def __exit__(self, *exc):
+        return self._ctx.__exit__(*exc)
+
+
+def _bench(locations: int = 100, hours: int = 168, repeat: int = 20) -> None:
+    import time
+
+    rng = np.random.default_rng(0)
+    temp = rng.uniform(-30, 45, (locations, hours))
+    rh = rng.uniform(5, 100, (locations, hours))
+    wind = rng.uniform(0, 60, (locations, hours))
+
+    comfort_metrics(temp, rh, wind)  # warm up
+    started = time.perf_counter()
+    for _ in range(repeat):
+        metrics = comfort_metrics(temp, rh, wind)
+        daily_extremes(metrics["feels_like"])
+    vectorized = (time.perf_counter() - started) / repeat
+
+    # Same numbers one hour at a time, for comparison
+    sample = min(locations, 5)
+    started = time.perf_counter()
+    for i in range(sample):
+        for h in range(hours):
+            comfort_metrics(temp[i, h], rh[i, h], wind[i, h])
+    per_row = (time.perf_counter() - started) / sample * locations
+
+    values = locations * hours
+    print(f"{locations} locations x {hours} hours = {values} values")
+    print(f"  vectorized: {vectorized * 1000:8.2f} ms  ({values / vectorized / 1e6:.1f} M values/s)")
+    print(f"  per hour:   {per_row * 1000:8.2f} ms  (extrapolated from {sample} locations)")
+    print(f"  speedup:    {per_row / vectorized:8.0f}x")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Thermal-comfort metrics")
+    parser.add_argument("--bench", action="store_true", help="Time the batch computation")
+    parser.add_argument("--locations", type=int, default=100)
+    parser.add_argument("--hours", type=int, default=168)
+    args = parser.parse_args()
+    if args.bench:
+        _bench(args.locations, args.hours)
+    else:
+        parser.print_help()
@@ -0,0 +1,212 @@
+"""Append-only columnar store for every forecast the weather server fetches.
+
+Rows are partitioned by location and by the UTC day the forecast was issued:
+
+    <root>/<lat>_<lon>/<YYYY-MM-DD>/<kind>/<column>.bin
+
+Each column is a flat binary file that is only ever appended to, so a
+partition can be scanned with ``np.memmap`` without parsing anything.
+``kind`` is ``daily`` or ``hourly``. Every row carries two time columns:
+
+* ``issued`` - float64 unix seconds at which the forecast was fetched
+* ``valid``  - int64 target time (days since epoch for daily rows,
+  minutes since epoch for hourly rows, both in the location's local time)
+
+All weather variables are stored as float32 with NaN for missing values.
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+STORE_ROOT = Path(os.getenv("FORECAST_STORE_DIR", Path(__file__).parent / "forecast_store"))
+
+DAILY = "daily"
+HOURLY = "hourly"
+
+_TIME_COLUMNS = {"issued": np.float64, "valid": np.int64}
+_VALUE_DTYPE = np.float32
+_VALID_UNIT = {DAILY: "datetime64[D]", HOURLY: "datetime64[m]"}
+
+_write_lock = threading.Lock()
+
+
+def location_key(lat: float, lon: float) -> str:
+    """Partition key for a location, rounded to roughly one kilometre."""
+    return f"{lat:+07.2f}_{lon:+08.2f}"
+
+
+def _partition(lat: float, lon: float, day: str, kind: str) -> Path:
+    return STORE_ROOT / location_key(lat, lon) / day / kind
+
+
+def _column_dtype(name: str):
+    return _TIME_COLUMNS.get(name, _VALUE_DTYPE)
+
+
+def _row_count(partition: Path) -> int:
+    issued = partition / "issued.bin"
+    if not issued.exists():
+        return 0
+    return issued.stat().st_size // np.dtype(np.float64).itemsize
+
+
+def append(lat: float, lon: float, kind: str, times: list[str], values: dict[str, list], issued: float | None = None) -> int:
+    """Append one fetched forecast to the store.
+
+    Args:
+        lat: Latitude the forecast was requested for
+        lon: Longitude the forecast was requested for
+        kind: ``daily`` or ``hourly``
+        times: Open-Meteo time strings (``YYYY-MM-DD`` or ``YYYY-MM-DDTHH:MM``)
+        values: Variable name -> list of values aligned with ``times``
+        issued: Issue time in unix seconds (defaults to now)
+
+    Returns:
+        Number of rows written.
+    """
+    if not times:
+        return 0
+    issued = time.time() if issued is None else issued
+    n = len(times)
+    columns = {
+        "issued": np.full(n, issued, dtype=np.float64),
+        "valid": np.array(times, dtype=_VALID_UNIT[kind]).astype(np.int64),
+    }
+    for name, vals in values.items():
+        arr = np.array(vals[:n], dtype=_VALUE_DTYPE)
+        if len(arr) < n:
+            arr = np.concatenate([arr, np.full(n - len(arr), np.nan, dtype=_VALUE_DTYPE)])
+        columns[name] = arr
+
+    day = time.strftime("%Y-%m-%d", time.gmtime(issued))
+    partition = _partition(lat, lon, day, kind)
+    with _write_lock:
+        partition.mkdir(parents=True, exist_ok=True)
+        existing_rows = _row_count(partition)
+        existing = {p.stem for p in partition.glob("*.bin")}
+        # Keep every column file the same length: back-fill new columns and
+        # pad columns this batch doesn't carry.
+        for name in columns.keys() - existing:
+            if existing_rows and name not in _TIME_COLUMNS:
+                with open(partition / f"{name}.bin", "ab") as f:
+                    f.write(np.full(existing_rows, np.nan, dtype=_VALUE_DTYPE).tobytes())
+        for name in existing - columns.keys():
+            columns[name] = np.full(n, np.nan, dtype=_VALUE_DTYPE)
+        for name, arr in columns.items():
+            with open(partition / f"{name}.bin", "ab") as f:
+                f.write(arr.tobytes())
+    return n
+
+
+def _read_column(partition: Path, name: str, rows: int) -> np.ndarray:
+    path = partition / f"{name}.bin"
+    dtype = _column_dtype(name)
+    if not path.exists() or rows == 0:
+        return np.full(rows, np.nan, dtype=dtype) if dtype is _VALUE_DTYPE else np.zeros(rows, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(rows,))
+
+
+def scan(lat: float, lon: float, kind: str, columns: list[str], since: float | None = None) -> dict[str, np.ndarray]:
+    """Read columns for a location across all partitions issued since ``since``.
+
+    Partitions are pruned by issue day before any file is opened; the
+    returned arrays always include ``issued`` and ``valid``.
+    """
+    loc_dir = STORE_ROOT / location_key(lat, lon)
+    wanted = ["issued", "valid"] + [c for c in columns if c not in _TIME_COLUMNS]
+    parts = {name: [] for name in wanted}
+    if loc_dir.is_dir():
+        first_day = time.strftime("%Y-%m-%d", time.gmtime(since)) if since is not None else ""
+        for day_dir in sorted(loc_dir.iterdir()):
+            if day_dir.name < first_day:
+                continue
+            partition = day_dir / kind
+            # Use the shortest column so a partition caught mid-append is
+            # still read as a consistent set of rows.
+            rows = min(
+                [_row_count(partition)]
+                + [(partition / f"{c}.bin").stat().st_size // np.dtype(_column_dtype(c)).itemsize
+                   for c in wanted if (partition / f"{c}.bin").exists()]
+            )
+            for name in wanted:
+                parts[name].append(_read_column(partition, name, rows))
+
+    data = {
+        name: np.concatenate(chunks) if chunks else np.empty(0, dtype=_column_dtype(name))
+        for name, chunks in parts.items()
+    }
+    if since is not None and len(data["issued"]):
+        mask = data["issued"] >= since
+        data = {name: arr[mask] for name, arr in data.items()}
+    return data
+
+
+def _latest_per_valid(issued: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """Indices of the most recently issued row for each distinct valid time."""
+    if len(valid) == 0:
+        return np.empty(0, dtype=np.int64)
+    order = np.lexsort((issued, valid))
+    sorted_valid = valid[order]
+    last = np.append(np.flatnonzero(sorted_valid[1:] != sorted_valid[:-1]), len(order) - 1)
+    return order[last]
+
+
+def forecast_changes(lat: float, lon: float, variables: list[str], since_hours: float = 24) -> dict[str, np.ndarray]:
+    """Compare the latest daily forecast with the one current ``since_hours`` ago.
+
+    The baseline for each valid day is the latest forecast issued at or before
+    the cutoff; if nothing was stored that early, the oldest forecast in the
+    store is used instead.
+
+    Returns:
+        Dict with ``valid`` (datetime64[D]), ``baseline_issued``,
+        ``latest_issued`` and ``<variable>_before`` / ``<variable>_after``
+        arrays, one entry per valid day present in both forecasts.
+    """
+    cutoff = time.time() - since_hours * 3600
+    data = scan(lat, lon, DAILY, variables)
+    issued, valid = data["issued"], data["valid"]
+
+    latest = _latest_per_valid(issued, valid)
+    before = issued <= cutoff
+    if before.any():
+        base_idx = np.flatnonzero(before)
+        baseline = base_idx[_latest_per_valid(issued[base_idx], valid[base_idx])]
+    else:
+        # Oldest issue per valid day: latest-per-valid on negated issue time.
+        baseline = _latest_per_valid(-issued, valid)
+
+    days, li, bi = np.intersect1d(valid[latest], valid[baseline], return_indices=True)
+    latest, baseline = latest[li], baseline[bi]
+    result = {
+        "valid": days.astype("datetime64[D]"),
+        "baseline_issued": issued[baseline],
+        "latest_issued": issued[latest],
+    }
+    for name in variables:
+        result[f"{name}_before"] = data[name][baseline]
+        result[f"{name}_after"] = data[name][latest]
+    return result
+
+
+def recorded_daily(lat: float, lon: float, variables: list[str], days: int = 7) -> dict[str, np.ndarray]:
+    """Best stored estimate for each of the last ``days`` days (including today).
+
+    For each valid day the most recently issued forecast wins, which is the
+    one fetched closest to (or on) that day.
+    """
+    today = np.datetime64(time.strftime("%Y-%m-%d"), "D").astype(np.int64)
+    # A forecast for day D can have been issued up to ~16 days earlier.
+    data = scan(lat, lon, DAILY, variables, since=time.time() - (days + 16) * 86400)
+    in_range = (data["valid"] > today - days) & (data["valid"] <= today)
+    idx = np.flatnonzero(in_range)
+    idx = idx[_latest_per_valid(data["issued"][idx], data["valid"][idx])]
+
+    result = {"valid": data["valid"][idx].astype("datetime64[D]"), "issued": data["issued"][idx]}
+    for name in variables:
+        result[name] = data[name][idx]
+    return result
@@ -0,0 +1,186 @@
+"""Central refresh and change notification for subscribable MCP resources.
+
+Clients subscribe to a resource URI once instead of polling tools. A single
+background task re-reads every subscribed URI on an interval, hashes the
+content and sends ``notifications/resources/updated`` to the subscribed
+sessions only when the hash changes. Reads of a subscribed URI are served
+from the last refreshed content, so any number of dashboards watching the
+same state cost one upstream fetch per interval.
+
+A loader signals a failed fetch by raising ``ResourceUnavailable``: the
+last good copy is kept and no notification is sent, so a transient outage is
+invisible to subscribers. A session's subscriptions are dropped when its
+connection closes, so nobody's URIs are polled after they left.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable
+
+from mcp.server.lowlevel.server import Server
+
+logger = logging.getLogger(__name__)
+
+Loader = Callable[[str], Awaitable[str]]
+
+# Sessions that subscribed on the connection being served (see install)
+_connection_sessions: ContextVar[set | None] = ContextVar("connection_sessions", default=None)
+
+
+class ResourceUnavailable(Exception):
+    """Raised by a loader when the upstream could not provide the content."""
+
+
+class ResourceWatcher:
+    """Track subscriptions per URI and push updates when content changes."""
+
+    def __init__(self, loader: Loader, interval: float = 300.0, accepts: Callable[[str], bool] | None = None):
+        """
+        Args:
+            loader: Coroutine function that fetches fresh content for a URI;
+                raises on failure
+            interval: Seconds between refreshes of subscribed URIs
+            accepts: Predicate for URIs that may be subscribed to; others are
+                rejected instead of being polled (default: any URI)
+        """
+        self.loader = loader
+        self.interval = interval
+        self.accepts = accepts
+        self._subscribers: dict[str, set[Any]] = {}
+        self._content: dict[str, str] = {}
+        self._digest: dict[str, str] = {}
+        self._fetched_at: dict[str, float] = {}
+        self._task: asyncio.Task | None = None
+
+    @staticmethod
+    def digest(content: str) -> str:
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    async def read(self, uri: str) -> str:
+        """Return content for a URI, from the refresh cache when subscribed."""
+        if uri in self._subscribers and uri in self._content:
+            if time.monotonic() - self._fetched_at[uri] < self.interval * 2:
+                return self._content[uri]
+        try:
+            content = await self.loader(uri)
+        except ResourceUnavailable as e:
+            # Serve the last good copy through an outage; the error text otherwise
+            return self._content.get(uri, str(e))
+        if uri in self._subscribers:
+            self._store(uri, content)
+        return content
+
+    def _store(self, uri: str, content: str) -> bool:
+        """Cache content for a URI; return True if it differs from the last copy."""
+        digest = self.digest(content)
+        changed = self._digest.get(uri) not in (None, digest)
+        self._content[uri] = content
+        self._digest[uri] = digest
+        self._fetched_at[uri] = time.monotonic()
+        return changed
+
+    async def subscribe(self, uri: str, session: Any) -> None:
+        if self.accepts is not None and not self.accepts(uri):
+            raise ValueError(f"Unknown resource: {uri}")
+        self._subscribers.setdefault(uri, set()).add(session)
+        if uri not in self._content:
+            try:
+                self._store(uri, await self.loader(uri))
+            except Exception as e:
+                logger.warning("Initial load of %s failed: %s", uri, e)
+        self._ensure_running()
+
+    async def unsubscribe(self, uri: str, session: Any) -> None:
+        sessions = self._subscribers.get(uri)
+        if sessions is None:
+            return
+        sessions.discard(session)
+        if not sessions:
+            self._forget(uri)
+
+    def drop_session(self, session: Any) -> None:
+        """Remove every subscription held by a session that went away."""
+        for uri in [uri for uri, sessions in self._subscribers.items() if session in sessions]:
+            self._subscribers[uri].discard(session)
+            if not self._subscribers[uri]:
+                self._forget(uri)
+
+    def _forget(self, uri: str) -> None:
+        for table in (self._subscribers, self._content, self._digest, self._fetched_at):
+            table.pop(uri, None)
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while self._subscribers:
+            await asyncio.sleep(self.interval)
+            await self.refresh()
+
+    async def refresh(self) -> None:
+        """Re-fetch every subscribed URI concurrently and notify on change."""
+        uris = list(self._subscribers)
+        results = await asyncio.gather(*(self.loader(uri) for uri in uris), return_exceptions=True)
+        for uri, content in zip(uris, results):
+            if uri not in self._subscribers:
+                continue  # unsubscribed while we were fetching
+            if isinstance(content, BaseException):
+                logger.warning("Refresh of %s failed: %s", uri, content)
+                continue
+            if self._store(uri, content):
+                await self._notify(uri)
+
+    async def _notify(self, uri: str) -> None:
+        for session in list(self._subscribers.get(uri, ())):
+            try:
+                await session.send_resource_updated(uri)
+            except Exception:
+                # The client went away; stop sending it updates
+                self._subscribers[uri].discard(session)
+        if not self._subscribers.get(uri):
+            self._forget(uri)
+
+    def install(self, server: Server) -> None:
+        """Register subscribe/unsubscribe handlers and advertise the capability."""
+
+        @server.subscribe_resource()
+        async def handle_subscribe(uri) -> None:
+            session = server.request_context.session
+            await self.subscribe(str(uri), session)
+            connection = _connection_sessions.get()
+            if connection is not None:
+                connection.add(session)
+
+        @server.unsubscribe_resource()
+        async def handle_unsubscribe(uri) -> None:
+            await self.unsubscribe(str(uri), server.request_context.session)
+
+        get_capabilities = server.get_capabilities
+
+        def get_capabilities_with_subscribe(*args, **kwargs):
+            capabilities = get_capabilities(*args, **kwargs)
+            if capabilities.resources is not None:
+                capabilities.resources.subscribe = True
+            return capabilities
+
+        server.get_capabilities = get_capabilities_with_subscribe
+
+        # Server.run serves one connection and its request handlers run in
+        # tasks it starts, so they see the set created here
+        run = server.run
+
+        async def run_and_drop_sessions(*args, **kwargs):
+            sessions: set = set()
+            token = _connection_sessions.set(sessions)
+            try:
+                return await run(*args, **kwargs)
+            finally:
+                _connection_sessions.reset(token)
+                for session in sessions:
+                    self.drop_session(session)
+
+        server.run = run_and_drop_sessions
@@ -1,12 +1,34 @@
 from typing import Any
-import httpx
+import asyncio
+import base64
+import datetime
+import json
+import math
+import os
+import re
+import sys
+from pathlib import Path
+from urllib.parse import quote
 from mcp.server.fastmcp import FastMCP
 
+import numpy as np
+
+# Modules shared with the Docker server live in mcpserver/, which the image ships alone
+sys.path.append(str(Path(__file__).resolve().parent.parent / "mcpserver"))
+
+import comfort
+import forecast_store
+import upstream
+from subscriptions import ResourceUnavailable, ResourceWatcher
+from tool_schema import publish_tool_schema
+from upstream import DeadlineExceeded, with_deadline
+
 # Initialize FastMCP server
 mcp = FastMCP("weather")
 
 # Constants
-NWS_API_BASE = "https://api.weather.gov"
+# Overridable to point at a local stub for load tests (mcpserver/upstream_stub.py)
+NWS_API_BASE = os.getenv("NWS_API_BASE", "https://api.weather.gov")
 USER_AGENT = "weather-app/1.0"
 
 
@@ -16,13 +38,12 @@ async def make_nws_request(url: str) -> dict[str, Any] | None:
         "User-Agent": USER_AGENT,
         "Accept": "application/geo+json"
     }
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(url, headers=headers, timeout=30.0)
-            response.raise_for_status()
-            return response.json()
-        except Exception:
-            return None
+    try:
+        return await upstream.fetch_json(url, headers=headers, max_timeout=30.0)
+    except DeadlineExceeded:
+        raise
+    except Exception:
+        return None
         
 def format_alert(feature: dict) -> str:
     """Format an alert feature into a readable string."""
@@ -36,6 +57,7 @@ def format_alert(feature: dict) -> str:
         """
 
 @mcp.tool()
+@with_deadline
 async def get_alerts(state: str) -> str:
     """Get weather alerts for a US state.
 
@@ -56,10 +78,11 @@ async def get_alerts(state: str) -> str:
 
 # --- Global Weather Support (Open-Meteo) ---
 
-OPEN_METEO_GEO_URL = "https://geocoding-api.open-meteo.com/v1/search"
-OPEN_METEO_API_URL = "https://api.open-meteo.com/v1/forecast"
+OPEN_METEO_GEO_URL = os.getenv("OPEN_METEO_GEO_URL", "https://geocoding-api.open-meteo.com/v1/search")
+OPEN_METEO_API_URL = os.getenv("OPEN_METEO_API_URL", "https://api.open-meteo.com/v1/forecast")
 
 @mcp.tool()
+@with_deadline
 async def get_coordinates(city_name: str) -> str:
     """Get latitude and longitude for a city name.
     
@@ -69,25 +92,24 @@ async def get_coordinates(city_name: str) -> str:
     url = f"{OPEN_METEO_GEO_URL}?name={city_name}&count=1&language=en&format=json"
     headers = {"User-Agent": USER_AGENT}
     
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(url, headers=headers, timeout=10.0)
-            data = response.json()
-            
-            if "results" not in data or not data["results"]:
-                return f"Could not find coordinates for {city_name}"
-                
-            result = data["results"][0]
-            name = result.get("name")
-            country = result.get("country")
-            lat = result.get("latitude")
-            lon = result.get("longitude")
+    try:
+        data = await upstream.fetch_json(url, headers=headers, max_timeout=10.0, check_status=False)
+        
+        if "results" not in data or not data["results"]:
+            return f"Could not find coordinates for {city_name}"
             
-            return f"Found {name}, {country}: Latitude {lat}, Longitude {lon}"
-        except Exception as e:
-            return f"Error fetching coordinates: {str(e)}"
+        result = data["results"][0]
+        name = result.get("name")
+        country = result.get("country")
+        lat = result.get("latitude")
+        lon = result.get("longitude")
+        
+        return f"Found {name}, {country}: Latitude {lat}, Longitude {lon}"
+    except Exception as e:
+        return f"Error fetching coordinates: {str(e)}"
 
 @mcp.tool()
+@with_deadline
 async def get_global_forecast(latitude: Any, longitude: Any) -> str:
     """Get global weather forecast for coordinates.
     
@@ -101,50 +123,557 @@ async def get_global_forecast(latitude: Any, longitude: Any) -> str:
     except ValueError:
         return f"Error: Latitude and Longitude must be numbers. Received: {latitude}, {longitude}"
 
-    # Fetch daily forecast (max/min temp, rain, wind, uv, sunrise/set)
-    url = f"{OPEN_METEO_API_URL}?latitude={lat}&longitude={lon}&daily=temperature_2m_max,temperature_2m_min,precipitation_sum,weather_code,wind_speed_10m_max,uv_index_max,sunrise,sunset&timezone=auto"
+    # Fetch daily forecast (max/min temp, rain, wind, uv, sunrise/set) plus
+    # hourly temperature/rain so the local forecast store gets both
+    url = f"{OPEN_METEO_API_URL}?latitude={lat}&longitude={lon}&daily=temperature_2m_max,temperature_2m_min,precipitation_sum,weather_code,wind_speed_10m_max,uv_index_max,sunrise,sunset&hourly=temperature_2m,precipitation&timezone=auto"
     headers = {"User-Agent": USER_AGENT}
     
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(url, headers=headers, timeout=10.0)
-            data = response.json()
+    try:
+        data = await upstream.fetch_json(url, headers=headers, max_timeout=10.0, check_status=False)
+        
+        if "daily" not in data:
+            return "Could not fetch global forecast data."
+
+        record_forecast(lat, lon, data)
+
+        daily = data["daily"]
+        times = daily["time"]
+        max_temps = daily["temperature_2m_max"]
+        min_temps = daily["temperature_2m_min"]
+        precip = daily["precipitation_sum"]
+        wind = daily.get("wind_speed_10m_max", [])
+        uv = daily.get("uv_index_max", [])
+        sunrise = daily.get("sunrise", [])
+        sunset = daily.get("sunset", [])
+        
+        forecasts = []
+        for i in range(min(5, len(times))): # Next 5 days
+            # Extract time only from sunrise/sunset (YYYY-MM-DDTHH:MM)
+            sr_time = sunrise[i].split("T")[1] if i < len(sunrise) else "N/A"
+            ss_time = sunset[i].split("T")[1] if i < len(sunset) else "N/A"
+            wind_speed = wind[i] if i < len(wind) else "N/A"
+            uv_index = uv[i] if i < len(uv) else "N/A"
             
-            if "daily" not in data:
-                return "Could not fetch global forecast data."
-                
-            daily = data["daily"]
-            times = daily["time"]
-            max_temps = daily["temperature_2m_max"]
-            min_temps = daily["temperature_2m_min"]
-            precip = daily["precipitation_sum"]
-            wind = daily.get("wind_speed_10m_max", [])
-            uv = daily.get("uv_index_max", [])
-            sunrise = daily.get("sunrise", [])
-            sunset = daily.get("sunset", [])
+            forecasts.append(
+                f"--- Date: {times[i]} ---\n"
+                f"* 🌡️ Temp: Max {max_temps[i]}°C / Min {min_temps[i]}°C\n"
+                f"* 🌧️ Precip: {precip[i]}mm\n"
+                f"* 💨 Wind: {wind_speed} km/h\n"
+                f"* ☀️ UV Index: {uv_index}\n"
+                f"* 🌅 Sun: Rise {sr_time} / Set {ss_time}\n"
+            )
             
-            forecasts = []
-            for i in range(min(5, len(times))): # Next 5 days
-                # Extract time only from sunrise/sunset (YYYY-MM-DDTHH:MM)
-                sr_time = sunrise[i].split("T")[1] if i < len(sunrise) else "N/A"
-                ss_time = sunset[i].split("T")[1] if i < len(sunset) else "N/A"
-                wind_speed = wind[i] if i < len(wind) else "N/A"
-                uv_index = uv[i] if i < len(uv) else "N/A"
-                
-                forecasts.append(
-                    f"--- Date: {times[i]} ---\n"
-                    f"* 🌡️ Temp: Max {max_temps[i]}°C / Min {min_temps[i]}°C\n"
-                    f"* 🌧️ Precip: {precip[i]}mm\n"
-                    f"* 💨 Wind: {wind_speed} km/h\n"
-                    f"* ☀️ UV Index: {uv_index}\n"
-                    f"* 🌅 Sun: Rise {sr_time} / Set {ss_time}\n"
-                )
-                
-            return "\n\n".join(forecasts)
-        except Exception as e:
-            return f"Error fetching global forecast: {str(e)}"
+        return "\n\n".join(forecasts)
+    except Exception as e:
+        return f"Error fetching global forecast: {str(e)}"
+
+# --- Multi-City Comparison ---
+
+COMPARE_CONCURRENCY = int(os.getenv("COMPARE_CONCURRENCY", "4"))
+MAX_COMPARE_CITIES = 10
+
+async def _city_day(city_name: str, day: int, semaphore: asyncio.Semaphore) -> tuple[str, dict | None]:
+    """Geocode a city and fetch its daily forecast; (display name, values for ``day`` days ahead)."""
+    headers = {"User-Agent": USER_AGENT}
+    async with semaphore:
+        try:
+            geo = await upstream.fetch_json(
+                f"{OPEN_METEO_GEO_URL}?name={quote(city_name)}&count=1&language=en&format=json",
+                headers=headers, max_timeout=10.0, check_status=False,
+            )
+            if not geo.get("results"):
+                return city_name, None
+            place = geo["results"][0]
+            lat, lon = place["latitude"], place["longitude"]
+            data = await upstream.fetch_json(
+                f"{OPEN_METEO_API_URL}?latitude={lat}&longitude={lon}&daily=temperature_2m_max,temperature_2m_min,precipitation_sum,wind_speed_10m_max,uv_index_max&timezone=auto",
+                headers=headers, max_timeout=10.0, check_status=False,
+            )
+        except DeadlineExceeded:
+            raise
+        except Exception:
+            return city_name, None
+    if "daily" not in data:
+        return city_name, None
+    record_forecast(lat, lon, data)
+    name = f"{place.get('name')}, {place.get('country')}" if place.get("country") else place.get("name")
+    return name, {key: values[day] for key, values in data["daily"].items() if len(values) > day}
+
+@mcp.tool()
+@with_deadline
+async def compare_cities(cities: Any, day: Any = 0) -> str:
+    """Compare today's (or a later day's) weather in several cities side by side.
+
+    Looks up every city concurrently, so use this instead of calling
+    get_coordinates and get_global_forecast once per city.
+
+    Args:
+        cities: City names, as a list or a comma-separated string (e.g. "Delhi, Mumbai, Pune")
+        day: Days ahead, 0 = today, 1 = tomorrow (max 6)
+    """
+    try:
+        day = min(max(int(day), 0), 6)
+    except (TypeError, ValueError):
+        return f"Error: day must be a number of days ahead (0-6). Received: {day}"
+    if isinstance(cities, str):
+        cities = [c.strip() for c in cities.split(",")]
+    names = [str(c).strip() for c in cities if str(c).strip()]
+    names, omitted = names[:MAX_COMPARE_CITIES], names[MAX_COMPARE_CITIES:]
+    if not names:
+        return "Error: Provide at least one city name."
+
+    semaphore = asyncio.Semaphore(COMPARE_CONCURRENCY)
+    results = await asyncio.gather(*(_city_day(name, day, semaphore) for name in names))
+
+    rows = [
+        f"| {name} | {today['temperature_2m_max']} | {today['temperature_2m_min']} | {today['precipitation_sum']} "
+        f"| {today.get('wind_speed_10m_max', 'N/A')} | {today.get('uv_index_max', 'N/A')} |"
+        for name, today in results if today
+    ]
+    missing = [name for name, today in results if not today]
+    if not rows:
+        return "Could not fetch weather for any of: " + ", ".join(missing)
+
+    date = next(today["time"] for _, today in results if today)
+    when = ("today", "tomorrow")[day] if day < 2 else f"{day} days ahead"
+    lines = [
+        f"Weather comparison for {when} ({date}):",
+        "| City | Max (°C) | Min (°C) | Precip (mm) | Wind (km/h) | UV |",
+        "|---|---|---|---|---|---|",
+        *rows,
+    ]
+    if missing:
+        lines.append(f"No data found for: {', '.join(missing)}")
+    if omitted:
+        lines.append(f"Only {MAX_COMPARE_CITIES} cities are compared at a time; left out: {', '.join(omitted)}")
+    return "\n".join(lines)
+
+# --- Comfort Metrics (heat index, wind chill, dew point) ---
+
+MAX_COMFORT_LOCATIONS = 20
+
+def _coordinate_list(value: Any) -> list[float]:
+    if isinstance(value, str):
+        value = value.split(",")
+    elif not isinstance(value, (list, tuple)):
+        value = [value]
+    return [float(v) for v in value if str(v).strip()]
+
+def _hourly_array(locations: list[dict], name: str) -> np.ndarray:
+    """(locations, hours) float array of one hourly variable; missing values are NaN."""
+    rows = [loc["hourly"].get(name) or [] for loc in locations]
+    hours = max(len(row) for row in rows)
+    out = np.full((len(rows), hours), np.nan)
+    for i, row in enumerate(rows):
+        out[i, :len(row)] = np.array(row, dtype=float)  # None -> nan
+    return out
+
+def _risk_lines(times: list[str], values: np.ndarray, levels: list[tuple[str, float]], above: bool, label: str) -> list[str]:
+    """One line per contiguous run of hours at or beyond the first level."""
+    with np.errstate(invalid="ignore"):
+        flags = values >= levels[0][1] if above else values <= levels[0][1]
+    lines = []
+    for start, end in comfort.risk_windows(flags):
+        window = values[start:end]
+        worst = float(np.nanmax(window) if above else np.nanmin(window))
+        level = [name for name, threshold in levels if (worst >= threshold if above else worst <= threshold)][-1]
+        last = times[end - 1].replace("T", " ")
+        lines.append(
+            f"  - ⚠️ {times[start].replace('T', ' ')} → {last[-5:] if last[:10] == times[start][:10] else last} "
+            f"({end - start}h): {label} {'up to' if above else 'down to'} {worst:.1f}°C, {level}"
+        )
+    return lines
+
+@mcp.tool()
+@with_deadline
+async def get_comfort_metrics(latitude: Any, longitude: Any, days: Any = 2) -> str:
+    """Get feels-like temperature, heat index, wind chill and dew point, with heat/cold risk periods.
+
+    Several locations can be checked in one call by passing lists (or
+    comma-separated strings) of equal length for latitude and longitude.
+
+    Args:
+        latitude: Latitude(s) of the location(s) (e.g. 28.61 or "28.61, 19.07")
+        longitude: Longitude(s) of the location(s) (e.g. 77.21 or "77.21, 72.88")
+        days: Number of forecast days to analyse, 1-7 (default 2)
+    """
+    try:
+        lats = _coordinate_list(latitude)
+        lons = _coordinate_list(longitude)
+        n_days = min(max(int(days), 1), 7)
+    except ValueError:
+        return f"Error: Latitude, Longitude and days must be numbers. Received: {latitude}, {longitude}, {days}"
+    if not lats or len(lats) != len(lons):
+        return f"Error: Provide the same number of latitudes and longitudes. Received: {latitude}, {longitude}"
+    if len(lats) > MAX_COMFORT_LOCATIONS:
+        return f"Error: At most {MAX_COMFORT_LOCATIONS} locations per call."
+
+    # One request for all locations; Open-Meteo answers with a list when given several
+    url = (
+        f"{OPEN_METEO_API_URL}?latitude={','.join(map(str, lats))}&longitude={','.join(map(str, lons))}"
+        f"&hourly=temperature_2m,relative_humidity_2m,wind_speed_10m&forecast_days={n_days}&timezone=auto"
+    )
+    headers = {"User-Agent": USER_AGENT}
+    try:
+        data = await upstream.fetch_json(url, headers=headers, max_timeout=10.0, check_status=False)
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        return f"Error fetching comfort metrics: {str(e)}"
+
+    locations = data if isinstance(data, list) else [data]
+    if len(locations) != len(lats) or any("hourly" not in loc for loc in locations):
+        return "Could not fetch hourly forecast data."
+    for lat, lon, loc in zip(lats, lons, locations):
+        record_forecast(lat, lon, loc)
+
+    # Every metric for every location and hour in one vectorized pass
+    metrics = comfort.comfort_metrics(
+        _hourly_array(locations, "temperature_2m"),
+        _hourly_array(locations, "relative_humidity_2m"),
+        _hourly_array(locations, "wind_speed_10m"),
+    )
+    low, high = comfort.daily_extremes(metrics["feels_like"])
+    dew_low, dew_high = comfort.daily_extremes(metrics["dew_point"])
+    heat_levels = [("caution", comfort.HEAT_CAUTION), ("extreme caution", comfort.HEAT_EXTREME_CAUTION), ("danger", comfort.HEAT_DANGER)]
+    cold_levels = [("moderate frostbite risk", comfort.COLD_MODERATE), ("high frostbite risk", comfort.COLD_HIGH)]
+
+    sections = []
+    for i, (lat, lon, loc) in enumerate(zip(lats, lons, locations)):
+        times = loc["hourly"]["time"]
+        lines = [f"--- Location: {lat}, {lon} ---"]
+        for d in range(low.shape[1]):
+            if np.isnan(high[i, d]):
+                continue
+            lines.append(
+                f"* {times[d * 24][:10]}: Feels like {low[i, d]:.1f} to {high[i, d]:.1f}°C, "
+                f"dew point {dew_low[i, d]:.1f} to {dew_high[i, d]:.1f}°C"
+            )
+        n_hours = len(times)
+        risks = (
+            _risk_lines(times, metrics["heat_index"][i, :n_hours], heat_levels, True, "heat index")
+            + _risk_lines(times, metrics["wind_chill"][i, :n_hours], cold_levels, False, "wind chill")
+        )
+        lines.append("* Risk periods:" if risks else "* No heat or cold risk periods.")
+        lines.extend(risks)
+        sections.append("\n".join(lines))
+    return "\n\n".join(sections)
+
+# --- Area Forecast (gridded, for maps) ---
+
+AREA_VARIABLES = {
+    "precipitation_sum": "mm",
+    "precipitation_probability_max": "%",
+    "temperature_2m_max": "°C",
+    "temperature_2m_min": "°C",
+    "wind_speed_10m_max": "km/h",
+    "uv_index_max": "",
+}
+MAX_AREA_POINTS = int(os.getenv("MAX_AREA_POINTS", "400"))
+# Points per upstream request; Open-Meteo takes comma-separated coordinate lists
+AREA_CHUNK_SIZE = int(os.getenv("AREA_CHUNK_SIZE", "100"))
+MIN_AREA_RESOLUTION = 0.05
+
+def _parse_bbox(bbox: Any) -> tuple[float, float, float, float]:
+    """(south, west, north, east) from "south,west,north,east" or a 4-item list."""
+    parts = bbox.split(",") if isinstance(bbox, str) else list(bbox)
+    south, west, north, east = (float(p) for p in parts)
+    if not (-90 <= south < north <= 90 and -180 <= west < east <= 180):
+        raise ValueError("bounding box out of range")
+    return south, west, north, east
+
+def _grid_axis(start: float, stop: float, step: float) -> np.ndarray:
+    count = int(np.floor((stop - start) / step + 1e-9)) + 1
+    return np.round(start + step * np.arange(count), 4)
+
+async def _area_chunk(lats: np.ndarray, lons: np.ndarray, variable: str, day: int, semaphore: asyncio.Semaphore) -> tuple[list, str | None]:
+    """One multi-location request; (value per point, date), None where missing."""
+    url = (
+        f"{OPEN_METEO_API_URL}?latitude={','.join(map(str, lats))}&longitude={','.join(map(str, lons))}"
+        f"&daily={variable}&forecast_days={day + 1}&timezone=auto"
+    )
+    async with semaphore:
+        try:
+            data = await upstream.fetch_json(url, headers={"User-Agent": USER_AGENT}, max_timeout=10.0, check_status=False)
+        except DeadlineExceeded:
+            raise
+        except Exception:
+            return [None] * len(lats), None
+    locations = data if isinstance(data, list) else [data]
+    if len(locations) != len(lats):
+        return [None] * len(lats), None
+    values, date = [], None
+    for loc in locations:
+        daily = loc.get("daily") or {}
+        series = daily.get(variable) or []
+        values.append(series[day] if day < len(series) else None)
+        if date is None and day < len(daily.get("time") or []):
+            date = daily["time"][day]
+    return values, date
+
+@mcp.tool()
+@with_deadline
+async def get_area_forecast(bbox: Any, resolution: Any = 0.25, variable: str = "precipitation_sum", day: Any = 0) -> str:
+    """Get a daily forecast on a grid of points over a region, e.g. where it will rain tomorrow in a state.
+
+    One call covers the whole area (use it instead of many point forecasts).
+    Returns a text summary followed by an ```area-grid block holding the full
+    grid as base64 float32, which the app draws as a map; summarize the text
+    and do not repeat the block.
+
+    Args:
+        bbox: Bounding box "south,west,north,east" in degrees (e.g. "28.7,77.5,31.5,81.1" for Uttarakhand)
+        resolution: Grid spacing in degrees (default 0.25)
+        variable: One of precipitation_sum, precipitation_probability_max, temperature_2m_max, temperature_2m_min, wind_speed_10m_max, uv_index_max
+        day: Days ahead, 0 = today, 1 = tomorrow (max 6)
+    """
+    try:
+        south, west, north, east = _parse_bbox(bbox)
+        step = float(resolution)
+        if not math.isfinite(step):
+            raise ValueError("resolution must be finite")
+        step = max(step, MIN_AREA_RESOLUTION)
+        day = min(max(int(day), 0), 6)
+    except (TypeError, ValueError):
+        return f"Error: bbox must be 'south,west,north,east' in degrees and resolution/day numbers. Received: {bbox}, {resolution}, {day}"
+    if variable not in AREA_VARIABLES:
+        return f"Error: Unknown variable '{variable}'. Use one of: {', '.join(AREA_VARIABLES)}"
+
+    # Rows run north to south and columns west to east, like a map
+    lats = _grid_axis(south, north, step)[::-1]
+    lons = _grid_axis(west, east, step)
+    if lats.size * lons.size > MAX_AREA_POINTS:
+        coarser = np.ceil(step * np.sqrt(lats.size * lons.size / MAX_AREA_POINTS) * 20) / 20
+        while _grid_axis(south, north, coarser).size * _grid_axis(west, east, coarser).size > MAX_AREA_POINTS:
+            coarser += 0.05
+        return (
+            f"Error: {lats.size}×{lons.size} grid exceeds {MAX_AREA_POINTS} points; "
+            f"use a resolution of at least {coarser:.2f}°."
+        )
+    point_lats, point_lons = (a.ravel() for a in np.meshgrid(lats, lons, indexing="ij"))
+
+    semaphore = asyncio.Semaphore(COMPARE_CONCURRENCY)
+    chunks = await asyncio.gather(*(
+        _area_chunk(point_lats[i:i + AREA_CHUNK_SIZE], point_lons[i:i + AREA_CHUNK_SIZE], variable, day, semaphore)
+        for i in range(0, point_lats.size, AREA_CHUNK_SIZE)
+    ))
+    # Forecasts for grid points are not recorded: they would swamp the store
+    flat = [np.nan if v is None else v for values, _ in chunks for v in values]
+    grid = np.array(flat, dtype=np.float32).reshape(lats.size, lons.size)
+    date = next((d for _, d in chunks if d), None)
+    valid = ~np.isnan(grid)
+    if not valid.any():
+        return f"Could not fetch {variable} for this area."
+
+    units = AREA_VARIABLES[variable]
+    hi = np.unravel_index(np.nanargmax(grid), grid.shape)
+    lo = np.unravel_index(np.nanargmin(grid), grid.shape)
+    half_r, half_c = max(grid.shape[0] // 2, 1), max(grid.shape[1] // 2, 1)
+    with np.errstate(all="ignore"):
+        halves = {
+            "north": np.nanmean(grid[:half_r]), "south": np.nanmean(grid[-half_r:]),
+            "west": np.nanmean(grid[:, :half_c]), "east": np.nanmean(grid[:, -half_c:]),
+        }
+    lines = [
+        f"{variable} for {date} over lat {south} to {north}, lon {west} to {east} "
+        f"({lats.size}×{lons.size} grid at {step}°, {len(chunks)} upstream request{'s' if len(chunks) > 1 else ''}):",
+        f"* Max {grid[hi]:.1f}{units} at {lats[hi[0]]}, {lons[hi[1]]}; "
+        f"min {grid[lo]:.1f}{units} at {lats[lo[0]]}, {lons[lo[1]]}; mean {np.nanmean(grid):.1f}{units}",
+        "* Average by half: " + ", ".join(f"{side} {value:.1f}{units}" for side, value in halves.items()),
+    ]
+    if variable == "precipitation_sum":
+        lines.append(f"* Rain (≥1 mm) at {np.mean(grid[valid] >= 1.0) * 100:.0f}% of points")
+    elif variable == "precipitation_probability_max":
+        lines.append(f"* Rain chance ≥50% at {np.mean(grid[valid] >= 50) * 100:.0f}% of points")
+    if not valid.all():
+        lines.append(f"* No data for {int((~valid).sum())} of {grid.size} points")
+
+    payload = {
+        "variable": variable,
+        "units": units,
+        "date": date,
+        "bbox": [south, west, north, east],
+        "resolution": step,
+        "lats": lats.tolist(),
+        "lons": lons.tolist(),
+        "shape": list(grid.shape),
+        "dtype": "float32",  # little-endian, row-major; NaN where missing
+        "data": base64.b64encode(grid.astype("<f4").tobytes()).decode("ascii"),
+    }
+    lines.append(f"```area-grid\n{json.dumps(payload, separators=(',', ':'))}\n```")
+    return "\n".join(lines)
+
+# --- Local Forecast History (no upstream calls) ---
+
+STORED_VARIABLES = {
+    forecast_store.DAILY: ["temperature_2m_max", "temperature_2m_min", "precipitation_sum", "wind_speed_10m_max", "uv_index_max"],
+    forecast_store.HOURLY: ["temperature_2m", "precipitation", "relative_humidity_2m", "wind_speed_10m"],
+}
+
+def record_forecast(lat: float, lon: float, data: dict) -> None:
+    """Append a fetched Open-Meteo response to the local forecast store."""
+    try:
+        for kind in (forecast_store.DAILY, forecast_store.HOURLY):
+            block = data.get(kind)
+            if not block or "time" not in block:
+                continue
+            values = {
+                name: vals for name, vals in block.items()
+                if name in STORED_VARIABLES[kind]
+            }
+            forecast_store.append(lat, lon, kind, block["time"], values)
+    except Exception:
+        # Recording is best effort; never fail a forecast because of it
+        pass
+
+def _fmt_issued(ts: float) -> str:
+    return datetime.datetime.fromtimestamp(ts, datetime.timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+
+@mcp.tool()
+async def get_forecast_changes(latitude: Any, longitude: Any, since_hours: Any = 24) -> str:
+    """Show how the stored daily forecast for a location has changed over time.
+
+    Answers questions like "how has the forecast for Paris changed since
+    yesterday" from locally recorded forecasts, without calling any API.
+
+    Args:
+        latitude: Latitude of the location (e.g. 48.85)
+        longitude: Longitude of the location (e.g. 2.35)
+        since_hours: How far back to take the baseline forecast from (default 24)
+    """
+    try:
+        lat = float(latitude)
+        lon = float(longitude)
+        hours = float(since_hours)
+    except (TypeError, ValueError):
+        return f"Error: Latitude, Longitude and since_hours must be numbers. Received: {latitude}, {longitude}, {since_hours}"
+
+    variables = ["temperature_2m_max", "temperature_2m_min", "precipitation_sum"]
+    changes = forecast_store.forecast_changes(lat, lon, variables, since_hours=hours)
+    if not len(changes["valid"]):
+        return "No stored forecasts for this location yet. Fetch a forecast first with get_global_forecast."
+
+    # Only days that were actually re-forecast since the baseline
+    revised = changes["latest_issued"] > changes["baseline_issued"]
+    if not revised.any():
+        return f"Only one forecast stored for this period (issued {_fmt_issued(changes['latest_issued'].max())}); nothing to compare yet."
+    changes = {name: arr[revised] for name, arr in changes.items()}
+
+    lines = [
+        f"Forecast changes (baseline issued {_fmt_issued(changes['baseline_issued'].min())}, "
+        f"latest issued {_fmt_issued(changes['latest_issued'].max())}):"
+    ]
+    max_delta = changes["temperature_2m_max_after"] - changes["temperature_2m_max_before"]
+    min_delta = changes["temperature_2m_min_after"] - changes["temperature_2m_min_before"]
+    rain_delta = changes["precipitation_sum_after"] - changes["precipitation_sum_before"]
+    for i, day in enumerate(changes["valid"]):
+        lines.append(
+            f"--- Date: {day} ---\n"
+            f"* 🌡️ Max: {changes['temperature_2m_max_before'][i]:.1f} → {changes['temperature_2m_max_after'][i]:.1f}°C ({max_delta[i]:+.1f})\n"
+            f"* 🌡️ Min: {changes['temperature_2m_min_before'][i]:.1f} → {changes['temperature_2m_min_after'][i]:.1f}°C ({min_delta[i]:+.1f})\n"
+            f"* 🌧️ Precip: {changes['precipitation_sum_before'][i]:.1f} → {changes['precipitation_sum_after'][i]:.1f}mm ({rain_delta[i]:+.1f})"
+        )
+    return "\n\n".join(lines)
+
+@mcp.tool()
+async def get_forecast_history(latitude: Any, longitude: Any, days: Any = 7) -> str:
+    """Get recorded daily highs, lows and rain for the past days at a location.
+
+    Answers questions like "what were last week's highs" from locally recorded
+    forecasts (the latest forecast stored for each day), without calling any API.
+
+    Args:
+        latitude: Latitude of the location (e.g. 48.85)
+        longitude: Longitude of the location (e.g. 2.35)
+        days: Number of past days to include, today included (default 7)
+    """
+    try:
+        lat = float(latitude)
+        lon = float(longitude)
+        n_days = int(days)
+    except (TypeError, ValueError):
+        return f"Error: Latitude, Longitude and days must be numbers. Received: {latitude}, {longitude}, {days}"
+
+    variables = ["temperature_2m_max", "temperature_2m_min", "precipitation_sum"]
+    history = forecast_store.recorded_daily(lat, lon, variables, days=n_days)
+    if not len(history["valid"]):
+        return "No stored forecasts for this location in that period."
+
+    highs = history["temperature_2m_max"]
+    lines = [
+        f"Recorded forecasts for the last {n_days} days "
+        f"(highest {np.nanmax(highs):.1f}°C, average high {np.nanmean(highs):.1f}°C):"
+    ]
+    for i, day in enumerate(history["valid"]):
+        lines.append(
+            f"* {day}: Max {highs[i]:.1f}°C / Min {history['temperature_2m_min'][i]:.1f}°C, "
+            f"Precip {history['precipitation_sum'][i]:.1f}mm (issued {_fmt_issued(history['issued'][i])})"
+        )
+    return "\n".join(lines)
+
+# --- Subscribable Resources ---
+
+ALERTS_URI = re.compile(r"^weather://alerts/(?P<state>[A-Za-z]{2})$")
+FORECAST_URI = re.compile(r"^weather://forecast/(?P<lat>-?\d+(?:\.\d+)?),(?P<lon>-?\d+(?:\.\d+)?)$")
+# How the tools above report a failed upstream fetch
+TOOL_ERROR_PREFIXES = ("Error", "Unable to fetch", "Could not fetch")
+
+def is_weather_resource(uri: str) -> bool:
+    return bool(ALERTS_URI.match(uri) or FORECAST_URI.match(uri))
+
+async def load_resource(uri: str) -> str:
+    """Fetch fresh content for one of the weather:// resources."""
+    if match := ALERTS_URI.match(uri):
+        fetch = get_alerts(match["state"].upper())
+    elif match := FORECAST_URI.match(uri):
+        fetch = get_global_forecast(match["lat"], match["lon"])
+    else:
+        raise ValueError(f"Unknown resource: {uri}")
+    try:
+        content = await fetch
+    except Exception as e:
+        # A timed-out or failed fetch is an outage like an error answer
+        raise ResourceUnavailable(f"Error fetching {uri}: {e}") from e
+    if content.startswith(TOOL_ERROR_PREFIXES):
+        raise ResourceUnavailable(content)
+    return content
+
+# One watcher refreshes every subscribed resource for all sessions
+watcher = ResourceWatcher(
+    load_resource,
+    interval=float(os.getenv("RESOURCE_REFRESH_SECONDS", "300")),
+    accepts=is_weather_resource,
+)
+watcher.install(mcp._mcp_server)
+
+@mcp.resource("weather://alerts/{state}", mime_type="text/plain")
+async def alerts_resource(state: str) -> str:
+    """Active NWS alerts for a US state. Subscribe to be notified when they change."""
+    return await watcher.read(f"weather://alerts/{state}")
+
+@mcp.resource("weather://forecast/{lat},{lon}", mime_type="text/plain")
+async def forecast_resource(lat: str, lon: str) -> str:
+    """5-day global forecast for coordinates. Subscribe to be notified when it changes."""
+    return await watcher.read(f"weather://forecast/{lat},{lon}")
 
 @mcp.resource("echo://{message}")
 def echo_resource(message: str) -> str:
     """Echo a message as a resource"""
-    return f"Resource echo: {message}"
\ No newline at end of file
+    return f"Resource echo: {message}"
+
+
+# Lets clients reuse cached tool lists while the tool set is unchanged. Done at
+# import, after the last registration, because ``mcp run`` imports this module
+# and never runs the __main__ block below.
+publish_tool_schema(mcp)
+
+
+# Run the server
+if __name__ == "__main__":
+    # stdio (default) serves a single client that spawned us. "sse" or
+    # "streamable-http" runs one long-lived server that every client shares,
+    # listening on FASTMCP_HOST:FASTMCP_PORT (default 127.0.0.1:8000).
+    transport = os.getenv("WEATHER_MCP_TRANSPORT", "stdio")
+    if transport not in ("stdio", "sse", "streamable-http"):
+        raise ValueError(f"Unknown transport: {transport}")
+    mcp.run(transport=transport)
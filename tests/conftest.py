@@ -0,0 +1,15 @@
+"""Put the server and client code on ``sys.path`` the way they run.
+
+``server/weather.py`` and the Docker server import their modules by bare
+name from their own directories; ``weather_agent`` is imported as a package
+from the repo root.
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+for path in (ROOT / "server", ROOT / "mcpserver", ROOT):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
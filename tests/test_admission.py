@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+from admission import AdmissionController, Overloaded
+
+
+async def _call(controller, tool, session, order, release=None):
+    async with controller.admit(tool, session):
+        order.append(tool)
+        if release is not None:
+            await release.wait()
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_queued_calls_start_in_priority_order():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, queue_timeout=5)
+        order, release = [], asyncio.Event()
+        holder = asyncio.create_task(_call(controller, "get_forecast", "a", order, release))
+        await _settle()
+        waiters = [
+            asyncio.create_task(_call(controller, tool, "b", order))
+            for tool in ("get_coordinates", "some_other_tool", "get_alerts", "get_forecast")
+        ]
+        await _settle()
+        assert controller.metrics()["queued"] == 4
+        release.set()
+        await asyncio.gather(holder, *waiters)
+        return order
+
+    assert asyncio.run(scenario()) == ["get_forecast", "get_alerts", "get_forecast", "get_coordinates", "some_other_tool"]
+
+
+def test_full_queue_sheds_lowest_priority_waiter():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=5)
+        order, release = [], asyncio.Event()
+        holder = asyncio.create_task(_call(controller, "get_forecast", "a", order, release))
+        await _settle()
+        low = asyncio.create_task(_call(controller, "get_coordinates", "b", order))
+        await _settle()
+        high = asyncio.create_task(_call(controller, "get_alerts", "c", order))
+        await _settle()
+
+        with pytest.raises(Overloaded, match="displaced"):
+            await low
+        release.set()
+        await asyncio.gather(holder, high)
+        return order, controller.metrics()
+
+    order, metrics = asyncio.run(scenario())
+    assert order == ["get_forecast", "get_alerts"]
+    assert metrics["shed_by_tool"] == {"get_coordinates": 1}
+    assert metrics["running"] == 0 and metrics["queued"] == 0
+
+
+def test_full_queue_rejects_call_that_does_not_outrank_waiters():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=5)
+        order, release = [], asyncio.Event()
+        holder = asyncio.create_task(_call(controller, "get_forecast", "a", order, release))
+        await _settle()
+        queued = asyncio.create_task(_call(controller, "get_alerts", "b", order))
+        await _settle()
+
+        with pytest.raises(Overloaded, match="queue full"):
+            await _call(controller, "get_alerts", "c", order)
+        release.set()
+        await asyncio.gather(holder, queued)
+        return order
+
+    assert asyncio.run(scenario()) == ["get_forecast", "get_alerts"]
+
+
+def test_queue_wait_is_bounded():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, queue_timeout=0.05)
+        order, release = [], asyncio.Event()
+        holder = asyncio.create_task(_call(controller, "get_forecast", "a", order, release))
+        await _settle()
+        with pytest.raises(Overloaded, match="waited"):
+            await _call(controller, "get_alerts", "b", order)
+        release.set()
+        await holder
+        return controller.metrics()
+
+    metrics = asyncio.run(scenario())
+    assert metrics["shed_total"] == 1 and metrics["running"] == 0
+
+
+def test_per_session_limit_lets_other_sessions_through():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=4, per_session=1, queue_timeout=5)
+        order, release = [], asyncio.Event()
+        first = asyncio.create_task(_call(controller, "get_forecast", "a", order, release))
+        await _settle()
+        same_session = asyncio.create_task(_call(controller, "get_alerts", "a", order))
+        other_session = asyncio.create_task(_call(controller, "get_coordinates", "b", order))
+        await _settle()
+        assert order == ["get_forecast", "get_coordinates"]
+        release.set()
+        await asyncio.gather(first, same_session, other_session)
+        return order
+
+    assert asyncio.run(scenario()) == ["get_forecast", "get_coordinates", "get_alerts"]
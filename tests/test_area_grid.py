@@ -0,0 +1,52 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+import weather
+from weather_agent.area_grid import AreaGrid, extract_payloads, strip_grids
+
+
+@pytest.fixture
+def fake_upstream(monkeypatch):
+    async def area_chunk(lats, lons, variable, day, semaphore):
+        # value encodes the point; the north-west corner has no data
+        values = [None if (a, o) == (11.0, 20.0) else a * 100 + o for a, o in zip(lats.tolist(), lons.tolist())]
+        return values, "2026-10-20"
+
+    monkeypatch.setattr(weather, "_area_chunk", area_chunk)
+
+
+def test_tool_output_round_trips_through_decoder(fake_upstream):
+    text = asyncio.run(weather.get_area_forecast("10,20,11,21", resolution=0.5, variable="temperature_2m_max", day=1))
+
+    payloads = extract_payloads(text)
+    assert len(payloads) == 1
+    grid = AreaGrid.from_payload(payloads[0])
+    assert (grid.variable, grid.units, grid.date) == ("temperature_2m_max", "°C", "2026-10-20")
+    assert grid.lats.tolist() == [11.0, 10.5, 10.0]  # north to south
+    assert grid.lons.tolist() == [20.0, 20.5, 21.0]
+
+    expected = grid.lats[:, None] * 100 + grid.lons[None, :]
+    expected[0, 0] = np.nan
+    np.testing.assert_allclose(grid.values, expected.astype(np.float32))
+
+    records = grid.records()
+    assert len(records) == 8
+    assert records[0] == {"lat": 11.0, "lon": 20.5, "value": 1120.5}
+
+    summary = strip_grids(text)
+    assert "area-grid" not in summary
+    assert "No data for 1 of 9 points" in summary
+
+
+def test_extract_payloads_skips_malformed_blocks():
+    text = "```area-grid\nnot json\n```\n```area-grid\n{\"variable\": \"x\"}\n```"
+    assert extract_payloads(text) == []
+    assert extract_payloads(None) == []
+
+
+@pytest.mark.parametrize("resolution", ["nan", "inf", "coarse"])
+def test_invalid_resolution_is_rejected(resolution):
+    text = asyncio.run(weather.get_area_forecast("10,20,11,21", resolution=resolution))
+    assert text.startswith("Error: bbox must be")
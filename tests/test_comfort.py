@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+import comfort
+
+
+def _c(fahrenheit):
+    return (fahrenheit - 32) * 5 / 9
+
+
+# NWS heat index chart, °F (temperature, relative humidity, heat index)
+@pytest.mark.parametrize("temp_f, rh, expected_f", [
+    (80, 40, 80),
+    (90, 50, 95),
+    (96, 60, 116),
+    (104, 40, 119),
+    (85, 90, 102),
+])
+def test_heat_index_matches_nws_chart(temp_f, rh, expected_f):
+    heat = comfort.heat_index(np.array(_c(temp_f)), np.array(rh))
+    assert float(heat) == pytest.approx(_c(expected_f), abs=0.5)
+
+
+# Environment Canada wind chill chart, °C (temperature, wind km/h, wind chill)
+@pytest.mark.parametrize("temp_c, wind, expected", [
+    (0, 10, -3),
+    (-10, 20, -18),
+    (-20, 30, -33),
+    (-30, 50, -49),
+])
+def test_wind_chill_matches_environment_canada_chart(temp_c, wind, expected):
+    assert float(comfort.wind_chill(np.array(temp_c), np.array(wind))) == pytest.approx(expected, abs=0.5)
+
+
+def test_wind_chill_is_air_temperature_where_undefined():
+    temps, winds = np.array([5.0, 15.0]), np.array([3.0, 40.0])
+    np.testing.assert_array_equal(comfort.wind_chill(temps, winds), temps)
+
+
+def test_dew_point():
+    assert float(comfort.dew_point(np.array(20.0), np.array(50.0))) == pytest.approx(9.3, abs=0.1)
+    assert float(comfort.dew_point(np.array(30.0), np.array(100.0))) == pytest.approx(30.0)
+
+
+def test_feels_like_picks_the_metric_for_the_conditions():
+    temp, rh, wind = np.array([35.0, -10.0, 18.0]), np.array([60.0, 50.0, 50.0]), np.array([5.0, 20.0, 10.0])
+    feels = comfort.feels_like(temp, rh, wind)
+    assert feels[0] == comfort.heat_index(temp, rh)[0]
+    assert feels[1] == comfort.wind_chill(temp, wind)[1]
+    assert feels[2] == comfort.apparent_temperature(temp, rh, wind)[2]
+
+
+def test_comfort_metrics_are_float32_and_keep_shape_and_nan():
+    temp = np.array([[30.0, np.nan], [-5.0, 10.0]])
+    metrics = comfort.comfort_metrics(temp, np.full((2, 2), 50.0), np.full((2, 2), 20.0))
+    for values in metrics.values():
+        assert values.dtype == np.float32 and values.shape == (2, 2)
+        assert np.isnan(values[0, 1])
+
+
+def test_daily_extremes_ignores_nan_and_partial_days():
+    values = np.concatenate([np.arange(24.0), np.full(24, np.nan), np.arange(5.0)])[None, :]
+    low, high = comfort.daily_extremes(values)
+    assert low.shape == (1, 2)
+    assert (low[0, 0], high[0, 0]) == (0.0, 23.0)
+    assert np.isnan(low[0, 1]) and np.isnan(high[0, 1])
+
+
+def test_risk_windows():
+    flags = np.array([True, True, False, False, True, False, True])
+    assert comfort.risk_windows(flags) == [(0, 2), (4, 5), (6, 7)]
+    assert comfort.risk_windows(np.zeros(3, dtype=bool)) == []
@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+from mcp.server.fastmcp import FastMCP
+from mcp.shared.memory import create_connected_server_and_client_session
+
+import deadline
+import upstream
+from upstream import DeadlineExceeded
+
+
+def test_nested_scopes_only_shrink():
+    assert deadline.remaining() is None
+    with deadline.deadline_scope(10):
+        with deadline.deadline_scope(60):
+            assert 9 < deadline.remaining() <= 10
+        with deadline.deadline_scope(1):
+            assert deadline.remaining() <= 1
+        with deadline.deadline_scope(None):
+            assert 9 < deadline.remaining() <= 10
+    assert deadline.remaining() is None
+
+
+def test_client_budget_reaches_the_tool():
+    mcp = FastMCP("test")
+
+    @mcp.tool()
+    @upstream.with_deadline
+    async def budget() -> str:
+        return f"{upstream.remaining():.1f}"
+
+    async def scenario():
+        async with create_connected_server_and_client_session(mcp._mcp_server) as session:
+            default = await deadline.call_tool(session, "budget", {})
+            with deadline.deadline_scope(7.5):
+                scoped = await deadline.call_tool(session, "budget", {})
+        return default.content[0].text, scoped.content[0].text
+
+    default, scoped = asyncio.run(scenario())
+    assert float(default) == pytest.approx(upstream.DEFAULT_DEADLINE, abs=0.5)
+    assert float(scoped) == pytest.approx(7.5, abs=0.5)
+
+
+@pytest.fixture
+def slow_host(monkeypatch):
+    async def hedged_get(url, headers, timeout, stats):
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(upstream, "_hedged_get", hedged_get)
+
+
+def test_host_timeout_with_budget_left_is_an_ordinary_failure(slow_host):
+    async def scenario():
+        with deadline.deadline_scope(5):
+            await upstream.fetch_json("http://slow.example/a", max_timeout=0.05)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(scenario())
+
+
+def test_running_out_of_budget_raises_deadline_exceeded(slow_host):
+    async def scenario():
+        with deadline.deadline_scope(0.05):
+            await upstream.fetch_json("http://slow.example/b", max_timeout=5)
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(scenario())
@@ -0,0 +1,78 @@
+import json
+
+from weather_agent.event_log import EventLog
+from weather_agent.jsonl_log import LogTail
+
+
+def _log(*entries, capacity=100):
+    log = EventLog(capacity=capacity)
+    for message, level, session in entries:
+        log.add(message, level, time="12:00:00", session=session)
+    return log
+
+
+def test_ring_buffer_evicts_oldest_and_keeps_counters_in_step():
+    log = _log(
+        ("one", "INFO", "a"), ("two", "ERROR", "a"), ("three", "SUCCESS", "b"), ("four", "SUCCESS", "b"),
+        capacity=3,
+    )
+    assert len(log) == 3 and log.dropped == 1
+    assert [e.msg for e in log.filter()] == ["two", "three", "four"]
+    assert (log.count("info"), log.count("error"), log.count("success")) == (0, 1, 2)
+    assert log.success_rate == 2 / 3 * 100
+
+    total, counts = log.summary("a")
+    assert total == 1 and +counts == {"ERROR": 1}
+
+
+def test_evicting_a_sessions_last_entry_forgets_the_session():
+    log = _log(("one", "INFO", "a"), ("two", "INFO", "b"), capacity=1)
+    assert log.summary("a") == (0, {})
+    assert "a" not in log._session_totals
+
+
+def test_filter_by_level_search_session_and_since():
+    log = _log(
+        ("fetched Delhi", "SUCCESS", "a"), ("timeout", "ERROR", "a"),
+        ("fetched Paris", "SUCCESS", "b"), ("retrying", "WARNING", "a"),
+    )
+    assert [e.msg for e in log.filter(["SUCCESS", "warning"])] == ["fetched Delhi", "fetched Paris", "retrying"]
+    assert [e.msg for e in log.filter(search="FETCHED")] == ["fetched Delhi", "fetched Paris"]
+    assert [e.msg for e in log.filter(search="error")] == ["timeout"]  # matches the level too
+    assert [e.msg for e in log.filter(session="a", since=2)] == ["retrying"]
+
+
+def test_summary_after_since_counts_only_newer_entries():
+    log = _log(("one", "INFO", "a"), ("two", "ERROR", "a"), ("three", "ERROR", "b"))
+    assert log.summary(since=1) == (2, {"ERROR": 2})
+    assert log.summary("a", since=1) == (1, {"ERROR": 1})
+    assert log.summary() == (3, {"INFO": 1, "ERROR": 2})
+
+
+def test_exports_follow_changes():
+    log = _log(("one", "INFO", None))
+    assert log.to_text() == "[12:00:00] INFO: one"
+    log.add("two", "ERROR", time="12:00:01", city="Delhi")
+    assert log.to_text() == "[12:00:00] INFO: one\n[12:00:01] ERROR: two"
+    assert json.loads(log.to_json())[1] == {"time": "12:00:01", "msg": "two", "type": "ERROR", "city": "Delhi"}
+
+    assert log.to_text(log.filter(["ERROR"])) == "[12:00:01] ERROR: two"
+    log.clear()
+    assert log.to_text() == "" and log.to_json() == "[]"
+
+
+def test_log_tail_reads_appended_lines_and_exports_on_request(tmp_path):
+    path = tmp_path / "events.jsonl"
+    record = {"ts": "2026-10-19T06:30:00+00:00", "level": "ERROR", "msg": "boom", "session": "s1", "city": "Pune"}
+    path.write_text(json.dumps(record) + "\n" + '{"msg": "partial', encoding="utf-8")
+
+    tail = LogTail(path)
+    view = tail.view(session="s1")
+    assert [e.msg for e in view.entries] == ["boom"]
+    assert view.total == 1 and view.counts["ERROR"] == 1 and view.success_rate == 0.0
+    assert view.text() == "[2026-10-19 12:00:00] ERROR: boom"
+    assert json.loads(view.json())[0]["city"] == "Pune"
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('", "level": "SUCCESS", "session": "s1"}\n')
+    assert [e.msg for e in tail.view(session="s1").entries] == ["boom", "partial"]
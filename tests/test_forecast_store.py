@@ -0,0 +1,102 @@
+import time
+
+import numpy as np
+import pytest
+
+import forecast_store
+from forecast_store import DAILY, HOURLY
+
+LAT, LON = 52.52, 13.41
+DAY = 86400
+
+
+@pytest.fixture(autouse=True)
+def store_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(forecast_store, "STORE_ROOT", tmp_path)
+    return tmp_path
+
+
+def test_append_and_scan_round_trip():
+    issued = time.time()
+    rows = forecast_store.append(
+        LAT, LON, DAILY, ["2026-10-19", "2026-10-20"],
+        {"temperature_2m_max": [14.5, 16.0], "precipitation_sum": [0.0, None]},
+        issued=issued,
+    )
+    assert rows == 2
+
+    data = forecast_store.scan(LAT, LON, DAILY, ["temperature_2m_max", "precipitation_sum"])
+    assert data["issued"].tolist() == [issued, issued]
+    assert data["valid"].astype("datetime64[D]").astype(str).tolist() == ["2026-10-19", "2026-10-20"]
+    assert data["temperature_2m_max"].tolist() == [14.5, 16.0]
+    assert data["precipitation_sum"][0] == 0.0
+    assert np.isnan(data["precipitation_sum"][1])
+
+
+def test_hourly_valid_times_are_minutes():
+    forecast_store.append(LAT, LON, HOURLY, ["2026-10-19T06:00"], {"temperature_2m": [9.0]}, issued=time.time())
+    data = forecast_store.scan(LAT, LON, HOURLY, ["temperature_2m"])
+    assert data["valid"].astype("datetime64[m]").astype(str).tolist() == ["2026-10-19T06:00"]
+
+
+def test_columns_stay_aligned_when_variables_change():
+    now = time.time()
+    forecast_store.append(LAT, LON, DAILY, ["2026-10-19"], {"a": [1.0]}, issued=now)
+    forecast_store.append(LAT, LON, DAILY, ["2026-10-19"], {"b": [2.0]}, issued=now + 1)
+
+    data = forecast_store.scan(LAT, LON, DAILY, ["a", "b"])
+    assert data["a"][0] == 1.0 and np.isnan(data["a"][1])
+    assert np.isnan(data["b"][0]) and data["b"][1] == 2.0
+
+
+def test_short_value_lists_are_padded_with_nan():
+    forecast_store.append(LAT, LON, DAILY, ["2026-10-19", "2026-10-20"], {"a": [1.0]}, issued=time.time())
+    data = forecast_store.scan(LAT, LON, DAILY, ["a"])
+    assert data["a"][0] == 1.0 and np.isnan(data["a"][1])
+
+
+def test_scan_prunes_by_issue_time():
+    now = time.time()
+    forecast_store.append(LAT, LON, DAILY, ["2026-10-10"], {"a": [1.0]}, issued=now - 3 * DAY)
+    forecast_store.append(LAT, LON, DAILY, ["2026-10-19"], {"a": [2.0]}, issued=now)
+
+    assert forecast_store.scan(LAT, LON, DAILY, ["a"])["a"].tolist() == [1.0, 2.0]
+    assert forecast_store.scan(LAT, LON, DAILY, ["a"], since=now - DAY)["a"].tolist() == [2.0]
+
+
+def test_scan_of_unknown_location_is_empty():
+    data = forecast_store.scan(0.0, 0.0, DAILY, ["a"])
+    assert {name: len(arr) for name, arr in data.items()} == {"issued": 0, "valid": 0, "a": 0}
+
+
+def test_latest_per_valid_picks_newest_issue():
+    issued = np.array([10.0, 30.0, 20.0, 5.0, 15.0])
+    valid = np.array([1, 1, 1, 2, 2])
+    idx = forecast_store._latest_per_valid(issued, valid)
+    assert sorted(idx.tolist()) == [1, 4]
+    assert forecast_store._latest_per_valid(np.empty(0), np.empty(0, dtype=np.int64)).size == 0
+
+
+def test_forecast_changes_compares_with_forecast_before_cutoff():
+    now = time.time()
+    days = ["2026-10-20", "2026-10-21"]
+    forecast_store.append(LAT, LON, DAILY, days, {"a": [10.0, 11.0]}, issued=now - 2 * DAY)
+    forecast_store.append(LAT, LON, DAILY, days, {"a": [12.0, 13.0]}, issued=now - 1.5 * DAY)
+    forecast_store.append(LAT, LON, DAILY, days, {"a": [15.0, 11.5]}, issued=now)
+
+    changes = forecast_store.forecast_changes(LAT, LON, ["a"], since_hours=24)
+    assert changes["valid"].astype(str).tolist() == days
+    assert changes["a_before"].tolist() == [12.0, 13.0]
+    assert changes["a_after"].tolist() == [15.0, 11.5]
+    assert changes["baseline_issued"].tolist() == [now - 1.5 * DAY] * 2
+
+
+def test_recorded_daily_keeps_latest_issue_per_day():
+    now = time.time()
+    today = time.strftime("%Y-%m-%d")
+    forecast_store.append(LAT, LON, DAILY, [today], {"a": [1.0]}, issued=now - DAY)
+    forecast_store.append(LAT, LON, DAILY, [today], {"a": [2.0]}, issued=now)
+
+    recorded = forecast_store.recorded_daily(LAT, LON, ["a"], days=3)
+    assert recorded["valid"].astype(str).tolist() == [today]
+    assert recorded["a"].tolist() == [2.0]
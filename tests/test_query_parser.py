@@ -0,0 +1,101 @@
+import pytest
+
+from weather_agent.query_parser import PhraseMatcher, parse, tokenize
+
+
+def _matcher(*phrases):
+    return PhraseMatcher((tuple(tokenize(p)), p) for p in phrases)
+
+
+def test_phrase_matcher_finds_overlapping_phrases():
+    matcher = _matcher("new york", "york", "new york city")
+    matches = matcher.find_all(tokenize("weather in new york city"))
+    assert sorted(matches) == [(2, 4, "new york"), (2, 5, "new york city"), (3, 4, "york")]
+
+
+def test_phrase_matcher_prefers_leftmost_longest():
+    matcher = _matcher("new york", "york", "new york city", "city")
+    assert matcher.find(tokenize("new york city and york")) == [(0, 3, "new york city"), (4, 5, "york")]
+
+
+def test_phrase_matcher_uses_failure_links():
+    # "a b" fails after "a a", which must fall back to the second "a"
+    matcher = _matcher("a b", "b c")
+    assert matcher.find_all(tokenize("a a b c")) == [(1, 3, "a b"), (2, 4, "b c")]
+
+
+def test_phrase_matcher_matches_whole_tokens_only():
+    matcher = _matcher("leh")
+    assert matcher.find(tokenize("the leher valley")) == []
+
+
+@pytest.mark.parametrize("query, cities", [
+    ("What's the weather in Delhi?", ["Delhi"]),
+    ("compare Delhi, Mumbai and Pune", ["Delhi", "Mumbai", "Pune"]),
+    ("is it raining in bombay", ["Mumbai"]),
+    ("weather in new york city tomorrow", ["New York"]),
+    ("forecast for Mussoorie Uttarakhand", ["Mussoorie"]),
+    ("weather in Uttarakhand", ["Uttarakhand"]),
+    ("weather in Reykjavik today", ["Reykjavik"]),
+])
+def test_cities(query, cities):
+    assert parse(query).cities == cities
+
+
+@pytest.mark.parametrize("query, intent", [
+    ("What's the weather in Delhi?", "weather"),
+    ("Tokyo", "weather"),
+    ("Is Delhi hotter than Mumbai?", "compare"),
+    ("London vs Paris this weekend", "compare"),
+    ("any weather alerts in Texas?", "alerts"),
+    ("alerts for CA", "alerts"),
+    ("should I pack an umbrella for Goa?", "open"),
+    ("how has the forecast for Pune changed?", "open"),
+    ("tell me a joke", "unknown"),
+    ("weather please", "unknown"),
+])
+def test_intent(query, intent):
+    assert parse(query).intent == intent
+
+
+def test_alert_state_codes():
+    assert parse("any weather alerts in Texas?").alert_state == "TX"
+    assert parse("alerts in tx").alert_state == "TX"
+    assert parse("weather in Texas").alert_state is None
+
+
+def test_day_and_metrics():
+    parsed = parse("will it be windy in Chennai tomorrow?")
+    assert parsed.day == "tomorrow"
+    assert parsed.metrics == {"wind"}
+    assert parse("5 day forecast for Leh").day == "5d"
+    assert parse("uv index in Goa this weekend").day == "weekend"
+
+
+def test_known_places():
+    assert parse("weather in Delhi and Paris").known_places
+    assert not parse("weather in Delhi and Reykjavik").known_places
+
+
+@pytest.mark.parametrize("query, city, qualifier, day", [
+    ("Give me a weather forecast for Hyderabad, India.", "Hyderabad", "India", "today"),
+    ("Weather in Portland, Oregon", "Portland", "Oregon", "today"),
+    ("weather in Paris, France tomorrow", "Paris", "France", "tomorrow"),
+])
+def test_region_after_a_comma_qualifies_the_city(query, city, qualifier, day):
+    parsed = parse(query)
+    assert parsed.intent == "weather"
+    assert parsed.cities == [city]
+    assert parsed.place(city) == f"{city}, {qualifier}"
+    assert parsed.day == day
+
+
+def test_qualified_cities_can_still_be_compared():
+    parsed = parse("compare London, UK and Paris, France")
+    assert parsed.intent == "compare"
+    assert [parsed.place(city) for city in parsed.cities] == ["London, UK", "Paris, France"]
+
+
+def test_regions_on_their_own_are_places():
+    assert parse("compare India, Nepal").cities == ["India", "Nepal"]
+    assert parse("weather in Uttarakhand").cities == ["Uttarakhand"]
@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+import weather
+from weather_agent.router import FALLBACK, Answer, Router, tool_handlers
+
+
+@pytest.mark.parametrize("query, route", [
+    ("compare London and Paris today", "compare"),
+    ("is Delhi hotter than Mumbai tomorrow?", "compare"),
+    ("compare London and Paris this weekend", FALLBACK),
+    ("compare Delhi and Pune in 3 days", FALLBACK),
+    ("weather in Paris", "weather"),
+])
+def test_comparisons_for_other_days_go_to_the_agent(query, route):
+    router = Router({"compare": None, "weather": None})
+    assert router.classify(query)[0] == route
+
+
+def test_tool_comparison_asks_for_the_parsed_day():
+    calls = []
+
+    async def call_tool(name, arguments):
+        calls.append((name, arguments))
+        return Answer("table")
+
+    router = Router(tool_handlers(call_tool), deadline=None)
+    asyncio.run(router.handle("compare Delhi and Mumbai tomorrow"))
+    assert calls == [("compare_cities", {"cities": "Delhi, Mumbai", "day": 1})]
+
+
+def test_compare_cities_tool_reports_the_day_and_omitted_cities(monkeypatch):
+    async def city_day(name, day, semaphore):
+        return name, {"time": f"2026-10-{19 + day}", "temperature_2m_max": 30, "temperature_2m_min": 20, "precipitation_sum": 0}
+
+    monkeypatch.setattr(weather, "_city_day", city_day)
+    names = [f"City{i}" for i in range(weather.MAX_COMPARE_CITIES + 2)]
+    text = asyncio.run(weather.compare_cities(names, day=1))
+
+    assert text.startswith("Weather comparison for tomorrow (2026-10-20):")
+    assert text.count("| City") == weather.MAX_COMPARE_CITIES + 1  # header + rows
+    assert text.endswith(f"left out: City{weather.MAX_COMPARE_CITIES}, City{weather.MAX_COMPARE_CITIES + 1}")
@@ -0,0 +1,97 @@
+import io
+import wave
+
+import numpy as np
+import pytest
+
+from weather_agent import speech
+
+
+def _wav(frames: bytes, width: int, rate: int = 16_000, channels: int = 1) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(width)
+        wav.setframerate(rate)
+        wav.writeframes(frames)
+    return buf.getvalue()
+
+
+def _tone(seconds: float, rate: int, freq: float = 440.0, amplitude: float = 0.5) -> np.ndarray:
+    t = np.arange(int(seconds * rate)) / rate
+    return (amplitude * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+
+EXPECTED = [0.0, 0.5, -0.5, -1.0]
+
+
+@pytest.mark.parametrize("width, frames", [
+    (1, np.array([128, 192, 64, 0], dtype=np.uint8).tobytes()),
+    (2, np.array([0, 16384, -16384, -32768], dtype="<i2").tobytes()),
+    (3, b"".join(int(v).to_bytes(3, "little", signed=True) for v in (0, 4194304, -4194304, -8388608))),
+    (4, np.array([0, 2**30, -2**30, -2**31], dtype="<i4").tobytes()),
+])
+def test_decode_wav_sample_widths(width, frames):
+    samples, rate = speech.decode_wav(_wav(frames, width, rate=8000))
+    assert rate == 8000 and samples.shape == (4, 1)
+    np.testing.assert_allclose(samples[:, 0], EXPECTED)
+
+
+def test_decode_wav_stereo_and_mono_mix():
+    frames = np.array([16384, -16384, 8192, 8192], dtype="<i2").tobytes()
+    samples, _ = speech.decode_wav(_wav(frames, 2, channels=2))
+    assert samples.shape == (2, 2)
+    np.testing.assert_allclose(speech.to_mono(samples), [0.0, 0.25])
+
+
+def test_resample_keeps_duration_and_pitch():
+    for rate in (8_000, 44_100, 48_000):
+        out = speech.resample(_tone(1.0, rate), rate)
+        assert out.dtype == np.float32 and out.size == speech.TARGET_RATE
+        spectrum = np.abs(np.fft.rfft(out))
+        assert np.argmax(spectrum) == pytest.approx(440, abs=1)  # 1 Hz bins over one second
+
+
+def test_resample_is_a_no_op_at_target_rate():
+    samples = _tone(0.1, speech.TARGET_RATE)
+    assert speech.resample(samples, speech.TARGET_RATE) is samples
+
+
+def test_trim_silence_keeps_speech_with_padding():
+    rate = speech.TARGET_RATE
+    quiet = np.zeros(rate, dtype=np.float32)
+    samples = np.concatenate([quiet, _tone(0.5, rate), quiet])
+    trimmed = speech.trim_silence(samples, rate, pad_ms=200)
+    assert trimmed.size == pytest.approx(0.5 * rate + 2 * 0.2 * rate, abs=rate * 0.02)
+    assert np.abs(trimmed).max() == pytest.approx(0.5, abs=0.01)
+
+
+def test_trim_silence_drops_digital_silence():
+    assert speech.trim_silence(np.zeros(16_000, dtype=np.float32)).size == 0
+
+
+def test_transcribe_runs_backend_on_preprocessed_audio(monkeypatch):
+    seen = []
+
+    def backend(samples):
+        seen.append(samples)
+        return " weather in Pune "
+
+    monkeypatch.setitem(speech.BACKENDS, "fake", backend)
+    audio = np.concatenate([np.zeros(44_100, dtype=np.float32), _tone(0.5, 44_100)])
+    result = speech.transcribe(_wav(speech.to_pcm16(audio), 2, rate=44_100), backend="fake")
+
+    assert (result.text, result.error, result.backend) == ("weather in Pune", None, "fake")
+    assert result.input_seconds == pytest.approx(1.5)
+    assert result.speech_seconds == pytest.approx(0.7, abs=0.05)
+    assert seen[0].dtype == np.float32
+    assert set(result.timings) == {"decode", "preprocess", "recognize", "total"}
+
+
+def test_transcribe_reports_silence_and_bad_input(monkeypatch):
+    monkeypatch.setitem(speech.BACKENDS, "fake", lambda samples: "unused")
+    silent = speech.transcribe(_wav(bytes(3200), 2), backend="fake")
+    assert silent.error == speech.UNINTELLIGIBLE
+
+    assert speech.transcribe(b"not a wav", backend="fake").error.startswith("Error transcribing")
+    assert "unknown speech backend" in speech.transcribe(b"", backend="missing").error
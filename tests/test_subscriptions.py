@@ -0,0 +1,78 @@
+import asyncio
+
+from mcp.server.lowlevel.server import Server
+from mcp.shared.memory import create_connected_server_and_client_session
+
+import weather
+from subscriptions import ResourceUnavailable, ResourceWatcher
+from upstream import DeadlineExceeded
+
+URI = "weather://alerts/CA"
+
+
+def test_outage_serves_last_good_copy(monkeypatch):
+    answers = ["No active alerts for this state."]
+
+    async def get_alerts(state):
+        answer = answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    monkeypatch.setattr(weather, "get_alerts", get_alerts)
+
+    async def scenario():
+        watcher = ResourceWatcher(weather.load_resource, interval=0)
+        await watcher.subscribe(URI, object())
+        answers.extend([DeadlineExceeded("api.weather.gov did not answer"), "Unable to fetch alerts or no alerts found."])
+        return [await watcher.read(URI), await watcher.read(URI)]
+
+    assert asyncio.run(scenario()) == ["No active alerts for this state."] * 2
+
+
+def test_outage_without_a_copy_returns_the_error():
+    async def loader(uri):
+        raise ResourceUnavailable("Error fetching: timeout")
+
+    assert asyncio.run(ResourceWatcher(loader).read(URI)) == "Error fetching: timeout"
+
+
+def test_refresh_notifies_only_on_change():
+    contents = ["a", "a", "b"]
+    notified = []
+
+    class Session:
+        async def send_resource_updated(self, uri):
+            notified.append(uri)
+
+    async def loader(uri):
+        return contents.pop(0)
+
+    async def scenario():
+        watcher = ResourceWatcher(loader, interval=3600)
+        await watcher.subscribe(URI, Session())
+        await watcher.refresh()
+        assert notified == []
+        await watcher.refresh()
+        assert notified == [URI]
+        assert await watcher.read(URI) == "b"
+
+    asyncio.run(scenario())
+
+
+def test_subscriptions_are_dropped_when_the_connection_closes():
+    async def loader(uri):
+        return "content"
+
+    server = Server("test")
+    watcher = ResourceWatcher(loader, interval=3600)
+    watcher.install(server)
+
+    async def scenario():
+        async with create_connected_server_and_client_session(server) as client:
+            await client.subscribe_resource(URI)
+            assert len(watcher._subscribers[URI]) == 1
+        await asyncio.sleep(0)
+        return watcher._subscribers
+
+    assert asyncio.run(scenario()) == {}
@@ -0,0 +1,48 @@
+import asyncio
+
+from mcp.server.fastmcp import FastMCP
+from mcp.shared.memory import create_connected_server_and_client_session
+
+import tool_schema
+
+
+def _server(description="Alerts for a state."):
+    mcp = FastMCP("weather")
+
+    @mcp.tool(description=description)
+    async def get_alerts(state: str) -> str:
+        return state
+
+    return mcp
+
+
+def test_publish_works_inside_a_running_loop():
+    async def scenario():
+        mcp = _server()
+        return tool_schema.publish_tool_schema(mcp), mcp._mcp_server.version
+
+    digest, version = asyncio.run(scenario())
+    assert version == f"{tool_schema.SERVER_VERSION}+tools.{digest}"
+
+
+def test_hash_matches_the_listed_tools_and_follows_changes():
+    mcp = _server()
+    listed = asyncio.run(mcp.list_tools())
+    assert tool_schema.publish_tool_schema(mcp) == tool_schema.tool_schema_hash(listed)
+    assert tool_schema.publish_tool_schema(_server("Changed.")) != tool_schema.publish_tool_schema(mcp)
+
+
+def test_list_tools_cached_reuses_the_list_for_a_hash(tmp_path, monkeypatch):
+    monkeypatch.setattr(tool_schema, "CACHE_DIR", tmp_path)
+    mcp = _server()
+    tool_schema.publish_tool_schema(mcp)
+
+    async def connect():
+        async with create_connected_server_and_client_session(mcp._mcp_server) as session:
+            init_result = await session.initialize()
+            assert tool_schema.schema_hash(init_result) is not None
+            tools, from_cache = await tool_schema.list_tools_cached(session, init_result)
+            return [tool.name for tool in tools], from_cache
+
+    assert asyncio.run(connect()) == (["get_alerts"], False)
+    assert asyncio.run(connect()) == (["get_alerts"], True)
@@ -0,0 +1,99 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from weather_agent import direct_api, ttl_cache
+from weather_agent.ttl_cache import TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ttl_cache, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = TTLCache(ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=30)
+
+    clock[0] += 9.9
+    assert cache.get("a") == 1 and "a" in cache
+    clock[0] += 0.1
+    assert cache.get("a") is None and "a" not in cache
+    assert cache.get("b") == 2
+
+    clock[0] += 20
+    assert cache.get("b", "gone") == "gone"
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(ttl=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_stats_count_hits_and_misses():
+    cache = TTLCache(ttl=60)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("missing")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+def _counting_fetch(result, calls):
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return result
+    return fetch
+
+
+def test_concurrent_lookups_share_one_fetch():
+    cache, calls = TTLCache(ttl=60), []
+
+    async def scenario():
+        fetch = _counting_fetch({"temp": 21}, calls)
+        return await asyncio.gather(*(direct_api._cached(cache, ("k",), fetch, lambda v: not v) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+    assert results == [{"temp": 21}] * 5
+    assert len(calls) == 1
+    assert not direct_api._inflight
+    assert cache.get(("k",)) == {"temp": 21}
+
+
+def test_failed_fetch_is_not_cached_and_is_retried():
+    cache, calls = TTLCache(ttl=60), []
+
+    async def scenario():
+        fetch = _counting_fetch(None, calls)
+        await direct_api._cached(cache, ("k",), fetch, lambda v: not v)
+        await direct_api._cached(cache, ("k",), fetch, lambda v: not v)
+
+    asyncio.run(scenario())
+    assert len(calls) == 2
+    assert ("k",) not in cache
+
+
+def test_empty_result_is_cached_for_miss_ttl(clock):
+    cache, calls = TTLCache(ttl=86400), []
+
+    async def scenario():
+        return await direct_api._cached(cache, ("k",), _counting_fetch([], calls), lambda v: not v)
+
+    assert asyncio.run(scenario()) == []
+    clock[0] += direct_api.MISS_TTL - 1
+    assert ("k",) in cache
+    clock[0] += 2
+    assert ("k",) not in cache
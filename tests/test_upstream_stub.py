@@ -0,0 +1,40 @@
+from starlette.testclient import TestClient
+
+import upstream_stub
+
+
+def _client():
+    upstream_stub.config.latency_ms = 0
+    upstream_stub.config.jitter_ms = 0
+    upstream_stub.config.error_rate = 0
+    return TestClient(upstream_stub.app)
+
+
+def test_forecast_returns_one_entry_per_location():
+    response = _client().get("/v1/forecast", params={
+        "latitude": "28.61,19.07,48.86",
+        "longitude": "77.21,72.88,2.35",
+        "hourly": "temperature_2m,relative_humidity_2m,wind_speed_10m",
+        "forecast_days": 2,
+    })
+    locations = response.json()
+    assert [loc["latitude"] for loc in locations] == [28.61, 19.07, 48.86]
+    for loc in locations:
+        assert set(loc["hourly"]) == {"time", "temperature_2m", "relative_humidity_2m", "wind_speed_10m"}
+        assert len(loc["hourly"]["relative_humidity_2m"]) == 48
+        assert "daily" not in loc
+
+
+def test_forecast_single_location_answers_with_requested_daily_variables():
+    response = _client().get("/v1/forecast", params={
+        "latitude": "30.1", "longitude": "79.3", "daily": "precipitation_probability_max", "forecast_days": 3,
+    })
+    location = response.json()
+    assert isinstance(location, dict)
+    assert set(location["daily"]) == {"time", "precipitation_probability_max"}
+    assert len(location["daily"]["time"]) == 3
+
+
+def test_forecast_rejects_mismatched_coordinates():
+    response = _client().get("/v1/forecast", params={"latitude": "1,2", "longitude": "3"})
+    assert response.status_code == 400
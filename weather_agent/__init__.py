@@ -0,0 +1 @@
+"""Client-side runtime shared by the Streamlit app and server/client.py."""
@@ -0,0 +1,291 @@
+"""Process-wide pool of warm MCP clients and agents.
+
+Building an ``MCPClient`` + ``MCPAgent`` launches a weather-server subprocess
+and lists its tools, so doing it per browser session makes memory and
+subprocess count grow with the number of users. The pool keeps at most
+``size`` MCP connections for the whole process; callers check one out for a
+query and hand it back afterwards:
+
+    async with pool.checkout(model) as agent:
+        answer = await agent.run(query)
+
+Each pooled connection carries one ``MCPAgent`` per LLM model, created on
+first use and then kept, all sharing the connection's MCP session. The
+``ChatGroq`` instances are shared across connections. Switching models is
+therefore a dictionary lookup: no new client, no new server subprocess.
+
+Sessions belong to the event loop they were opened on, so callers should
+run everything on the shared loop in ``weather_agent.event_loop``. Entries
+are health-checked on checkout (sessions still connected, owning event loop
+still alive) and rebuilt if needed, and entries unused for
+``idle_timeout`` seconds are closed so an idle app holds no subprocesses.
+Entries dropped for any reason (failed connect or health check, ``reset``)
+have their MCP sessions closed too, so no server subprocess is left behind.
+Connections go through ``weather_agent.transport``, so with
+``WEATHER_MCP_URL`` set every entry attaches to one shared server instead.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+from langchain_groq import ChatGroq
+from mcp_use import MCPAgent, MCPClient
+
+from weather_agent.router import Answer, tool_answer
+from weather_agent.tool_cache import use_cached_tools
+from weather_agent.transport import connect_client, is_alive
+
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+
+
+class PoolExhausted(Exception):
+    """Raised when no agent became free within the checkout timeout."""
+
+
+@dataclass
+class PooledAgent:
+    client: MCPClient | None = None
+    agents: dict[str, MCPAgent] = field(default_factory=dict)
+    loop: asyncio.AbstractEventLoop | None = None
+    last_used: float = field(default_factory=time.monotonic)
+    in_use: bool = False
+
+
+class AgentPool:
+    def __init__(
+        self,
+        config_file: str = "server/weather.json",
+        size: int = 4,
+        idle_timeout: float = 600.0,
+        max_steps: int = 10,
+        checkout_timeout: float = 30.0,
+    ):
+        self.config_file = config_file
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.max_steps = max_steps
+        self.checkout_timeout = checkout_timeout
+        self._entries: list[PooledAgent] = []
+        self._llms: dict[str, ChatGroq] = {}
+        # Streamlit sessions run on different threads, so bookkeeping uses a
+        # thread lock rather than asyncio primitives tied to one loop.
+        self._lock = threading.Lock()
+        # Callers waiting for a free entry, each a future on its own loop;
+        # handing an entry back wakes the oldest one.
+        self._waiters: deque[asyncio.Future] = deque()
+        self.created = 0
+        self.evicted = 0
+
+    def _build(self) -> PooledAgent:
+        self.created += 1
+        return PooledAgent()
+
+    def llm(self, model: str) -> ChatGroq:
+        """Shared ChatGroq instance for a model, created on first use."""
+        with self._lock:
+            if model not in self._llms:
+                # streaming=True so weather_agent.streaming can relay tokens
+                self._llms[model] = ChatGroq(model=model, streaming=True)
+            return self._llms[model]
+
+    def _agent_for(self, entry: PooledAgent, model: str) -> MCPAgent:
+        if model not in entry.agents:
+            # Tool wrappers are built once per tool-schema hash and rebound per connection
+            entry.agents[model] = use_cached_tools(MCPAgent(
+                llm=self.llm(model),
+                client=entry.client,
+                max_steps=self.max_steps,
+                memory_enabled=False,
+            ))
+        return entry.agents[model]
+
+    @staticmethod
+    def _is_healthy(entry: PooledAgent) -> bool:
+        """An entry is usable if its sessions are alive on the current loop."""
+        if entry.loop is None:
+            return True  # never connected yet
+        if entry.loop.is_closed() or entry.loop is not asyncio.get_running_loop():
+            return False
+        return is_alive(entry.client)
+
+    @staticmethod
+    async def _close(entry: PooledAgent) -> None:
+        if entry.client is None or entry.loop is None or entry.loop.is_closed():
+            return  # nothing open, or the loop already tore it down
+        try:
+            if entry.loop is asyncio.get_running_loop():
+                await entry.client.close_all_sessions()
+            else:
+                asyncio.run_coroutine_threadsafe(entry.client.close_all_sessions(), entry.loop)
+        except Exception:
+            pass
+
+    def _take(self, waiter: asyncio.Future) -> tuple[PooledAgent | None, list[PooledAgent]]:
+        """Grab a free entry (or make room for a new one) and collect idle ones.
+
+        If none is free, ``waiter`` is queued under the same lock, so a release
+        in between cannot be missed.
+        """
+        now = time.monotonic()
+        with self._lock:
+            stale = [
+                e for e in self._entries
+                if not e.in_use and now - e.last_used > self.idle_timeout
+            ]
+            for entry in stale:
+                self._entries.remove(entry)
+            self.evicted += len(stale)
+
+            entry = next((e for e in self._entries if not e.in_use), None)
+            if entry is None and len(self._entries) < self.size:
+                entry = self._build()
+                self._entries.append(entry)
+            if entry is not None:
+                entry.in_use = True
+            else:
+                self._waiters.append(waiter)
+            return entry, stale
+
+    def _notify(self) -> None:
+        """Wake the oldest caller still waiting for an entry."""
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                loop = waiter.get_loop()
+                if not waiter.done() and not loop.is_closed():
+                    loop.call_soon_threadsafe(self._wake, waiter)
+                    return
+
+    @staticmethod
+    def _wake(waiter: asyncio.Future) -> None:
+        if not waiter.done():
+            waiter.set_result(None)
+
+    async def _acquire_entry(self) -> PooledAgent:
+        """Check out an entry whose MCP sessions are connected on this loop."""
+        deadline = time.monotonic() + self.checkout_timeout
+        while True:
+            waiter = asyncio.get_running_loop().create_future()
+            entry, stale = self._take(waiter)
+            for old in stale:
+                await self._close(old)
+            if entry is not None:
+                break
+            try:
+                await asyncio.wait_for(waiter, max(0.0, deadline - time.monotonic()))
+            except BaseException as exc:
+                with self._lock:
+                    queued = waiter in self._waiters
+                    if queued:
+                        self._waiters.remove(waiter)
+                if not queued:
+                    self._notify()  # woken just as we gave up; pass the turn on
+                if isinstance(exc, asyncio.TimeoutError):
+                    raise PoolExhausted(f"All {self.size} agents are busy; try again shortly.") from None
+                raise
+
+        try:
+            if not self._is_healthy(entry):
+                await self._close(entry)
+                entry.client, entry.agents, entry.loop = None, {}, None
+            if entry.loop is None:
+                # Attaches to the shared server if configured, else starts one over stdio
+                entry.client = await connect_client(self.config_file)
+                entry.loop = asyncio.get_running_loop()
+        except BaseException:
+            await self._discard(entry)
+            raise
+        return entry
+
+    async def _acquire(self, model: str) -> tuple[PooledAgent, MCPAgent]:
+        entry = await self._acquire_entry()
+        try:
+            agent = self._agent_for(entry, model)
+            if not agent._initialized:
+                # Reuses the entry's live session; only wraps its tools for this LLM
+                await agent.initialize()
+        except BaseException:
+            await self._discard(entry)
+            raise
+        return entry, agent
+
+    async def acquire(self, model: str = DEFAULT_MODEL) -> MCPAgent:
+        _, agent = await self._acquire(model)
+        return agent
+
+    async def call_tool(self, name: str, arguments: dict[str, Any]) -> Answer:
+        """Call a weather-server tool directly on a pooled session (no LLM)."""
+        entry = await self._acquire_entry()
+        try:
+            session = next(iter(entry.client.get_all_active_sessions().values()))
+            return tool_answer(await session.call_tool(name, arguments))
+        finally:
+            self._release_entry(entry)
+
+    def _find(self, agent: MCPAgent) -> PooledAgent | None:
+        return next((e for e in self._entries if agent in e.agents.values()), None)
+
+    async def _discard(self, entry: PooledAgent) -> None:
+        with self._lock:
+            if entry in self._entries:
+                self._entries.remove(entry)
+        self._notify()
+        await self._close(entry)
+
+    def _release_entry(self, entry: PooledAgent) -> None:
+        with self._lock:
+            entry.in_use = False
+            entry.last_used = time.monotonic()
+            retired = entry not in self._entries
+        self._notify()
+        if retired and entry.loop is not None and not entry.loop.is_closed():
+            # Dropped by reset() while checked out; close it now that it is free
+            asyncio.run_coroutine_threadsafe(self._close(entry), entry.loop)
+
+    def release(self, agent: MCPAgent) -> None:
+        with self._lock:
+            entry = self._find(agent)
+        if entry is not None:
+            self._release_entry(entry)
+
+    @asynccontextmanager
+    async def checkout(self, model: str = DEFAULT_MODEL):
+        entry, agent = await self._acquire(model)
+        try:
+            yield agent
+        finally:
+            self._release_entry(entry)
+
+    async def close(self) -> None:
+        with self._lock:
+            entries, self._entries = self._entries, []
+        for entry in entries:
+            await self._close(entry)
+
+    async def reset(self) -> None:
+        """Drop every connection: idle ones now, checked-out ones when handed back."""
+        with self._lock:
+            entries, self._entries = self._entries, []
+            self.evicted += len(entries)
+            waiting = len(self._waiters)
+        for _ in range(waiting):
+            self._notify()  # the pool has room again
+        for entry in entries:
+            if not entry.in_use:
+                await self._close(entry)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "size": self.size,
+                "open": len(self._entries),
+                "in_use": sum(e.in_use for e in self._entries),
+                "created": self.created,
+                "evicted": self.evicted,
+                "models": len(self._llms),
+            }
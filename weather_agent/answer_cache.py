@@ -0,0 +1,112 @@
+"""Cache of finished answers, keyed by what was asked rather than how.
+
+"weather in Paris today" and "what's the weather like in paris?" parse to
+the same intent, places, metrics and day, so the second one is answered
+from the cache without touching the tools or the LLM. The calendar date is
+part of the key, so "today" never carries over midnight.
+
+Entries live for the route's TTL but never past the next forecast refresh
+(Open-Meteo updates its models hourly), so a cached answer is never built
+from older data than a fresh fetch would return. Alerts get a short TTL of
+their own. Agent answers are only cached when the question names a place;
+anything else may depend on conversation context. Callers say whether an
+answer succeeded (``ok``); failures are never cached, however they are
+worded.
+"""
+
+import os
+import threading
+import time
+from collections import Counter
+from typing import Any
+
+from weather_agent.query_parser import STOPWORDS, ParsedQuery, tokenize
+from weather_agent.ttl_cache import TTLCache
+
+DEFAULT_TTLS = {
+    "weather": float(os.getenv("ANSWER_TTL_SECONDS", "900")),
+    "compare": float(os.getenv("ANSWER_TTL_SECONDS", "900")),
+    "alerts": float(os.getenv("ALERTS_ANSWER_TTL_SECONDS", "120")),
+    "agent": float(os.getenv("ANSWER_TTL_SECONDS", "900")),
+}
+FORECAST_ROUTES = frozenset({"weather", "compare", "agent"})
+# Upstream models publish a little after the hour
+REFRESH_GRACE = 300.0
+
+
+def seconds_until_refresh(now: float | None = None) -> float:
+    """Seconds until the next hourly forecast refresh (plus grace)."""
+    now = time.time() if now is None else now
+    return 3600 - (now % 3600) + REFRESH_GRACE if now % 3600 >= REFRESH_GRACE else REFRESH_GRACE - now % 3600
+
+
+class AnswerCache:
+    def __init__(self, max_entries: int = 512, ttls: dict[str, float] | None = None):
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self._cache = TTLCache(ttl=max(self.ttls.values()), max_entries=max_entries)
+        self._lock = threading.Lock()
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+
+    @staticmethod
+    def key(route: str, parsed: ParsedQuery) -> tuple | None:
+        """Normalized cache key, or None if the answer must not be cached."""
+        if route not in DEFAULT_TTLS:
+            return None
+        places = tuple(sorted(parsed.place(name).lower() for name in parsed.cities))
+        if route == "agent" and not places:
+            return None
+        base = (
+            route,
+            time.strftime("%Y-%m-%d"),
+            parsed.day,
+            places,
+            tuple(sorted(parsed.metrics)),
+            parsed.alert_state,
+        )
+        if route == "agent":
+            # Open-ended questions also keep their content words
+            words = tuple(sorted({t for t in tokenize(parsed.text) if t not in STOPWORDS}))
+            return base + (words,)
+        return base
+
+    def ttl(self, route: str) -> float:
+        ttl = self.ttls[route]
+        if route in FORECAST_ROUTES:
+            ttl = min(ttl, seconds_until_refresh())
+        return ttl
+
+    def get(self, route: str, parsed: ParsedQuery) -> str | None:
+        key = self.key(route, parsed)
+        if key is None:
+            return None
+        answer = self._cache.get(key)
+        with self._lock:
+            (self.hits if answer is not None else self.misses)[route] += 1
+        return answer
+
+    def put(self, route: str, parsed: ParsedQuery, answer: str, *, ok: bool) -> None:
+        """Cache ``answer`` unless it reports a failure (``ok`` False from the tool or agent)."""
+        key = self.key(route, parsed)
+        if key is None or not ok or not answer:
+            return
+        self._cache.set(key, answer, ttl=self.ttl(route))
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            hits, misses = sum(self.hits.values()), sum(self.misses.values())
+            return {
+                **self._cache.stats(),
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+                "by_route": {
+                    route: {
+                        "hits": self.hits[route],
+                        "misses": self.misses[route],
+                        "hit_rate": self.hits[route] / (self.hits[route] + self.misses[route]),
+                    }
+                    for route in self.hits.keys() | self.misses.keys()
+                },
+            }
@@ -0,0 +1,66 @@
+"""Decode the gridded forecasts returned by the ``get_area_forecast`` tool.
+
+The tool ends its text with a fenced ``area-grid`` block: JSON metadata
+(variable, units, date, grid axes) plus the values as base64 little-endian
+float32, row-major, rows north to south. That keeps a few hundred points to a
+few kilobytes instead of a long text table, and the app can draw it as a
+heatmap without asking the LLM to relay numbers.
+"""
+
+import base64
+import json
+import re
+from dataclasses import dataclass
+
+import numpy as np
+
+FENCE_RE = re.compile(r"```area-grid\s*\n(.*?)\n```", re.S)
+
+
+@dataclass
+class AreaGrid:
+    variable: str
+    units: str
+    date: str | None
+    lats: np.ndarray
+    lons: np.ndarray
+    values: np.ndarray  # (len(lats), len(lons)); NaN where no data
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> "AreaGrid":
+        values = np.frombuffer(base64.b64decode(payload["data"]), dtype="<f4").reshape(payload["shape"])
+        return cls(
+            variable=payload["variable"],
+            units=payload.get("units", ""),
+            date=payload.get("date"),
+            lats=np.asarray(payload["lats"], dtype=float),
+            lons=np.asarray(payload["lons"], dtype=float),
+            values=values,
+        )
+
+    def records(self) -> list[dict]:
+        """One ``{"lat", "lon", "value"}`` row per point with data, for charting."""
+        lat, lon = np.meshgrid(self.lats, self.lons, indexing="ij")
+        valid = ~np.isnan(self.values)
+        return [
+            {"lat": a, "lon": o, "value": round(v, 2)}
+            for a, o, v in zip(lat[valid].tolist(), lon[valid].tolist(), self.values[valid].tolist())
+        ]
+
+
+def extract_payloads(text: str) -> list[dict]:
+    """The ``area-grid`` payloads embedded in a tool result or answer (JSON-serializable)."""
+    payloads = []
+    for match in FENCE_RE.finditer(text or ""):
+        try:
+            payload = json.loads(match.group(1))
+        except ValueError:
+            continue
+        if isinstance(payload, dict) and {"data", "shape", "lats", "lons", "variable"} <= payload.keys():
+            payloads.append(payload)
+    return payloads
+
+
+def strip_grids(text: str) -> str:
+    """``text`` without ``area-grid`` blocks (shown as a map instead)."""
+    return FENCE_RE.sub("", text).strip()
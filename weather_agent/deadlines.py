@@ -0,0 +1,38 @@
+"""Send the caller's remaining time budget with every MCP tool call.
+
+The weather server runs each tool under the budget in the request's
+``_meta.deadline_ms`` (milliseconds the client is still willing to wait) and
+gives every upstream call only what is left of it; without one it falls back
+to its own ``TOOL_DEADLINE_SECONDS`` (see mcpserver/upstream.py).
+
+A query is run inside ``deadline_scope(seconds)``; every tool call made in
+that context - by the router's direct handlers or by the LLM agent's tools,
+which run in child tasks that inherit the context - carries the time left,
+and the client stops waiting for the reply when it runs out.
+``install(connector)`` routes an mcp-use connector's tool calls through here;
+``transport.connect_client`` does that for every session it opens.
+
+The scope and the request itself live in mcpserver/deadline.py, shared with
+the servers and the load-test clients.
+"""
+
+import os
+from typing import Any
+
+from mcp import types
+
+from mcpserver.deadline import call_tool, deadline_scope, remaining  # noqa: F401 (re-exported)
+
+# Default budget for one user query, tool calls and LLM steps included
+QUERY_DEADLINE = float(os.getenv("QUERY_DEADLINE_SECONDS", "180"))
+
+
+def install(connector) -> None:
+    """Make an mcp-use connector send deadlines with its tool calls."""
+
+    async def call_tool_with_deadline(name: str, arguments: dict[str, Any]) -> types.CallToolResult:
+        if not connector.client:
+            raise RuntimeError("MCP client is not connected")
+        return await call_tool(connector.client, name, arguments)
+
+    connector.call_tool = call_tool_with_deadline
@@ -0,0 +1,164 @@
+"""Direct Open-Meteo access for the Streamlit fast path (no LLM, no MCP).
+
+Coroutines here are meant to run on the shared loop in
+``weather_agent.event_loop``; all requests go through one pooled
+``httpx.AsyncClient`` living on that loop, so keep-alive connections
+survive reruns. Results are cached process-wide, so every browser session benefits:
+
+* geocoding results for ``GEOCODE_TTL_SECONDS`` (default one day)
+* daily forecasts for ``FORECAST_TTL_SECONDS`` (default 15 minutes)
+
+Concurrent requests for the same key share one in-flight fetch.
+"""
+
+import asyncio
+import os
+from typing import Any, Awaitable, Callable
+
+import httpx
+
+from weather_agent.ttl_cache import TTLCache
+
+GEOCODE_URL = "https://geocoding-api.open-meteo.com/v1/search"
+FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+DAILY_VARIABLES = "temperature_2m_max,temperature_2m_min,precipitation_sum,windspeed_10m_max,uv_index_max,sunrise,sunset"
+
+geocode_cache = TTLCache(ttl=float(os.getenv("GEOCODE_TTL_SECONDS", "86400")), max_entries=4096)
+forecast_cache = TTLCache(ttl=float(os.getenv("FORECAST_TTL_SECONDS", "900")), max_entries=1024)
+COMPARE_CONCURRENCY = int(os.getenv("COMPARE_CONCURRENCY", "4"))
+# Misses are cached briefly so a typo is not re-queried on every rerun
+MISS_TTL = 600.0
+
+_client: httpx.AsyncClient | None = None
+_inflight: dict[tuple, asyncio.Future] = {}
+
+
+def get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(10.0, connect=5.0),
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+        )
+    return _client
+
+
+async def _cached(cache: TTLCache, key: tuple, fetch: Callable[[], Awaitable[Any]], empty: Callable[[Any], bool]) -> Any:
+    """Return a cached value, or fetch it once for all concurrent callers."""
+    value = cache.get(key)
+    if value is not None:
+        return value
+    if key not in _inflight:
+        _inflight[key] = asyncio.ensure_future(fetch())
+    future = _inflight[key]
+    try:
+        value = await asyncio.shield(future)
+    finally:
+        if future.done():
+            _inflight.pop(key, None)
+    if value is not None:  # failed fetches are retried, not cached
+        cache.set(key, value, ttl=MISS_TTL if empty(value) else None)
+    return value
+
+
+async def geocode(name: str, count: int = 5) -> list[dict]:
+    """Candidate places for a name (possibly empty)."""
+    key = (name.strip().lower(), count)
+
+    async def fetch() -> list[dict] | None:
+        params = {"name": name, "count": count, "language": "en", "format": "json"}
+        try:
+            response = await get_client().get(GEOCODE_URL, params=params, timeout=5.0)
+            return response.json().get("results", [])
+        except (httpx.HTTPError, ValueError):
+            return None
+
+    return await _cached(geocode_cache, key, fetch, lambda results: not results) or []
+
+
+def _score(place: dict, query_words: list[str], qualifiers: list[str]) -> tuple:
+    name = place.get("name", "").lower()
+    region = " ".join(str(place.get(k, "")) for k in ("country", "admin1", "admin2", "country_code")).lower()
+    return (
+        name == " ".join(query_words),  # exact match on the full phrase
+        sum(q in region for q in qualifiers),  # "Hyderabad India" -> in India
+        place.get("population") or 0,
+    )
+
+
+async def find_place(city_name: str) -> dict | None:
+    """Best geocoding match for a free-text city name.
+
+    The full name and its first word are looked up concurrently; a full-name
+    hit wins, otherwise the first-word candidates are ranked by how well
+    their region matches the remaining words (e.g. "Hyderabad India"). A
+    state or country after a comma ("Portland, Oregon") is not looked up but
+    ranks the candidates the same way.
+    """
+    name, _, qualifier = city_name.partition(",")
+    words = name.lower().split()
+    qualifiers = qualifier.lower().split()
+    if not words:
+        return None
+    lookups = [geocode(name.strip())]
+    if len(words) > 1:
+        lookups.append(geocode(words[0]))
+    results = await asyncio.gather(*lookups)
+
+    full = results[0]
+    if full:
+        return max(full, key=lambda p: _score(p, words, qualifiers))
+    if len(results) > 1 and results[1]:
+        return max(results[1], key=lambda p: _score(p, words[:1], words[1:] + qualifiers))
+    return None
+
+
+async def daily_forecast(latitude: float, longitude: float) -> dict | None:
+    """Open-Meteo daily forecast block for a point, or None on failure."""
+    key = (round(latitude, 3), round(longitude, 3))
+
+    async def fetch() -> dict | None:
+        params = {"latitude": latitude, "longitude": longitude, "daily": DAILY_VARIABLES, "timezone": "auto"}
+        try:
+            response = await get_client().get(FORECAST_URL, params=params)
+            return response.json().get("daily")
+        except (httpx.HTTPError, ValueError):
+            return None
+
+    return await _cached(forecast_cache, key, fetch, lambda daily: not daily)
+
+
+async def city_weather(city_name: str) -> tuple[dict, dict] | None:
+    """Geocode a city and fetch its daily forecast: ``(place, daily)`` or None."""
+    place = await find_place(city_name)
+    if place is None:
+        return None
+    daily = await daily_forecast(place["latitude"], place["longitude"])
+    if daily is None:
+        return None
+    return place, daily
+
+
+async def compare_cities(city_names: list[str], concurrency: int = COMPARE_CONCURRENCY) -> list[tuple[str, tuple[dict, dict] | None]]:
+    """Look up several cities at once, at most ``concurrency`` in flight.
+
+    Total time tracks the slowest city rather than the sum of all of them.
+    Returns ``(requested name, (place, daily) or None)`` in input order.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(name: str) -> tuple[dict, dict] | None:
+        async with semaphore:
+            return await city_weather(name)
+
+    results = await asyncio.gather(*(one(name) for name in city_names))
+    return list(zip(city_names, results))
+
+
+def display_name(place: dict) -> str:
+    country = place.get("country", "")
+    return f"{place['name']}, {country}" if country else place["name"]
+
+
+def cache_stats() -> dict[str, dict]:
+    return {"geocode": geocode_cache.stats(), "forecast": forecast_cache.stats()}
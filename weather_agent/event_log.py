@@ -0,0 +1,189 @@
+"""Bounded in-memory event log for the System Logs tab.
+
+Entries live in a fixed-capacity ring buffer: once full, each new entry
+evicts the oldest, so a long-running session holds at most ``capacity``
+entries. Everything the tab shows is kept up to date on insert/evict
+instead of being recomputed from the whole list each rerun:
+
+* per-level counters (total events, success rate, error count),
+* per-level indexes, so filtering by level only walks matching entries,
+* each entry's lowercase search text and export line/JSON fragment, so the
+  downloads are a join, done only when the log changed since the last one.
+
+Entries may carry a session ID (``jsonl_log.LogTail`` feeds one process-wide
+log from every session's events); per-session counters are kept as well.
+"""
+
+import heapq
+import json
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+LEVELS = ("INFO", "SUCCESS", "WARNING", "ERROR")
+# Streamlit Cloud uses UTC by default; timestamps are shown in IST
+IST_OFFSET = timedelta(hours=5, minutes=30)
+
+
+@dataclass(slots=True)
+class LogEntry:
+    seq: int
+    time: str
+    msg: str
+    type: str
+    session: str | None
+    fields: dict
+    haystack: str = field(repr=False)
+    text: str = field(repr=False)
+    json: str = field(repr=False)
+
+    def as_dict(self) -> dict:
+        record = {"time": self.time, "msg": self.msg, "type": self.type}
+        if self.session is not None:
+            record["session"] = self.session
+        return {**record, **self.fields}
+
+
+class EventLog:
+    def __init__(self, capacity: int = 1000):
+        """
+        Args:
+            capacity: Most entries kept; older ones are dropped first
+        """
+        self.capacity = capacity
+        self._entries: deque[LogEntry] = deque()
+        self._by_level: dict[str, deque[LogEntry]] = {level: deque() for level in LEVELS}
+        self._counts: Counter[str] = Counter()
+        self._session_counts: Counter[tuple[str | None, str]] = Counter()
+        self._session_totals: Counter[str | None] = Counter()
+        self._seq = 0
+        self.dropped = 0
+        self._exports: tuple[int, str, str] | None = None  # (seq, txt, json)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    def add(self, message: str, level: str = "INFO", time: str | None = None, session: str | None = None, **fields) -> LogEntry:
+        """Append an entry; ``time`` defaults to now (IST ``HH:MM:SS``)."""
+        level = level.upper()
+        timestamp = time or (datetime.utcnow() + IST_OFFSET).strftime("%H:%M:%S")
+        self._seq += 1
+        entry = LogEntry(
+            seq=self._seq,
+            time=timestamp,
+            msg=message,
+            type=level,
+            session=session,
+            fields=fields,
+            haystack=f"{message.lower()}\0{level.lower()}",
+            text=f"[{timestamp}] {level}: {message}",
+            json="",
+        )
+        entry.json = "\n".join("  " + line for line in json.dumps(entry.as_dict(), indent=2, default=str).splitlines())
+        if len(self._entries) >= self.capacity:
+            self._evict()
+        self._entries.append(entry)
+        self._by_level.setdefault(level, deque()).append(entry)
+        self._counts[level] += 1
+        self._session_counts[session, level] += 1
+        self._session_totals[session] += 1
+        return entry
+
+    def _evict(self) -> None:
+        oldest = self._entries.popleft()
+        # Each level index is in insertion order too, so the oldest is at its left
+        self._by_level[oldest.type].popleft()
+        self._counts[oldest.type] -= 1
+        self._session_counts[oldest.session, oldest.type] -= 1
+        self._session_totals[oldest.session] -= 1
+        if not self._session_totals[oldest.session]:
+            # Forget sessions with nothing left, so the counters stay bounded too
+            del self._session_totals[oldest.session]
+            for level in {*LEVELS, oldest.type}:
+                self._session_counts.pop((oldest.session, level), None)
+        self.dropped += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        for index in self._by_level.values():
+            index.clear()
+        self._counts.clear()
+        self._session_counts.clear()
+        self._session_totals.clear()
+        self._seq += 1  # invalidates cached exports
+        self.dropped = 0
+
+    def count(self, level: str) -> int:
+        return self._counts[level.upper()]
+
+    @property
+    def success_rate(self) -> float:
+        """Share of SUCCESS entries among those kept, in percent."""
+        return self._counts["SUCCESS"] / len(self._entries) * 100 if self._entries else 0.0
+
+    def summary(self, session: str | None = None, since: int = 0) -> tuple[int, Counter[str]]:
+        """(total, per-level counts) for one session (or all) after entry ``since``.
+
+        Served from the counters unless ``since`` hides kept entries; then
+        only the entries after it are counted.
+        """
+        if not self._entries or since < self._entries[0].seq:
+            if session is None:
+                return len(self._entries), Counter(self._counts)
+            counts = Counter({level: n for (s, level), n in self._session_counts.items() if s == session})
+            return self._session_totals[session], counts
+        counts: Counter[str] = Counter()
+        for entry in reversed(self._entries):
+            if entry.seq <= since:
+                break
+            if session is None or entry.session == session:
+                counts[entry.type] += 1
+        return sum(counts.values()), counts
+
+    def filter(self, levels=LEVELS, search: str = "", session: str | None = None, since: int = 0) -> list[LogEntry]:
+        """Entries of the given levels whose message or level contains ``search``, oldest first.
+
+        ``session`` keeps one session's entries; ``since`` drops entries up to that sequence number.
+        """
+        levels = {level.upper() for level in levels}
+        if levels >= self._by_level.keys():
+            candidates = self._entries
+        else:
+            indexes = [self._by_level[level] for level in levels if self._by_level.get(level)]
+            candidates = indexes[0] if len(indexes) == 1 else heapq.merge(*indexes, key=lambda e: e.seq)
+        needle = search.lower()
+        if not (needle or session is not None or since):
+            return list(candidates)
+        return [
+            entry for entry in candidates
+            if entry.seq > since
+            and (session is None or entry.session == session)
+            and needle in entry.haystack
+        ]
+
+    def _build_exports(self) -> tuple[str, str]:
+        if self._exports is None or self._exports[0] != self._seq:
+            txt = "\n".join(entry.text for entry in self._entries)
+            body = ",\n".join(entry.json for entry in self._entries)
+            self._exports = (self._seq, txt, f"[\n{body}\n]" if body else "[]")
+        return self._exports[1], self._exports[2]
+
+    def to_text(self, entries: list[LogEntry] | None = None) -> str:
+        """TXT export of ``entries`` (default: everything kept)."""
+        if entries is None:
+            return self._build_exports()[0]
+        return "\n".join(entry.text for entry in entries)
+
+    def to_json(self, entries: list[LogEntry] | None = None) -> str:
+        """JSON export of ``entries`` (default: everything kept)."""
+        if entries is None:
+            return self._build_exports()[1]
+        body = ",\n".join(entry.json for entry in entries)
+        return f"[\n{body}\n]" if body else "[]"
+
+    def entries(self) -> list[dict[str, str]]:
+        return [entry.as_dict() for entry in self._entries]
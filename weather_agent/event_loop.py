@@ -0,0 +1,57 @@
+"""One long-lived asyncio loop, on a background thread, for the whole process.
+
+Streamlit runs each rerun of each session on its own script thread. Instead
+of running a loop per rerun (and nesting loops with ``nest_asyncio``), every
+coroutine is submitted here and the script thread only waits on the
+returned future. The loop owns all MCP sessions (``AgentPool``) and HTTP
+clients (``direct_api``), so connections stay warm across reruns, and work
+from different sessions overlaps instead of each rerun blocking on its own.
+"""
+
+import asyncio
+import concurrent.futures
+import os
+import threading
+from typing import Any, Awaitable
+
+_loop: asyncio.AbstractEventLoop | None = None
+_thread: threading.Thread | None = None
+_lock = threading.Lock()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """The shared loop, started on first use (and restarted if it died)."""
+    global _loop, _thread
+    with _lock:
+        if _loop is None or _loop.is_closed() or _thread is None or not _thread.is_alive():
+            if os.name == "nt":
+                # MCP stdio servers are subprocesses, which need the proactor loop
+                _loop = asyncio.WindowsProactorEventLoopPolicy().new_event_loop()
+            else:
+                _loop = asyncio.new_event_loop()
+            _thread = threading.Thread(target=_loop.run_forever, name="weather-agent-loop", daemon=True)
+            _thread.start()
+        return _loop
+
+
+def submit(coro: Awaitable) -> concurrent.futures.Future:
+    """Schedule a coroutine on the shared loop; returns immediately.
+
+    Cancelling the returned future cancels the task on the loop.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, get_loop())
+
+
+def run(coro: Awaitable, timeout: float | None = 30.0) -> Any:
+    """Run a coroutine on the shared loop and wait for its result."""
+    future = submit(coro)
+    try:
+        return future.result(timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise
+
+
+def in_loop() -> bool:
+    """True when called from the shared loop's own thread."""
+    return _thread is not None and threading.current_thread() is _thread
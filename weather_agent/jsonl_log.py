@@ -0,0 +1,270 @@
+"""Process-wide structured event log, written as JSONL.
+
+Every session's events go to one file, one JSON object per line, with a
+full UTC timestamp, level, message, session ID and whatever fields the
+caller adds (latency, route, cache status, tool names), so logs survive
+resets and can be aggregated across users::
+
+    {"ts": "2026-10-19T10:26:31.412+00:00", "level": "SUCCESS", "msg": "...",
+     "session": "3f9c1a2b7d4e", "route": "weather", "cached": false, "latency_s": 0.41}
+
+``JsonlLogger.log`` only puts the record on a queue; a writer thread
+drains it and writes whatever has accumulated in one go, so the request
+path never waits on disk. The file is rotated by size
+(``weather_events.jsonl`` → ``.1`` → ``.2`` …).
+
+``LogTail`` follows the file for the System Logs tab: it remembers its
+offset and reads only what was appended since the last poll (picking up
+the rest of the old file across a rotation), feeding a bounded
+``EventLog``.
+"""
+
+import atexit
+import json
+import os
+import queue
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+from .event_log import IST_OFFSET, LEVELS, EventLog, LogEntry
+
+DEFAULT_PATH = "logs/weather_events.jsonl"
+_STOP = object()
+
+
+class JsonlLogger:
+    def __init__(
+        self,
+        path: str | os.PathLike = DEFAULT_PATH,
+        max_bytes: int = 10 * 1024 * 1024,
+        backups: int = 5,
+        batch_size: int = 512,
+        queue_size: int = 10_000,
+    ):
+        """
+        Args:
+            path: JSONL file to append to (directories are created)
+            max_bytes: Rotate once the file reaches this size
+            backups: Rotated files kept (``path.1`` is the newest)
+            batch_size: Most records written per write call
+            queue_size: Records buffered before new ones are dropped
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.batch_size = batch_size
+        self.written = 0
+        self.dropped = 0  # queue full or write failed
+        self._queue: queue.Queue = queue.Queue(queue_size)
+        self._file = None
+        self._thread = threading.Thread(target=self._run, name="weather-event-log", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def log(self, message: str, level: str = "INFO", **fields) -> None:
+        """Queue one event; never blocks. ``None`` fields are left out."""
+        record = {
+            "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "level": level.upper(),
+            "msg": message,
+            **{key: value for key, value in fields.items() if value is not None},
+        }
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            record = self._queue.get()
+            stop = record is _STOP
+            batch = [] if stop else [record]
+            # Take whatever else is already queued: one write per burst
+            while not stop and len(batch) < self.batch_size:
+                try:
+                    record = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if record is _STOP:
+                    stop = True
+                else:
+                    batch.append(record)
+            if batch:
+                self._write(batch)
+            if stop:
+                if self._file is not None:
+                    self._file.close()
+                return
+
+    def _write(self, batch: list[dict]) -> None:
+        data = "".join(json.dumps(record, ensure_ascii=False, default=str) + "\n" for record in batch)
+        try:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(data)
+            self._file.flush()
+            self.written += len(batch)
+            if self._file.tell() >= self.max_bytes:
+                self._rotate()
+        except OSError:
+            self.dropped += len(batch)
+            self._file = None
+
+    def _rotate(self) -> None:
+        self._file.close()
+        self._file = None
+        for i in range(self.backups - 1, 0, -1):
+            older = self.path.with_name(f"{self.path.name}.{i}")
+            if older.exists():
+                older.replace(self.path.with_name(f"{self.path.name}.{i + 1}"))
+        if self.backups:
+            self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Write out everything queued, then stop the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+
+_logger: JsonlLogger | None = None
+_logger_lock = threading.Lock()
+
+
+def get_logger() -> JsonlLogger:
+    """The process-wide logger (``WEATHER_EVENT_LOG`` sets the file)."""
+    global _logger
+    with _logger_lock:
+        if _logger is None:
+            _logger = JsonlLogger(
+                os.getenv("WEATHER_EVENT_LOG", DEFAULT_PATH),
+                max_bytes=int(float(os.getenv("WEATHER_EVENT_LOG_MAX_MB", "10")) * 1024 * 1024),
+                backups=int(os.getenv("WEATHER_EVENT_LOG_BACKUPS", "5")),
+            )
+        return _logger
+
+
+def display_time(ts: str) -> str:
+    """ISO UTC timestamp -> ``YYYY-MM-DD HH:MM:SS`` in IST."""
+    try:
+        return (datetime.fromisoformat(ts) + IST_OFFSET).strftime("%Y-%m-%d %H:%M:%S")
+    except (TypeError, ValueError):
+        return str(ts)
+
+
+@dataclass
+class LogView:
+    """One consistent read of the tailed log, filtered for display.
+
+    The TXT/JSON exports are built from ``entries`` only when asked for, so a
+    rerun that just shows the log does not pay for them.
+    """
+
+    entries: list[LogEntry]
+    total: int
+    counts: Counter
+    log: EventLog
+
+    @property
+    def success_rate(self) -> float:
+        return self.counts["SUCCESS"] / self.total * 100 if self.total else 0.0
+
+    def text(self) -> str:
+        return self.log.to_text(self.entries)
+
+    def json(self) -> str:
+        return self.log.to_json(self.entries)
+
+
+class LogTail:
+    def __init__(self, path: str | os.PathLike = DEFAULT_PATH, capacity: int = 1000, initial_bytes: int = 512 * 1024):
+        """
+        Args:
+            path: JSONL file written by ``JsonlLogger``
+            capacity: Most recent events kept in memory
+            initial_bytes: How far back from the end to start on first poll
+        """
+        self.path = Path(path)
+        self.initial_bytes = initial_bytes
+        self.log = EventLog(capacity=capacity)
+        self._inode: int | None = None
+        self._offset = 0
+        self._partial = b""
+        self._lock = threading.Lock()
+
+    @property
+    def last_seq(self) -> int:
+        with self._lock:
+            return self.log.last_seq
+
+    def view(self, levels=LEVELS, search: str = "", session: str | None = None, since: int = 0) -> LogView:
+        """Poll, then filter and count under the lock (sessions share the tail)."""
+        with self._lock:
+            self._poll()
+            entries = self.log.filter(levels, search, session, since)
+            total, counts = self.log.summary(session, since)
+            return LogView(entries, total, counts, self.log)
+
+    def poll(self) -> EventLog:
+        """Read events appended since the last poll; returns the updated log."""
+        with self._lock:
+            return self._poll()
+
+    def _poll(self) -> EventLog:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            stat = None  # not written yet, or rotated and not recreated yet
+        if self._inode is None:
+            if stat is None:
+                return self.log
+            self._offset = max(0, stat.st_size - self.initial_bytes)
+            self._read(self.path, skip_partial=self._offset > 0)
+        elif stat is None or stat.st_ino != self._inode or stat.st_size < self._offset:
+            # Rotated: finish the old file (now .1) if it is still there
+            rotated = self.path.with_name(f"{self.path.name}.1")
+            try:
+                if rotated.stat().st_ino == self._inode:
+                    self._read(rotated)
+            except FileNotFoundError:
+                pass
+            self._offset, self._partial = 0, b""
+            if stat is None:
+                self._inode = 0  # next poll reads the new file from the start
+                return self.log
+            self._read(self.path)
+        elif stat.st_size > self._offset:
+            self._read(self.path)
+        self._inode = stat.st_ino
+        return self.log
+
+    def _read(self, path: Path, skip_partial: bool = False) -> None:
+        with open(path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read()
+            self._offset = f.tell()
+        lines = (self._partial + data).split(b"\n")
+        self._partial = lines.pop()  # incomplete last line, finished by a later write
+        if skip_partial and lines:
+            lines.pop(0)  # started mid-line
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(record, dict):
+                continue
+            fields = {k: v for k, v in record.items() if k not in ("ts", "level", "msg", "session", "time", "type")}
+            self.log.add(
+                str(record.get("msg", "")),
+                str(record.get("level", "INFO")),
+                time=display_time(record.get("ts")),
+                session=record.get("session"),
+                **fields,
+            )
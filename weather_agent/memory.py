@@ -0,0 +1,143 @@
+"""Token-bounded conversation memory with a rolling summary.
+
+``MCPAgent(memory_enabled=True)`` resends the whole conversation every
+turn, so prompt size and latency grow with the session. This keeps:
+
+* the last ``keep_turns`` exchanges verbatim,
+* one rolling summary message covering everything older,
+* bulky answers (full alert texts, forecast dumps) cut down once they are
+  no longer the latest turn - they were already used to answer,
+
+and folds the oldest turns into the summary until the history fits
+``token_budget``. Folding calls the LLM, but runs after the answer has been
+shown (``compact`` in the background), never in front of the next query.
+
+Pass ``messages()`` as ``external_history`` to ``MCPAgent.run`` with the
+agent's own memory disabled.
+"""
+
+import asyncio
+from dataclasses import dataclass
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+
+SUMMARY_PREFIX = "Summary of our earlier conversation: "
+SUMMARY_PROMPT = (
+    "Update the running summary of a weather-assistant conversation. Keep "
+    "places, dates, user preferences and conclusions; drop raw data. Reply "
+    "with the summary only, at most {words} words.\n\n"
+    "Current summary:\n{summary}\n\nNew exchanges:\n{turns}"
+)
+
+
+def count_tokens(text: str) -> int:
+    """Cheap token estimate (about four characters per token)."""
+    return len(text) // 4 + 1
+
+
+@dataclass
+class Turn:
+    user: str
+    answer: str
+
+
+class ConversationMemory:
+    def __init__(
+        self,
+        llm=None,
+        token_budget: int = 1500,
+        keep_turns: int = 4,
+        max_answer_chars: int = 600,
+        summary_words: int = 120,
+    ):
+        """
+        Args:
+            llm: Chat model used to fold old turns into the summary; without
+                one, folded turns are kept as truncated notes instead
+            token_budget: Target size of the history sent with each query
+            keep_turns: Most recent exchanges always kept verbatim
+            max_answer_chars: Older answers are cut to this many characters
+            summary_words: Length cap for the rolling summary
+        """
+        self.llm = llm
+        self.token_budget = token_budget
+        self.keep_turns = keep_turns
+        self.max_answer_chars = max_answer_chars
+        self.summary_words = summary_words
+        self.summary = ""
+        self.turns: list[Turn] = []
+        self.prompt_tokens: list[int] = []  # history tokens sent with each query
+        self._compacting: asyncio.Task | None = None
+
+    def _trim(self, text: str) -> str:
+        if len(text) <= self.max_answer_chars:
+            return text
+        return text[: self.max_answer_chars].rstrip() + " […trimmed]"
+
+    def messages(self) -> list[BaseMessage]:
+        """History to send with the next query."""
+        messages: list[BaseMessage] = []
+        if self.summary:
+            messages.append(AIMessage(content=SUMMARY_PREFIX + self.summary))
+        for i, turn in enumerate(self.turns):
+            latest = i == len(self.turns) - 1
+            messages.append(HumanMessage(content=turn.user))
+            messages.append(AIMessage(content=turn.answer if latest else self._trim(turn.answer)))
+        return messages
+
+    def history_tokens(self) -> int:
+        return sum(count_tokens(m.content) for m in self.messages())
+
+    def record_prompt(self, query: str) -> int:
+        """Note the tokens this query will send (history + query) and return them."""
+        tokens = self.history_tokens() + count_tokens(query)
+        self.prompt_tokens.append(tokens)
+        return tokens
+
+    def add_turn(self, user: str, answer: str) -> None:
+        self.turns.append(Turn(user, answer))
+
+    def _over_budget(self) -> bool:
+        return len(self.turns) > self.keep_turns or self.history_tokens() > self.token_budget
+
+    async def compact(self) -> None:
+        """Fold the oldest turns into the summary until the history fits."""
+        folded: list[Turn] = []
+        while self._over_budget() and len(self.turns) > 1:
+            folded.append(self.turns.pop(0))
+        if not folded:
+            return
+        notes = "\n".join(f"User: {t.user}\nAssistant: {self._trim(t.answer)}" for t in folded)
+        if self.llm is None:
+            self.summary = (self.summary + "\n" + notes).strip()[-self.summary_words * 8:]
+            return
+        prompt = SUMMARY_PROMPT.format(words=self.summary_words, summary=self.summary or "(none)", turns=notes)
+        try:
+            reply = await self.llm.ainvoke(prompt)
+            self.summary = str(reply.content).strip()
+        except Exception:
+            # Keep the facts even if summarizing failed; they are trimmed already
+            self.summary = (self.summary + "\n" + notes).strip()[-self.summary_words * 8:]
+
+    def compact_in_background(self) -> None:
+        """Start ``compact`` without waiting; a running compaction is reused."""
+        if self._over_budget() and (self._compacting is None or self._compacting.done()):
+            self._compacting = asyncio.get_running_loop().create_task(self.compact())
+
+    async def settle(self) -> None:
+        """Wait for a background compaction, so the next prompt sees its result."""
+        if self._compacting is not None and not self._compacting.done():
+            await self._compacting
+
+    def clear(self) -> None:
+        self.summary = ""
+        self.turns.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "turns_kept": len(self.turns),
+            "summary_tokens": count_tokens(self.summary) if self.summary else 0,
+            "history_tokens": self.history_tokens(),
+            "last_prompt_tokens": self.prompt_tokens[-1] if self.prompt_tokens else 0,
+            "max_prompt_tokens": max(self.prompt_tokens, default=0),
+        }
@@ -0,0 +1,431 @@
+"""Query understanding for the direct (no-LLM) weather path.
+
+Everything here is built once at import: the stopword set, the compiled
+patterns and an Aho-Corasick automaton over known place names and their
+aliases/misspellings. ``parse`` then costs one pass over the query's tokens
+and returns every place mentioned, so "compare Delhi, Mumbai and Pune"
+yields three cities that can be looked up concurrently.
+
+Places that are not in the gazetteer are still found: the query is split
+into segments on separators ("," / "and" / "vs" / ...) and whatever is left
+of a segment after dropping stopwords is taken as a free-text place name.
+"""
+
+import re
+import string
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Generic, Iterable, TypeVar
+
+V = TypeVar("V")
+
+STOPWORDS = frozenset("""
+    what whats is the tell me about show how give a an can you please provide do does did are were
+    weather wether report forecast current today tomorrow going to rain it will be there any updates
+    temperature temp wind speed humidity precipitation snow sunny cloudy hot cold warm cool uv index
+    now right this morning afternoon evening night day days week weekend
+    check look search find in at for like of on get
+    compare comparison between versus vs and or with which cities city than
+    warmer colder hotter cooler rainier windier raining rainy windy snowing sunscreen umbrella
+    outside there conditions alerts alert
+""".split())
+
+# Place after an anchor word, up to a time word or the end of the question
+ANCHOR_RE = re.compile(
+    r"\b(?:in|at|for|like)\s+(.+?)(?:\?|$| today| tomorrow| right| now| current| weather| forecast)",
+    re.IGNORECASE,
+)
+SEPARATOR_RE = re.compile(r"\s*(?:,|;|&|/|\band\b|\bor\b|\bvs\.?|\bversus\b|\bwith\b)\s*", re.IGNORECASE)
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:['-][a-z0-9]+)*")
+DAYS_RE = re.compile(r"\b(\d{1,2})[- ]?days?\b", re.IGNORECASE)
+COMPARE_RE = re.compile(r"\b(?:compare|comparison|versus|vs\.?|between|warmer|colder|hotter|cooler|rainier|windier)\b", re.IGNORECASE)
+_PUNCTUATION = str.maketrans("", "", string.punctuation.replace("'", "").replace("-", ""))
+
+METRIC_WORDS = {
+    "temperature": "temperature", "temp": "temperature", "hot": "temperature", "cold": "temperature",
+    "warm": "temperature", "cool": "temperature", "warmer": "temperature", "colder": "temperature",
+    "hotter": "temperature", "cooler": "temperature",
+    "rain": "precipitation", "raining": "precipitation", "rainy": "precipitation", "rainier": "precipitation",
+    "precipitation": "precipitation", "umbrella": "precipitation", "snow": "precipitation", "snowing": "precipitation",
+    "wind": "wind", "windy": "wind", "windier": "wind",
+    "uv": "uv", "sunscreen": "uv",
+    "humidity": "humidity", "humid": "humidity",
+    "sunrise": "sun", "sunset": "sun",
+}
+
+# Canonical name -> aliases and common misspellings (all matched case-insensitively)
+CITIES = {
+    "Delhi": ["dilli", "new delhi", "delhi ncr"],
+    "Mumbai": ["bombay", "mumbay"],
+    "Kolkata": ["calcutta", "kolkatta"],
+    "Chennai": ["madras"],
+    "Bangalore": ["bengaluru", "banglore", "bangaluru"],
+    "Hyderabad": ["hydrabad"],
+    "Pune": ["poona"],
+    "Ahmedabad": ["amdavad"],
+    "Jaipur": [],
+    "Lucknow": [],
+    "Kanpur": [],
+    "Patna": [],
+    "Bhopal": [],
+    "Indore": [],
+    "Nagpur": [],
+    "Surat": [],
+    "Chandigarh": [],
+    "Kochi": ["cochin"],
+    "Thiruvananthapuram": ["trivandrum"],
+    "Varanasi": ["banaras", "benares"],
+    "Goa": [],
+    "Shimla": ["simla"],
+    "Manali": [],
+    "Mussoorie": ["massuri", "mussoori", "masoori"],
+    "Dehradun": ["dehra dun"],
+    "Nainital": [],
+    "Rishikesh": [],
+    "Haridwar": [],
+    "Darjeeling": [],
+    "Srinagar": [],
+    "Leh": [],
+    "Guwahati": [],
+    "Bhubaneswar": [],
+    "Visakhapatnam": ["vizag"],
+    "Agra": [],
+    "Amritsar": [],
+    "Udaipur": [],
+    "Mysore": ["mysuru"],
+    "Ooty": ["udhagamandalam"],
+    "London": [],
+    "Paris": [],
+    "Berlin": [],
+    "Madrid": [],
+    "Rome": [],
+    "Amsterdam": [],
+    "Moscow": [],
+    "Istanbul": [],
+    "Dubai": [],
+    "Singapore": [],
+    "Tokyo": [],
+    "Beijing": ["peking"],
+    "Shanghai": [],
+    "Hong Kong": [],
+    "Seoul": [],
+    "Bangkok": [],
+    "Sydney": [],
+    "Melbourne": [],
+    "Toronto": [],
+    "Vancouver": [],
+    "New York": ["nyc", "new york city"],
+    "Los Angeles": [],
+    "San Francisco": ["sf"],
+    "Chicago": [],
+    "Seattle": [],
+    "Miami": [],
+    "Boston": [],
+    "Washington": ["washington dc", "dc"],
+    "Cairo": [],
+    "Nairobi": [],
+    "Cape Town": [],
+    "Sao Paulo": ["são paulo"],
+    "Mexico City": [],
+    "Karachi": [],
+    "Lahore": [],
+    "Dhaka": [],
+    "Kathmandu": [],
+    "Colombo": [],
+}
+
+# States and countries: used as the place only when no city is named with them,
+# and as a qualifier of the city before them ("Hyderabad, India")
+REGIONS = {
+    "Uttarakhand": ["uttrakhand", "uttaranchal"],
+    "Himachal Pradesh": ["himachal"],
+    "Kerala": [],
+    "Rajasthan": [],
+    "Maharashtra": [],
+    "Karnataka": [],
+    "Tamil Nadu": [],
+    "Punjab": [],
+    "Kashmir": [],
+    "Sikkim": [],
+    "India": [],
+    "Nepal": [],
+    "Pakistan": [],
+    "Bangladesh": [],
+    "Sri Lanka": [],
+    "China": [],
+    "Japan": [],
+    "South Korea": ["korea"],
+    "Thailand": [],
+    "Australia": [],
+    "UAE": ["united arab emirates"],
+    "Turkey": ["turkiye"],
+    "Russia": [],
+    "France": [],
+    "Germany": [],
+    "Spain": [],
+    "Italy": [],
+    "Netherlands": ["holland"],
+    "Egypt": [],
+    "Kenya": [],
+    "South Africa": [],
+    "Brazil": [],
+    "Mexico": [],
+    "Canada": [],
+    "USA": ["united states", "america"],
+    "UK": ["united kingdom", "england", "britain"],
+    "California": [],
+    "Texas": [],
+    "Florida": [],
+}
+
+US_STATES = {
+    "Alabama": "AL", "Alaska": "AK", "Arizona": "AZ", "Arkansas": "AR", "California": "CA",
+    "Colorado": "CO", "Connecticut": "CT", "Delaware": "DE", "Florida": "FL", "Georgia": "GA",
+    "Hawaii": "HI", "Idaho": "ID", "Illinois": "IL", "Indiana": "IN", "Iowa": "IA",
+    "Kansas": "KS", "Kentucky": "KY", "Louisiana": "LA", "Maine": "ME", "Maryland": "MD",
+    "Massachusetts": "MA", "Michigan": "MI", "Minnesota": "MN", "Mississippi": "MS", "Missouri": "MO",
+    "Montana": "MT", "Nebraska": "NE", "Nevada": "NV", "New Hampshire": "NH", "New Jersey": "NJ",
+    "New Mexico": "NM", "New York": "NY", "North Carolina": "NC", "North Dakota": "ND", "Ohio": "OH",
+    "Oklahoma": "OK", "Oregon": "OR", "Pennsylvania": "PA", "Rhode Island": "RI", "South Carolina": "SC",
+    "South Dakota": "SD", "Tennessee": "TN", "Texas": "TX", "Utah": "UT", "Vermont": "VT",
+    "Virginia": "VA", "Washington": "WA", "West Virginia": "WV", "Wisconsin": "WI", "Wyoming": "WY",
+    "District of Columbia": "DC",
+}
+STATE_CODES = frozenset(US_STATES.values())
+# Upper-case code anywhere ("alerts for CA"), or any case after a preposition ("alerts in tx")
+STATE_CODE_RE = re.compile(r"\b([A-Z]{2})\b|\b(?:in|for|of)\s+([a-zA-Z]{2})\b(?!\w)")
+
+ALERT_WORDS = frozenset({"alert", "alerts", "warning", "warnings", "watch", "watches", "advisory", "advisories"})
+WEATHER_WORDS = frozenset({"weather", "wether", "forecast", "conditions", "outside", "sunny", "cloudy"}) | METRIC_WORDS.keys()
+# Questions that need reasoning, advice or data the fast path doesn't serve
+OPEN_ENDED_RE = re.compile(
+    r"\b(?:why|should|explain|recommend|suggest|plan|planning|pack|wear|advice|best time|history|"
+    r"changed?|yesterday|last week|trip|travel|difference|what if|how come)\b",
+    re.IGNORECASE,
+)
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+class PhraseMatcher(Generic[V]):
+    """Aho-Corasick automaton over word tokens.
+
+    Phrases are token tuples, so matches always fall on word boundaries and
+    every phrase is found in a single pass regardless of how many exist.
+    """
+
+    def __init__(self, phrases: Iterable[tuple[tuple[str, ...], V]]):
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[list[tuple[int, V]]] = [[]]
+        for tokens, value in phrases:
+            state = 0
+            for token in tokens:
+                if token not in self._goto[state]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                    self._goto[state][token] = len(self._goto) - 1
+                state = self._goto[state][token]
+            self._out[state].append((len(tokens), value))
+
+        # Breadth-first failure links; outputs of the fallback state are merged in
+        queue = deque(self._goto[0].values())  # depth-1 states fall back to the root
+        while queue:
+            state = queue.popleft()
+            for token, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(token, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def find_all(self, tokens: list[str]) -> list[tuple[int, int, V]]:
+        """Every ``(start, end, value)`` match, end-exclusive token indices."""
+        matches = []
+        state = 0
+        for i, token in enumerate(tokens):
+            while state and token not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(token, 0)
+            for length, value in self._out[state]:
+                matches.append((i + 1 - length, i + 1, value))
+        return matches
+
+    def find(self, tokens: list[str]) -> list[tuple[int, int, V]]:
+        """Leftmost-longest, non-overlapping matches in token order."""
+        matches = sorted(self.find_all(tokens), key=lambda m: (m[0], -(m[1] - m[0])))
+        chosen, end = [], 0
+        for match in matches:
+            if match[0] >= end:
+                chosen.append(match)
+                end = match[1]
+        return chosen
+
+
+@dataclass(frozen=True)
+class Place:
+    name: str
+    kind: str  # "city", "region" or "text" (free text, not in the gazetteer)
+
+
+def _phrases() -> Iterable[tuple[tuple[str, ...], Place]]:
+    for kind, table in (("city", CITIES), ("region", REGIONS)):
+        for canonical, aliases in table.items():
+            place = Place(canonical, kind)
+            for name in [canonical, *aliases]:
+                yield tuple(tokenize(name)), place
+
+
+PLACES: PhraseMatcher[Place] = PhraseMatcher(_phrases())
+KNOWN_NAMES = frozenset(CITIES) | frozenset(REGIONS)
+
+
+@dataclass(frozen=True)
+class ParsedQuery:
+    text: str
+    cities: list[str] = field(default_factory=list)
+    metrics: frozenset[str] = frozenset()
+    day: str = "today"  # "today", "tomorrow", "weekend" or "<n>d"
+    compare: bool = False
+    alert_state: str | None = None  # two-letter US state code when alerts are asked for
+    about_weather: bool = False  # mentions weather, a forecast or a metric
+    open_ended: bool = False  # asks for advice, reasoning or history
+    known_places: bool = False  # every place came from the gazetteer
+    qualifiers: dict[str, str] = field(default_factory=dict)  # city -> state/country named after it
+
+    @property
+    def city(self) -> str | None:
+        return self.cities[0] if self.cities else None
+
+    def place(self, city: str) -> str:
+        """``city`` with its qualifier, for lookups ("Portland, Oregon")."""
+        qualifier = self.qualifiers.get(city)
+        return f"{city}, {qualifier}" if qualifier else city
+
+    @property
+    def intent(self) -> str:
+        """``alerts``, ``compare``, ``weather``, ``open`` or ``unknown``."""
+        if self.open_ended:
+            return "open"
+        if self.alert_state:
+            return "alerts"
+        if not (self.about_weather or self.known_places):
+            return "unknown"
+        if len(self.cities) > 1:
+            return "compare"
+        if self.cities:
+            return "weather"
+        return "unknown"
+
+
+def _segment_places(segment: str) -> list[str]:
+    """Places in one separator-delimited piece of the query."""
+    tokens = tokenize(segment)
+    found = PLACES.find(tokens)
+    cities = [place.name for _, _, place in found if place.kind == "city"]
+    if cities:
+        return cities
+    if found:
+        return [found[0][2].name]
+    words = [
+        w for w in segment.translate(_PUNCTUATION).split()
+        if w.lower() not in STOPWORDS and len(w) > 1 and not any(c.isdigit() for c in w)
+    ]
+    return [" ".join(w if w[0].isupper() else w.capitalize() for w in words)] if words else []
+
+
+def _qualifier(segment: str) -> str | None:
+    """The state, country or region a segment consists of, if that is all it is."""
+    tokens = [t for t in tokenize(segment) if t not in STOPWORDS]
+    found = QUALIFIERS.find(tokens)
+    if len(found) == 1 and found[0][:2] == (0, len(tokens)):
+        return found[0][2]
+    return None
+
+
+def _places_in(span: str) -> tuple[list[str], dict[str, str]]:
+    places, qualifiers = [], {}
+    for i, piece in enumerate(span.split(",")):
+        for j, segment in enumerate(SEPARATOR_RE.split(piece)):
+            # "Hyderabad, India": a region right after a comma narrows the
+            # city before it down instead of being a second place
+            if i and not j and places and places[-1] not in REGIONS and places[-1] not in qualifiers:
+                qualifier = _qualifier(segment)
+                if qualifier:
+                    qualifiers[places[-1]] = qualifier
+                    continue
+            for name in _segment_places(segment):
+                if name not in places:
+                    places.append(name)
+    return places, qualifiers
+
+
+def extract_places(text: str) -> tuple[list[str], dict[str, str]]:
+    """Every place mentioned in a query, in order and without duplicates,
+    plus the state or country qualifying each city that has one."""
+    match = ANCHOR_RE.search(text)
+    if match:
+        places, qualifiers = _places_in(match.group(1))
+        if places:
+            return places, qualifiers
+    # No anchor, or it picked a span without a place ("for tomorrow"): use it all
+    return _places_in(text)
+
+
+def extract_cities(text: str) -> list[str]:
+    """Every place mentioned in a query, in order and without duplicates."""
+    return extract_places(text)[0]
+
+
+STATES: PhraseMatcher[str] = PhraseMatcher((tuple(tokenize(name)), code) for name, code in US_STATES.items())
+# Names that can qualify a city; states that are also cities ("Washington",
+# "New York") are left out, so "Boston, Washington" still compares two places
+QUALIFIERS: PhraseMatcher[str] = PhraseMatcher(
+    [(tuple(tokenize(name)), canonical) for canonical, aliases in REGIONS.items() for name in [canonical, *aliases]]
+    + [(tuple(tokenize(name)), name) for name in US_STATES if name not in CITIES]
+)
+
+
+def alert_state(text: str, tokens: list[str]) -> str | None:
+    """US state code for an alerts question ("any alerts in Texas?" -> TX)."""
+    if not ALERT_WORDS.intersection(tokens):
+        return None
+    for upper, after_preposition in STATE_CODE_RE.findall(text):
+        code = (upper or after_preposition).upper()
+        if code in STATE_CODES:
+            return code
+    found = STATES.find(tokens)
+    return found[0][2] if found else None
+
+
+def _day(text: str, tokens: list[str]) -> str:
+    if "tomorrow" in tokens:
+        return "tomorrow"
+    if "weekend" in tokens:
+        return "weekend"
+    days = DAYS_RE.search(text)
+    if days:
+        return f"{int(days.group(1))}d"
+    return "today"
+
+
+def parse(text: str) -> ParsedQuery:
+    """Parse a free-text weather question."""
+    tokens = tokenize(text)
+    cities, qualifiers = extract_places(text)
+    return ParsedQuery(
+        text=text,
+        cities=cities,
+        metrics=frozenset(METRIC_WORDS[t] for t in tokens if t in METRIC_WORDS),
+        day=_day(text, tokens),
+        compare=len(cities) > 1 or bool(COMPARE_RE.search(text)),
+        alert_state=alert_state(text, tokens),
+        about_weather=bool(WEATHER_WORDS.intersection(tokens)),
+        open_ended=bool(OPEN_ENDED_RE.search(text)),
+        known_places=bool(cities) and all(name in KNOWN_NAMES for name in cities),
+        qualifiers=qualifiers,
+    )
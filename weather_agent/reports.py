@@ -0,0 +1,104 @@
+"""Markdown rendering of direct-API weather results for the chat."""
+
+from weather_agent.direct_api import display_name
+
+# Days the fast path can report on; the router sends other days to the agent
+DAY_INDEX = {"today": 0, "tomorrow": 1}
+
+
+def day_index(day: str) -> int:
+    """Index into Open-Meteo daily arrays for a parsed day ("today", "tomorrow", ...)."""
+    return DAY_INDEX.get(day, 0)
+
+
+def _value(daily: dict, key: str, i: int):
+    values = daily.get(key) or []
+    return values[i] if i < len(values) and values[i] is not None else None
+
+
+def city_report(place: dict, daily: dict) -> str:
+    """Conversational summary plus detailed report for one city."""
+    city_display = display_name(place)
+    today = daily["time"][0]
+    temp_max = daily['temperature_2m_max'][0]
+    temp_min = daily['temperature_2m_min'][0]
+    wind = daily['windspeed_10m_max'][0]
+    precip = daily['precipitation_sum'][0]
+    uv = daily['uv_index_max'][0]
+
+    summary = f"Hello! Here's the weather update for {city_display}. "
+    summary += f"Today's temperature will range from a low of {temp_min}°C to a high of {temp_max}°C. "
+    if precip > 0:
+        summary += f"You can expect some precipitation today, with about {precip}mm of rainfall, so don't forget your umbrella! "
+    else:
+        summary += f"Good news - no rain is expected today, so you can leave your umbrella at home! "
+    summary += f"The wind will be blowing at {wind} km/h, and the UV index is {uv}, "
+    if uv > 6:
+        summary += "so make sure to wear sunscreen if you're heading outdoors. "
+    elif uv > 3:
+        summary += "so some sun protection would be wise. "
+    else:
+        summary += "so UV exposure is minimal today. "
+    summary += f"Have a great day in {city_display}!\n\n"
+
+    response = summary
+    response += f"---\n\n"
+    response += f"🌤️ **Detailed Weather Report for {city_display}**\n\n"
+    response += f"📅 **Date**: {today}\n\n"
+    response += f"**Today's Forecast:**\n\n"
+    response += f"* 🌡️ **Temperature**: Max {temp_max}°C / Min {temp_min}°C\n\n"
+    response += f"* 💨 **Wind Speed**: {wind} km/h\n\n"
+    response += f"* ☔ **Precipitation**: {precip} mm\n\n"
+    response += f"* ☀️ **UV Index**: {uv}\n\n"
+    response += f"* 🌅 **Sunrise**: {daily['sunrise'][0].split('T')[1]}\n\n"
+    response += f"* 🌇 **Sunset**: {daily['sunset'][0].split('T')[1]}\n\n"
+
+    # Add 3-day forecast
+    response += "\n**3-Day Forecast:**\n\n"
+    for i in range(1, min(4, len(daily["time"]))):
+        response += f"**{daily['time'][i]}**: {daily['temperature_2m_max'][i]}°C / {daily['temperature_2m_min'][i]}°C, Wind: {daily['windspeed_10m_max'][i]} km/h\n\n"
+    return response
+
+
+def comparison_table(results: list[tuple[str, tuple[dict, dict] | None]], day: str = "today") -> str:
+    """Side-by-side table for several cities, plus a one-line verdict.
+
+    Args:
+        results: Output of ``direct_api.compare_cities``
+        day: Parsed day to compare ("today" or "tomorrow")
+    """
+    i = day_index(day)
+    rows, missing = [], []
+    for requested, found in results:
+        if found is None or _value(found[1], "temperature_2m_max", i) is None:
+            missing.append(requested)
+            continue
+        place, daily = found
+        rows.append((display_name(place), daily["time"][i], {
+            key: _value(daily, key, i)
+            for key in ("temperature_2m_max", "temperature_2m_min", "precipitation_sum", "windspeed_10m_max", "uv_index_max")
+        }))
+
+    if not rows:
+        return "❌ Sorry, I couldn't find weather data for any of: " + ", ".join(f"'{name}'" for name in missing)
+
+    lines = [
+        f"🌍 **Weather comparison for {day}** ({rows[0][1]})\n",
+        "| City | 🌡️ Max (°C) | 🌡️ Min (°C) | ☔ Rain (mm) | 💨 Wind (km/h) | ☀️ UV |",
+        "|---|---|---|---|---|---|",
+    ]
+    for name, _, v in rows:
+        cells = [v[key] if v[key] is not None else "N/A" for key in v]
+        lines.append(f"| {name} | " + " | ".join(str(c) for c in cells) + " |")
+
+    if len(rows) > 1:
+        warmest = max(rows, key=lambda r: r[2]["temperature_2m_max"])
+        coolest = min(rows, key=lambda r: r[2]["temperature_2m_max"])
+        wettest = max(rows, key=lambda r: r[2]["precipitation_sum"] or 0)
+        verdict = f"\n🔥 Warmest: **{warmest[0]}** ({warmest[2]['temperature_2m_max']}°C) · ❄️ Coolest: **{coolest[0]}** ({coolest[2]['temperature_2m_max']}°C)"
+        if (wettest[2]["precipitation_sum"] or 0) > 0:
+            verdict += f" · 🌧️ Wettest: **{wettest[0]}** ({wettest[2]['precipitation_sum']} mm)"
+        lines.append(verdict)
+    if missing:
+        lines.append("\n⚠️ No data found for: " + ", ".join(missing))
+    return "\n".join(lines)
@@ -0,0 +1,250 @@
+"""Deterministic fast-path routing in front of the LLM agent.
+
+Every query is parsed once (``query_parser.parse``) and classified by
+intent. Intents with a registered handler - "weather in X", "compare X and
+Y", "alerts in ST" - are answered directly from the weather tools without
+any LLM call; open-ended or unrecognised queries go to the fallback, which
+is normally ``MCPAgent.run``.
+
+Each query runs under a deadline (``deadlines.QUERY_DEADLINE`` by default)
+that every MCP tool call made while answering it sends to the server.
+
+An optional ``AnswerCache`` is checked first; hits are counted under the
+``cache`` route. Per-route counts and latencies are kept so ``metrics()``
+can show the fast path hit rate and roughly how much LLM time it saved
+(answers not from the agent x the agent's mean latency).
+"""
+
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+from weather_agent import deadlines, direct_api, reports
+from weather_agent.answer_cache import AnswerCache
+from weather_agent.query_parser import ParsedQuery, parse
+
+FALLBACK = "agent"
+CACHED = "cache"
+
+_COORDINATES_RE = re.compile(r"Found (?P<name>.+?): Latitude (?P<lat>-?[\d.]+), Longitude (?P<lon>-?[\d.]+)")
+# The weather tools report upstream failures as ordinary text starting with these
+TOOL_ERROR_PREFIXES = ("Error", "Unable to fetch", "Could not")
+# MCPAgent.run returns its own failures (errors, step limit) as text like this
+AGENT_FAILURE_PREFIX = "Agent stopped"
+
+
+@dataclass
+class Answer:
+    """A handler's (or tool's) reply and whether it actually answered."""
+
+    text: str
+    ok: bool = True
+
+
+Handler = Callable[[ParsedQuery], Awaitable[Answer]]
+Fallback = Callable[[str], Awaitable[str | Answer]]
+ToolCaller = Callable[[str, dict[str, Any]], Awaitable[Answer]]
+
+
+def tool_answer(result) -> Answer:
+    """Text of an MCP ``CallToolResult``; not ok if it is an error or reports one."""
+    text = "\n".join(getattr(item, "text", str(item)) for item in result.content)
+    return Answer(text, ok=not result.isError and not text.startswith(TOOL_ERROR_PREFIXES))
+
+
+def agent_answer(text: str) -> Answer:
+    """An ``MCPAgent.run`` result; not ok if the agent gave up."""
+    return Answer(text, ok=not text.startswith(AGENT_FAILURE_PREFIX))
+
+
+@dataclass
+class RouteResult:
+    route: str
+    answer: str
+    seconds: float
+    parsed: ParsedQuery
+    cached: bool = False
+    ok: bool = True
+
+
+class RouteStats:
+    def __init__(self, window: int = 200):
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.samples: deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float, ok: bool = True) -> None:
+        self.count += 1
+        self.errors += not ok
+        self.total_seconds += seconds
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> float | None:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    @property
+    def mean(self) -> float | None:
+        return self.total_seconds / self.count if self.count else None
+
+
+class Router:
+    """Send each query to an intent handler, or to the fallback agent."""
+
+    def __init__(
+        self,
+        handlers: dict[str, Handler],
+        fallback: Fallback | None = None,
+        cache: AnswerCache | None = None,
+        deadline: float | None = deadlines.QUERY_DEADLINE,
+    ):
+        """
+        Args:
+            handlers: Intent name (see ``ParsedQuery.intent``) -> handler
+            fallback: Coroutine function answering anything else (the agent);
+                can also be given per call to ``handle``
+            cache: Answer cache consulted before any handler runs
+            deadline: Seconds one query may take; sent with its tool calls
+                (None: the server's default per call)
+        """
+        self.handlers = handlers
+        self.fallback = fallback
+        self.cache = cache
+        self.deadline = deadline
+        self._stats: dict[str, RouteStats] = {}
+        self._lock = threading.Lock()
+
+    def classify(self, query: str) -> tuple[str, ParsedQuery]:
+        parsed = parse(query)
+        intent = parsed.intent
+        if intent == "compare" and parsed.day not in reports.DAY_INDEX:
+            # Comparison tables cover one day, today or tomorrow; a weekend
+            # or "in 3 days" is left to the agent
+            return FALLBACK, parsed
+        return (intent if intent in self.handlers else FALLBACK), parsed
+
+    async def handle(self, query: str, fallback: Fallback | None = None) -> RouteResult:
+        route, parsed = self.classify(query)
+        fallback = fallback or self.fallback
+        if route == FALLBACK and fallback is None:
+            raise ValueError(f"No handler for intent {parsed.intent!r} and no fallback")
+        start = time.perf_counter()
+        if self.cache is not None:
+            answer = self.cache.get(route, parsed)
+            if answer is not None:
+                seconds = time.perf_counter() - start
+                self._record(CACHED, seconds, True)
+                return RouteResult(route, answer, seconds, parsed, cached=True)
+        answer = Answer("", ok=False)
+        try:
+            with deadlines.deadline_scope(self.deadline):
+                if route == FALLBACK:
+                    answer = await fallback(query)
+                else:
+                    answer = await self.handlers[route](parsed)
+            if isinstance(answer, str):
+                answer = Answer(answer)
+        finally:
+            seconds = time.perf_counter() - start
+            self._record(route, seconds, answer.ok)
+        if self.cache is not None:
+            self.cache.put(route, parsed, answer.text, ok=answer.ok)
+        return RouteResult(route, answer.text, seconds, parsed, ok=answer.ok)
+
+    def _record(self, route: str, seconds: float, ok: bool) -> None:
+        with self._lock:
+            self._stats.setdefault(route, RouteStats()).record(seconds, ok)
+
+    def metrics(self) -> dict[str, Any]:
+        """Per-route latency plus fast-path hit rate and estimated LLM time saved."""
+        with self._lock:
+            routes = {
+                name: {
+                    "count": stats.count,
+                    "errors": stats.errors,
+                    "mean": stats.mean,
+                    "p50": stats.percentile(0.50),
+                    "p95": stats.percentile(0.95),
+                }
+                for name, stats in self._stats.items()
+            }
+            total = sum(stats.count for stats in self._stats.values())
+            agent = self._stats.get(FALLBACK)
+            fast = total - (agent.count if agent else 0)
+            fast_seconds = sum(s.total_seconds for name, s in self._stats.items() if name != FALLBACK)
+        saved = fast * agent.mean - fast_seconds if agent and agent.mean is not None else None
+        return {
+            "total": total,
+            "fast_path": fast,
+            "hit_rate": fast / total if total else 0.0,
+            "llm_seconds_saved": saved,
+            "routes": routes,
+            "answer_cache": self.cache.stats() if self.cache is not None else None,
+        }
+
+
+def tool_handlers(call_tool: ToolCaller) -> dict[str, Handler]:
+    """Intent handlers that answer straight from the weather server's MCP tools.
+
+    Tool errors are returned as they are, marked not ok, never dressed up as
+    an answer.
+
+    Args:
+        call_tool: Coroutine ``(tool name, arguments) -> Answer`` on a live session
+    """
+
+    async def alerts(parsed: ParsedQuery) -> Answer:
+        found = await call_tool("get_alerts", {"state": parsed.alert_state})
+        if not found.ok:
+            return found
+        return Answer(f"⚠️ Active weather alerts for {parsed.alert_state}:\n\n{found.text}")
+
+    async def weather(parsed: ParsedQuery) -> Answer:
+        found = await call_tool("get_coordinates", {"city_name": parsed.city})
+        match = _COORDINATES_RE.search(found.text) if found.ok else None
+        if not match:
+            return Answer(found.text, ok=False)
+        forecast = await call_tool("get_global_forecast", {"latitude": match["lat"], "longitude": match["lon"]})
+        if not forecast.ok:
+            return forecast
+        return Answer(f"🌤️ Forecast for {match['name']}:\n\n{forecast.text}")
+
+    async def compare(parsed: ParsedQuery) -> Answer:
+        return await call_tool("compare_cities", {"cities": ", ".join(parsed.cities), "day": reports.day_index(parsed.day)})
+
+    return {"alerts": alerts, "weather": weather, "compare": compare}
+
+
+def direct_handlers() -> dict[str, Handler]:
+    """Weather and comparison handlers that call Open-Meteo via ``direct_api``.
+
+    Cheaper than the MCP tools for the Streamlit app: results come from the
+    process-wide caches and render with the app's own report format.
+    """
+
+    async def weather(parsed: ParsedQuery) -> Answer:
+        found = await direct_api.city_weather(parsed.place(parsed.city))
+        if found is None:
+            return Answer(f"❌ Sorry, I couldn't find weather data for '{parsed.place(parsed.city)}'. Please check the city name and try again.", ok=False)
+        return Answer(reports.city_report(*found))
+
+    async def compare(parsed: ParsedQuery) -> Answer:
+        results = await direct_api.compare_cities([parsed.place(city) for city in parsed.cities])
+        return Answer(reports.comparison_table(results, parsed.day), ok=any(found is not None for _, found in results))
+
+    return {"weather": weather, "compare": compare}
+
+
+def session_tool_caller(session) -> ToolCaller:
+    """Adapt an mcp-use ``MCPSession`` to the ``ToolCaller`` signature."""
+
+    async def call_tool(name: str, arguments: dict[str, Any]) -> Answer:
+        return tool_answer(await session.call_tool(name, arguments))
+
+    return call_tool
@@ -0,0 +1,253 @@
+"""Speech-to-text for voice queries, off the Streamlit script thread.
+
+The recorded WAV is decoded and shrunk with NumPy before any engine sees
+it: downmixed to mono, resampled to 16 kHz and trimmed of leading/trailing
+silence (a short query recorded with a few seconds of pause is mostly
+silence). Engines are pluggable; the local CPU ones need no network:
+
+* ``whisper`` - faster-whisper (``pip install faster-whisper``), local
+* ``sphinx``  - CMU PocketSphinx via SpeechRecognition (``pip install pocketsphinx``), local
+* ``google``  - SpeechRecognition's free Google Web Speech API (network)
+
+``SPEECH_BACKEND`` picks one; by default the first installed of that list
+is used. ``submit`` runs a transcription on a small thread pool and returns
+a future, so the UI keeps responding while it works. Every result carries
+per-stage timings.
+"""
+
+import concurrent.futures
+import importlib.util
+import io
+import os
+import threading
+import time
+import wave
+from dataclasses import dataclass, field
+from typing import Callable
+
+import numpy as np
+
+TARGET_RATE = 16_000
+UNINTELLIGIBLE = "Error: Could not understand audio (Speech was unintelligible)"
+
+# name -> fn(samples: float32 mono at TARGET_RATE) -> text ("" if nothing recognised)
+Backend = Callable[[np.ndarray], str]
+BACKENDS: dict[str, Backend] = {}
+# Modules each backend needs, to pick a default among the installed ones
+REQUIRES: dict[str, tuple[str, ...]] = {}
+PREFERENCE = ("whisper", "sphinx", "google")
+
+
+def register_backend(name: str, requires: tuple[str, ...] = ()):
+    """Decorator adding a transcription backend under ``name``."""
+
+    def decorator(fn: Backend) -> Backend:
+        BACKENDS[name] = fn
+        REQUIRES[name] = requires
+        return fn
+
+    return decorator
+
+
+def available_backends() -> list[str]:
+    return [
+        name for name in BACKENDS
+        if all(importlib.util.find_spec(module) is not None for module in REQUIRES[name])
+    ]
+
+
+def default_backend() -> str:
+    configured = os.getenv("SPEECH_BACKEND")
+    if configured:
+        return configured
+    available = available_backends()
+    return next((name for name in PREFERENCE if name in available), "google")
+
+
+# --- Preprocessing ---
+
+def decode_wav(data: bytes) -> tuple[np.ndarray, int]:
+    """PCM WAV bytes -> (float32 samples in [-1, 1], shape (frames, channels); sample rate)."""
+    with wave.open(io.BytesIO(data), "rb") as wav:
+        channels, width, rate = wav.getnchannels(), wav.getsampwidth(), wav.getframerate()
+        raw = wav.readframes(wav.getnframes())
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width == 2:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768
+    elif width == 3:
+        # 24-bit: sign-extend each 3-byte sample into an int32
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        samples = ((b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)) << 8 >> 8).astype(np.float32) / 8388608
+    elif width == 4:
+        samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {width} bytes")
+    return samples.reshape(-1, channels), rate
+
+
+def to_mono(samples: np.ndarray) -> np.ndarray:
+    return samples.mean(axis=1) if samples.ndim == 2 else samples
+
+
+def resample(samples: np.ndarray, rate: int, target: int = TARGET_RATE) -> np.ndarray:
+    """Linear-interpolation resample, box-filtered first when downsampling."""
+    if rate == target or samples.size == 0:
+        return samples.astype(np.float32, copy=False)
+    if rate > target:
+        width = int(np.ceil(rate / target))
+        if width > 1:
+            # Cheap anti-aliasing: average over one output sample's span
+            samples = np.convolve(samples, np.full(width, 1 / width, dtype=np.float32), mode="same")
+    n_out = int(round(samples.size * target / rate))
+    positions = np.arange(n_out, dtype=np.float64) * (rate / target)
+    return np.interp(positions, np.arange(samples.size), samples).astype(np.float32)
+
+
+def trim_silence(
+    samples: np.ndarray,
+    rate: int = TARGET_RATE,
+    threshold_db: float = -35.0,
+    frame_ms: int = 20,
+    pad_ms: int = 200,
+) -> np.ndarray:
+    """Drop leading/trailing frames quieter than ``threshold_db`` below the loudest frame."""
+    frame = max(1, rate * frame_ms // 1000)
+    n_frames = samples.size // frame
+    if n_frames == 0:
+        return samples
+    rms = np.sqrt(np.mean(samples[: n_frames * frame].reshape(n_frames, frame) ** 2, axis=1))
+    peak = rms.max()
+    if peak <= 1e-4:
+        return samples[:0]  # digital silence
+    loud = np.flatnonzero(rms >= peak * 10 ** (threshold_db / 20))
+    pad = rate * pad_ms // 1000
+    start = max(0, loud[0] * frame - pad)
+    end = min(samples.size, (loud[-1] + 1) * frame + pad)
+    return samples[start:end]
+
+
+def to_pcm16(samples: np.ndarray) -> bytes:
+    return (np.clip(samples, -1, 1) * 32767).astype("<i2").tobytes()
+
+
+# --- Backends ---
+
+def _recognizer_audio(samples: np.ndarray):
+    import speech_recognition as sr
+
+    return sr, sr.Recognizer(), sr.AudioData(to_pcm16(samples), TARGET_RATE, 2)
+
+
+@register_backend("google", requires=("speech_recognition",))
+def _google(samples: np.ndarray) -> str:
+    sr, recognizer, audio = _recognizer_audio(samples)
+    try:
+        return recognizer.recognize_google(audio)
+    except sr.UnknownValueError:
+        return ""
+    except sr.RequestError as e:
+        raise ConnectionError(f"API connection failed; {e}") from e
+
+
+@register_backend("sphinx", requires=("speech_recognition", "pocketsphinx"))
+def _sphinx(samples: np.ndarray) -> str:
+    sr, recognizer, audio = _recognizer_audio(samples)
+    try:
+        return recognizer.recognize_sphinx(audio)
+    except sr.UnknownValueError:
+        return ""
+
+
+_whisper_model = None
+_whisper_lock = threading.Lock()
+
+
+@register_backend("whisper", requires=("faster_whisper",))
+def _whisper(samples: np.ndarray) -> str:
+    global _whisper_model
+    with _whisper_lock:  # load the model once, even if two recordings arrive together
+        if _whisper_model is None:
+            from faster_whisper import WhisperModel
+
+            _whisper_model = WhisperModel(
+                os.getenv("WHISPER_MODEL", "base.en"),
+                device="cpu",
+                compute_type="int8",
+                cpu_threads=int(os.getenv("WHISPER_THREADS", "0")),
+            )
+    # Voice queries are one short sentence: greedy decoding is enough
+    segments, _ = _whisper_model.transcribe(samples, beam_size=1, language=os.getenv("WHISPER_LANGUAGE", "en"))
+    return " ".join(segment.text.strip() for segment in segments).strip()
+
+
+# --- Pipeline ---
+
+@dataclass
+class Transcription:
+    text: str = ""
+    error: str | None = None
+    backend: str = ""
+    input_seconds: float = 0.0
+    speech_seconds: float = 0.0  # after trimming
+    timings: dict[str, float] = field(default_factory=dict)
+
+    def timing_summary(self) -> str:
+        return ", ".join(f"{stage} {seconds * 1000:.0f}ms" for stage, seconds in self.timings.items())
+
+
+def transcribe(audio_bytes: bytes, backend: str | None = None) -> Transcription:
+    """Decode, preprocess and recognise one recording (blocking)."""
+    name = backend or default_backend()
+    result = Transcription(backend=name)
+    started = last = time.perf_counter()
+
+    def lap(stage: str) -> None:
+        nonlocal last
+        now = time.perf_counter()
+        result.timings[stage] = now - last
+        last = now
+
+    try:
+        engine = BACKENDS[name]
+    except KeyError:
+        result.error = f"Error transcribing: unknown speech backend '{name}' (have {', '.join(BACKENDS)})"
+        return result
+    try:
+        samples, rate = decode_wav(audio_bytes)
+        result.input_seconds = samples.shape[0] / rate if rate else 0.0
+        lap("decode")
+        speech = trim_silence(resample(to_mono(samples), rate))
+        result.speech_seconds = speech.size / TARGET_RATE
+        lap("preprocess")
+        if speech.size == 0:
+            result.error = UNINTELLIGIBLE
+            return result
+        result.text = engine(speech).strip()
+        lap("recognize")
+        if not result.text:
+            result.error = UNINTELLIGIBLE
+    except ConnectionError as e:
+        result.error = f"Error: {e}"
+    except Exception as e:
+        # e.g. file format issues or a backend that failed to load
+        err_msg = str(e) if str(e) else repr(e)
+        result.error = f"Error transcribing: {err_msg}"
+    finally:
+        result.timings["total"] = time.perf_counter() - started
+    return result
+
+
+_executor: concurrent.futures.ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def submit(audio_bytes: bytes, backend: str | None = None) -> concurrent.futures.Future:
+    """Transcribe on the shared worker pool; returns a future of ``Transcription``."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=int(os.getenv("SPEECH_WORKERS", "2")), thread_name_prefix="weather-speech"
+            )
+    return _executor.submit(transcribe, audio_bytes, backend)
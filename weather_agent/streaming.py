@@ -0,0 +1,127 @@
+"""Stream an agent run's LLM tokens and tool events to another thread.
+
+``MCPAgent.run`` takes no callbacks, so the handler is attached through a
+LangChain configure hook bound to a context variable: every LLM and tool
+call made inside ``stream_to(recorder)`` reports to that recorder, and
+concurrent runs on the same loop stay separate because each task has its
+own context. The LLM must be created with ``streaming=True`` for tokens to
+arrive one by one.
+
+Events go into a thread-safe queue, so the Streamlit script thread can
+render them while the run itself executes on the background loop.
+"""
+
+import queue
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.tracers.context import register_configure_hook
+
+TOKEN = "token"
+LLM_START = "llm_start"
+TOOL_START = "tool_start"
+TOOL_END = "tool_end"
+
+
+@dataclass
+class StreamEvent:
+    kind: str
+    text: str = ""
+    at: float = 0.0
+
+
+class StreamRecorder(AsyncCallbackHandler):
+    """Collects events for one run; drained from any thread."""
+
+    def __init__(self):
+        self.events: queue.Queue[StreamEvent] = queue.Queue()
+        self.started = time.perf_counter()
+        self.first_token_at: float | None = None
+        self.tool_calls = 0
+        self.tool_outputs: list[str] = []
+
+    @property
+    def time_to_first_token(self) -> float | None:
+        return self.first_token_at - self.started if self.first_token_at is not None else None
+
+    def _put(self, kind: str, text: str = "") -> None:
+        self.events.put(StreamEvent(kind, text, time.perf_counter()))
+
+    async def on_chat_model_start(self, serialized: dict[str, Any], messages: list, **kwargs: Any) -> None:
+        self._put(LLM_START)
+
+    async def on_llm_start(self, serialized: dict[str, Any], prompts: list[str], **kwargs: Any) -> None:
+        self._put(LLM_START)
+
+    async def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        if not token:
+            return  # tool-call chunks carry no text
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        self._put(TOKEN, token)
+
+    async def on_tool_start(self, serialized: dict[str, Any], input_str: str, **kwargs: Any) -> None:
+        self.tool_calls += 1
+        self._put(TOOL_START, (serialized or {}).get("name") or kwargs.get("name") or "tool")
+
+    async def on_tool_end(self, output: Any, **kwargs: Any) -> None:
+        # Kept for results the app renders itself (e.g. area-grid maps)
+        self.tool_outputs.append(str(getattr(output, "content", output)))
+        self._put(TOOL_END, kwargs.get("name") or "")
+
+    def drain(self) -> list[StreamEvent]:
+        """All events queued so far, without blocking."""
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
+
+
+_recorder: ContextVar[StreamRecorder | None] = ContextVar("weather_stream_recorder", default=None)
+register_configure_hook(_recorder, inheritable=True)
+
+
+@contextmanager
+def stream_to(recorder: StreamRecorder):
+    """Send callbacks from LLM/tool calls made in this context to ``recorder``."""
+    token = _recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(token)
+
+
+class StreamView:
+    """Accumulates drained events into the text shown while a run is live."""
+
+    def __init__(self):
+        self.tools: list[str] = []
+        self.text = ""
+
+    def apply(self, events: list[StreamEvent]) -> bool:
+        """Fold events in; returns True if the visible text changed."""
+        changed = False
+        for event in events:
+            if event.kind == LLM_START:
+                # A new LLM step starts; earlier text was reasoning before a tool call
+                changed |= bool(self.text)
+                self.text = ""
+            elif event.kind == TOKEN:
+                self.text += event.text
+                changed = True
+            elif event.kind == TOOL_START:
+                self.tools.append(event.text)
+                changed = True
+        return changed
+
+    def render(self) -> str:
+        lines = [f"🔧 *Calling `{name}`…*" for name in self.tools]
+        if self.text:
+            lines.append(self.text + " ▌")
+        return "\n\n".join(lines) if lines else "⏳ *Thinking…*"
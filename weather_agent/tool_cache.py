@@ -0,0 +1,152 @@
+"""Reuse tool lists and LangChain tool wrappers while the server's tools are unchanged.
+
+The weather server advertises a hash of its tool schemas in
+``serverInfo.version`` (``0.1.0+tools.<hash>``, see mcpserver/tool_schema.py).
+mcp-use normally sends ``tools/list`` on every connect (twice, via
+``create_all_sessions``) and every ``MCPAgent.initialize`` converts each
+tool's JSON schema into a new Pydantic model. Here:
+
+* ``create_sessions`` initializes each session once and takes the tool list
+  from the cache (memory, then disk) when the hash is known,
+* ``CachingLangChainAdapter`` builds each tool wrapper once per hash and
+  hands out copies bound to the new connection.
+
+A server that does not advertise a hash is handled exactly as before. The
+hash parsing and the files on disk are mcpserver/tool_schema.py's, shared
+with the load-test clients.
+"""
+
+import logging
+import os
+import threading
+from pathlib import Path
+
+from langchain_core.tools import BaseTool
+from mcp.types import Tool
+from mcp_use import MCPAgent, MCPClient
+from mcp_use.adapters.langchain_adapter import LangChainAdapter
+from mcp_use.connectors.base import BaseConnector
+from mcp_use.session import MCPSession
+
+from mcpserver.tool_schema import CACHE_DIR, cache_path, read_cached_tools, schema_hash, write_cached_tools
+
+logger = logging.getLogger(__name__)
+
+
+class ToolCache:
+    def __init__(self, directory: str | os.PathLike | None = None):
+        """
+        Args:
+            directory: Where tool lists are persisted across processes;
+                ``None`` keeps them in memory only
+        """
+        self.directory = Path(directory) if directory else None
+        self._tools: dict[tuple[str, str], list[Tool]] = {}  # (server name, hash) -> tools
+        self._adapters: dict[tuple[str, str], BaseTool] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def tools(self, server: str, digest: str) -> list[Tool] | None:
+        key = (server, digest)
+        with self._lock:
+            tools = self._tools.get(key)
+        if tools is None and self.directory is not None:
+            tools = read_cached_tools(cache_path(server, digest, self.directory))
+            if tools is not None:
+                with self._lock:
+                    self._tools[key] = tools
+        with self._lock:
+            if tools is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return tools
+
+    def put_tools(self, server: str, digest: str, tools: list[Tool]) -> None:
+        with self._lock:
+            self._tools[server, digest] = list(tools)
+        if self.directory is not None and not write_cached_tools(cache_path(server, digest, self.directory), tools):
+            logger.debug("Could not persist tool list %s-%s", server, digest)
+
+    def adapter(self, digest: str, name: str) -> BaseTool | None:
+        with self._lock:
+            return self._adapters.get((digest, name))
+
+    def put_adapter(self, digest: str, name: str, tool: BaseTool) -> None:
+        with self._lock:
+            self._adapters[digest, name] = tool
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "schemas": len(self._tools), "adapters": len(self._adapters)}
+
+
+_cache: ToolCache | None = None
+_cache_lock = threading.Lock()
+
+
+def default_cache() -> ToolCache:
+    """Process-wide cache, persisted under ``WEATHER_TOOL_CACHE_DIR`` (default ~/.cache/weather-mcp/tools)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ToolCache(CACHE_DIR)
+        return _cache
+
+
+async def initialize_session(session: MCPSession, cache: ToolCache | None = None) -> None:
+    """``MCPSession.initialize`` that skips ``tools/list`` when the schema hash is cached."""
+    cache = cache or default_cache()
+    if not session.is_connected:
+        await session.connect()
+    connector = session.connector
+    init_result = await connector.client.initialize()
+    digest = schema_hash(init_result)
+    server = getattr(getattr(init_result, "serverInfo", None), "name", None) or "weather"
+    tools = cache.tools(server, digest) if digest else None
+    if tools is None:
+        tools = (await connector.client.list_tools()).tools
+        if digest:
+            cache.put_tools(server, digest, tools)
+    connector._tools = tools
+    connector.tool_schema_hash = digest  # read by CachingLangChainAdapter
+    session.session_info = init_result
+    session.tools = tools
+
+
+async def create_sessions(client: MCPClient, cache: ToolCache | None = None) -> dict[str, MCPSession]:
+    """Like ``client.create_all_sessions()``, with one ``initialize`` and cached tool lists."""
+    for name in client.config.get("mcpServers", {}):
+        session = await client.create_session(name, auto_initialize=False)
+        await initialize_session(session, cache)
+    return client.sessions
+
+
+class CachingLangChainAdapter(LangChainAdapter):
+    """``LangChainAdapter`` that converts each tool once per schema hash.
+
+    ``MCPAgent`` calls ``create_tools`` as a classmethod, which builds a new
+    adapter with default arguments, so the cache defaults to the shared one.
+    """
+
+    def __init__(self, disallowed_tools: list[str] | None = None, cache: ToolCache | None = None) -> None:
+        super().__init__(disallowed_tools)
+        self.cache = cache or default_cache()
+
+    def _convert_tool(self, mcp_tool: Tool, connector: BaseConnector) -> BaseTool | None:
+        digest = getattr(connector, "tool_schema_hash", None)
+        if digest is None or mcp_tool.name in self.disallowed_tools:
+            return super()._convert_tool(mcp_tool, connector)
+        template = self.cache.adapter(digest, mcp_tool.name)
+        if template is None:
+            template = super()._convert_tool(mcp_tool, connector)
+            self.cache.put_adapter(digest, mcp_tool.name, template)
+        # Same wrapper class and argument model, bound to this connection
+        return template.model_copy(update={"tool_connector": connector})
+
+
+def use_cached_tools(agent: MCPAgent) -> MCPAgent:
+    """Make ``agent`` build its tools through ``CachingLangChainAdapter``."""
+    agent.adapter = CachingLangChainAdapter(disallowed_tools=agent.disallowed_tools)
+    return agent
@@ -0,0 +1,51 @@
+"""Chat history exports kept up to date incrementally.
+
+The chat is append-only (or cleared), so each message is rendered to its
+JSON and TXT fragments once, when it first appears; the full export strings
+are joined only when something changed since the last request. A rerun
+with no new messages costs nothing, however long the conversation is.
+"""
+
+import json
+
+TXT_HEADER = "=" * 60 + "\n" + "WEATHER CHAT HISTORY\n" + "=" * 60 + "\n\n"
+
+
+class ChatTranscript:
+    """JSON and TXT exports of a chat, extended one message at a time."""
+
+    def __init__(self):
+        self._json_parts: list[str] = []
+        self._txt_parts: list[str] = []
+        self._json: str | None = None
+        self._txt: str | None = None
+
+    def __len__(self) -> int:
+        return len(self._json_parts)
+
+    def reset(self) -> None:
+        self._json_parts.clear()
+        self._txt_parts.clear()
+        self._json = self._txt = None
+
+    def sync(self, messages: list[dict]) -> None:
+        """Render messages added since the last sync (rebuild if the chat shrank)."""
+        if len(messages) < len(self._json_parts):
+            self.reset()
+        for i in range(len(self._json_parts), len(messages)):
+            msg = messages[i]
+            # Same layout as json.dumps(messages, indent=2), one element at a time
+            self._json_parts.append("\n".join("  " + line for line in json.dumps(msg, indent=2).splitlines()))
+            role = "YOU" if msg["role"] == "user" else "RATNESH AI WEATHER AGENT"
+            self._txt_parts.append(f"[{i + 1}] {role}:\n{msg['content']}\n" + "-" * 60 + "\n\n")
+            self._json = self._txt = None
+
+    def json(self) -> str:
+        if self._json is None:
+            self._json = "[\n" + ",\n".join(self._json_parts) + "\n]" if self._json_parts else "[]"
+        return self._json
+
+    def txt(self) -> str:
+        if self._txt is None:
+            self._txt = TXT_HEADER + "".join(self._txt_parts)
+        return self._txt
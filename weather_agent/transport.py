@@ -0,0 +1,118 @@
+"""Connect MCP clients to the weather server, preferring a shared instance.
+
+By default every ``MCPClient`` launches its own weather server over stdio
+(``server/weather.json``), each with cold caches. When a shared server is
+running (``WEATHER_MCP_TRANSPORT=sse python server/weather.py``), point
+clients at it with ``WEATHER_MCP_URL=http://host:8000/sse`` or a config file
+whose server entry has a ``url`` (see ``server/weather_shared.json``); every
+client then shares one warm cache and upstream connection pool.
+
+Connecting to the shared server is retried with exponential backoff and
+jitter. If it stays unreachable the client falls back to the stdio config,
+unless ``WEATHER_MCP_FALLBACK=0``.
+
+Sessions are created through ``tool_cache.create_sessions``, which reuses
+the tool list while the server's tool-schema hash is unchanged, and their
+tool calls carry the caller's remaining time budget (``deadlines``).
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+
+from mcp_use import MCPClient
+
+from weather_agent import deadlines
+from weather_agent.tool_cache import create_sessions
+
+STDIO_CONFIG = "server/weather.json"
+
+logger = logging.getLogger(__name__)
+
+
+def load_config(config_file: str = STDIO_CONFIG, shared_url: str | None = None) -> dict:
+    """Client config for the weather server, honouring ``WEATHER_MCP_URL``."""
+    shared_url = shared_url or os.getenv("WEATHER_MCP_URL")
+    if shared_url:
+        return {"mcpServers": {"weather": {"url": shared_url}}}
+    with open(config_file) as f:
+        return json.load(f)
+
+
+def is_shared(config: dict) -> bool:
+    return any("url" in server for server in config.get("mcpServers", {}).values())
+
+
+def is_alive(client: MCPClient) -> bool:
+    """True if every session is connected and its transport task still runs."""
+    sessions = client.get_all_active_sessions()
+    if not sessions:
+        return False
+    for session in sessions.values():
+        if not session.is_connected:
+            return False
+        manager = getattr(session.connector, "_connection_manager", None)
+        task = getattr(manager, "_task", None)
+        if task is not None and task.done():
+            return False  # e.g. the shared server went away
+    return True
+
+
+async def _open_sessions(client: MCPClient) -> None:
+    try:
+        await create_sessions(client)
+    except BaseException:
+        # Don't leave a half-started server subprocess behind
+        await client.close_all_sessions()
+        raise
+    for session in client.sessions.values():
+        deadlines.install(session.connector)
+
+
+async def _connect_with_backoff(config: dict, attempts: int, base_delay: float, max_delay: float) -> MCPClient:
+    for attempt in range(1, attempts + 1):
+        client = MCPClient.from_dict(config)
+        try:
+            await _open_sessions(client)
+            return client
+        except Exception as e:
+            if attempt == attempts:
+                raise
+            delay = min(max_delay, base_delay * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+            logger.warning("Weather server connect failed (%s), retry %d/%d in %.1fs", e, attempt, attempts - 1, delay)
+            await asyncio.sleep(delay)
+
+
+async def connect_client(
+    config_file: str = STDIO_CONFIG,
+    shared_url: str | None = None,
+    attempts: int = 4,
+    base_delay: float = 0.5,
+    max_delay: float = 8.0,
+) -> MCPClient:
+    """Return an ``MCPClient`` with live sessions to the weather server.
+
+    Args:
+        config_file: mcp-use config; used as is, or as the stdio fallback
+        shared_url: SSE URL of a shared server (defaults to ``WEATHER_MCP_URL``)
+        attempts: Connection attempts before giving up on a shared server
+        base_delay: First backoff delay in seconds, doubled per retry
+        max_delay: Upper bound for a single backoff delay
+    """
+    config = load_config(config_file, shared_url)
+    if not is_shared(config):
+        client = MCPClient.from_dict(config)
+        await _open_sessions(client)
+        return client
+
+    try:
+        return await _connect_with_backoff(config, attempts, base_delay, max_delay)
+    except Exception as e:
+        if os.getenv("WEATHER_MCP_FALLBACK", "1") == "0":
+            raise
+        logger.warning("Shared weather server unreachable (%s); falling back to stdio", e)
+        client = MCPClient.from_config_file(STDIO_CONFIG)
+        await _open_sessions(client)
+        return client